@@ -0,0 +1,167 @@
+"""initial schema
+
+Esquema base equivalente al que antes creaba Base.metadata.create_all() al iniciar la app.
+Es idempotente: en la base de datos de producción (tablas ya existentes) solo registra la versión.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+ESTADO_ASISTENCIA = postgresql.ENUM('ASISTIO', 'NO_ASISTIO', 'SUSPENDIDA', 'VACACIONES', name='estadoasistencia', create_type=False)
+ESTADO_TICKET = postgresql.ENUM('VACIO', 'OCHENTA_PORCIENTO', 'CIEN_PORCIENTO', name='estadoticket', create_type=False)
+PORCENTAJE_LOGRO = postgresql.ENUM(
+    'CIEN_PORCIENTO', 'OCHENTA_PORCIENTO', 'SESENTA_PORCIENTO', 'CUARENTA_PORCIENTO',
+    'VEINTE_PORCIENTO', 'CERO_PORCIENTO', 'VACIO',
+    name='porcentajelogro', create_type=False
+)
+
+
+def timestamps():
+    return [
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    ]
+
+
+def create_table_if_missing(name, *columns, indexes=()):
+    bind = op.get_bind()
+    if sa.inspect(bind).has_table(name):
+        return
+    op.create_table(name, *columns)
+    for index_name, index_columns, unique in indexes:
+        op.create_index(index_name, name, index_columns, unique=unique)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    for enum_type in (ESTADO_ASISTENCIA, ESTADO_TICKET, PORCENTAJE_LOGRO):
+        enum_type.create(bind, checkfirst=True)
+
+    create_table_if_missing(
+        'colegios',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('nombre', sa.String(), nullable=False),
+        sa.Column('comuna', sa.String(), nullable=False),
+        *timestamps(),
+        indexes=[('ix_colegios_id', ['id'], False)],
+    )
+    create_table_if_missing(
+        'equipos',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('nombre', sa.String(), nullable=False, unique=True),
+        sa.Column('descripcion', sa.String(), nullable=True),
+        sa.Column('colegio_id', sa.Integer(), sa.ForeignKey('colegios.id'), nullable=True),
+        *timestamps(),
+        indexes=[('ix_equipos_id', ['id'], False)],
+    )
+    create_table_if_missing(
+        'usuarios',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('email', sa.String(), nullable=False),
+        sa.Column('hashed_password', sa.String(), nullable=False),
+        sa.Column('nombre_completo', sa.String(), nullable=False),
+        sa.Column('rol', sa.String(), nullable=False),
+        sa.Column('equipo_id', sa.Integer(), sa.ForeignKey('equipos.id'), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('password_changed', sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column('password_reset_token', sa.String(), nullable=True),
+        sa.Column('password_reset_expires', sa.DateTime(timezone=True), nullable=True),
+        *timestamps(),
+        indexes=[('ix_usuarios_id', ['id'], False), ('ix_usuarios_email', ['email'], True)],
+    )
+    create_table_if_missing(
+        'tutores',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('nombre', sa.String(), nullable=False),
+        sa.Column('apellido', sa.String(), nullable=False),
+        sa.Column('email', sa.String(), nullable=False),
+        sa.Column('equipo_id', sa.Integer(), sa.ForeignKey('equipos.id'), nullable=False),
+        sa.Column('activo', sa.Boolean(), nullable=True, server_default='true'),
+        sa.Column('motivo_desercion', sa.String(), nullable=True),
+        *timestamps(),
+        indexes=[('ix_tutores_id', ['id'], False), ('ix_tutores_email', ['email'], True)],
+    )
+    create_table_if_missing(
+        'estudiantes',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('rut', sa.String(), nullable=False, unique=True),
+        sa.Column('nombre', sa.String(), nullable=False),
+        sa.Column('apellido', sa.String(), nullable=False),
+        sa.Column('curso', sa.String(), nullable=False),
+        sa.Column('equipo_id', sa.Integer(), sa.ForeignKey('equipos.id'), nullable=False),
+        sa.Column('nombre_apoderado', sa.String(), nullable=True),
+        sa.Column('contacto_apoderado', sa.String(), nullable=True),
+        sa.Column('observaciones', sa.String(), nullable=True),
+        sa.Column('activo', sa.Boolean(), nullable=True, server_default='true'),
+        sa.Column('motivo_desercion', sa.String(), nullable=True),
+        *timestamps(),
+        indexes=[('ix_estudiantes_id', ['id'], False)],
+    )
+    create_table_if_missing(
+        'asistencia_estudiantes',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('estudiante_id', sa.Integer(), sa.ForeignKey('estudiantes.id'), nullable=False),
+        sa.Column('semana', sa.String(), nullable=False),
+        sa.Column('mes', sa.String(), nullable=False),
+        sa.Column('dias', sa.String(), nullable=False),
+        sa.Column('estado', ESTADO_ASISTENCIA, nullable=False),
+        *timestamps(),
+        indexes=[('ix_asistencia_estudiantes_id', ['id'], False)],
+    )
+    create_table_if_missing(
+        'asistencia_tutores',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('tutor_id', sa.Integer(), sa.ForeignKey('tutores.id'), nullable=False),
+        sa.Column('semana', sa.String(), nullable=False),
+        sa.Column('mes', sa.String(), nullable=False),
+        sa.Column('dias', sa.String(), nullable=False),
+        sa.Column('estado', ESTADO_ASISTENCIA, nullable=False),
+        *timestamps(),
+        indexes=[('ix_asistencia_tutores_id', ['id'], False)],
+    )
+    create_table_if_missing(
+        'tickets_estudiantes',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('estudiante_id', sa.Integer(), sa.ForeignKey('estudiantes.id'), nullable=False),
+        sa.Column('unidad', sa.String(), nullable=False),
+        sa.Column('modulo', sa.String(), nullable=False),
+        sa.Column('resultado', ESTADO_TICKET, nullable=False),
+        *timestamps(),
+        indexes=[('ix_tickets_estudiantes_id', ['id'], False)],
+    )
+    for table_name in ('prueba_diagnostico_estudiantes', 'prueba_unidad_estudiantes'):
+        create_table_if_missing(
+            table_name,
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('estudiante_id', sa.Integer(), sa.ForeignKey('estudiantes.id'), nullable=False),
+            sa.Column('unidad', sa.String(), nullable=False),
+            sa.Column('modulo', sa.String(), nullable=False),
+            sa.Column('resultado', PORCENTAJE_LOGRO, nullable=False),
+            *timestamps(),
+            indexes=[(f'ix_{table_name}_id', ['id'], False)],
+        )
+
+
+def downgrade() -> None:
+    for table_name in (
+        'prueba_unidad_estudiantes', 'prueba_diagnostico_estudiantes', 'tickets_estudiantes',
+        'asistencia_tutores', 'asistencia_estudiantes', 'estudiantes', 'tutores', 'usuarios',
+        'equipos', 'colegios',
+    ):
+        op.drop_table(table_name)
+    bind = op.get_bind()
+    for enum_type in (PORCENTAJE_LOGRO, ESTADO_TICKET, ESTADO_ASISTENCIA):
+        enum_type.drop(bind, checkfirst=True)
@@ -0,0 +1,44 @@
+"""grid version indexes
+
+Índices (fk, updated_at, created_at) para calcular el ETag de las grillas
+(count y max(updated_at) de las filas visibles) sin leer las tablas completas.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+VERSION_INDEXES = [
+    ('asistencia_estudiantes', 'estudiante_id'),
+    ('asistencia_tutores', 'tutor_id'),
+    ('tickets_estudiantes', 'estudiante_id'),
+    ('prueba_diagnostico_estudiantes', 'estudiante_id'),
+    ('prueba_unidad_estudiantes', 'estudiante_id'),
+    ('estudiantes', 'equipo_id'),
+    ('tutores', 'equipo_id'),
+]
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    for table_name, fk_column in VERSION_INDEXES:
+        index_name = f'ix_{table_name}_version'
+        if index_name in {index['name'] for index in inspector.get_indexes(table_name)}:
+            continue
+        op.create_index(index_name, table_name, [fk_column, 'updated_at', 'created_at'])
+
+
+def downgrade() -> None:
+    for table_name, _ in VERSION_INDEXES:
+        op.drop_index(f'ix_{table_name}_version', table_name=table_name)
@@ -0,0 +1,139 @@
+"""curriculum catalog
+
+Tablas `unidades` y `modulos` (catálogo curricular de tickets y pruebas), sembradas con el
+currículo que antes estaba repetido en los routers como MODULOS_DATA.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+# Copia fija del currículo al momento de la migración (no importar desde app/)
+UNIDADES = [
+    {"unidad_key": "unidad_1", "nombre": "Unidad 1", "descripcion": "Primera unidad del programa"},
+    {"unidad_key": "unidad_2", "nombre": "Unidad 2", "descripcion": "Segunda unidad del programa"},
+    {"unidad_key": "unidad_3", "nombre": "Unidad 3", "descripcion": "Tercera unidad del programa"},
+    {"unidad_key": "unidad_4", "nombre": "Unidad 4", "descripcion": "Cuarta unidad del programa"},
+    {"unidad_key": "unidad_5", "nombre": "Unidad 5", "descripcion": "Quinta unidad del programa"}
+]
+
+MODULOS = {
+    "unidad_1": [
+        {"modulo_key": "modulo_1", "nombre": "Módulo 1", "descripcion": "Adicción de N° Naturales"},
+        {"modulo_key": "modulo_2", "nombre": "Módulo 2", "descripcion": "Sustracción de N° Naturales"},
+        {"modulo_key": "modulo_3", "nombre": "Módulo 3", "descripcion": "Multiplicación de N° Naturales"},
+        {"modulo_key": "modulo_4", "nombre": "Módulo 4", "descripcion": "División de N° Naturales"},
+        {"modulo_key": "modulo_5", "nombre": "Módulo 5", "descripcion": "Operatoria Combinada de N° Naturales"}
+    ],
+    "unidad_2": [
+        {"modulo_key": "modulo_1", "nombre": "Módulo 6", "descripcion": "Adicción de N° Enteros"},
+        {"modulo_key": "modulo_2", "nombre": "Módulo 7", "descripcion": "Sustracción de N° Enteros"},
+        {"modulo_key": "modulo_3", "nombre": "Módulo 8", "descripcion": "Multiplicación y división de N° Enteros"},
+        {"modulo_key": "modulo_4", "nombre": "Módulo 9", "descripcion": "Operatoria Combinada de N° Enteros"},
+        {"modulo_key": "modulo_5", "nombre": "Módulo 10", "descripcion": "Resolución de Problemas de N° Enteros"}
+    ],
+    "unidad_3": [
+        {"modulo_key": "modulo_1", "nombre": "Módulo 11", "descripcion": "Conceptos Claves de Fracciones"},
+        {"modulo_key": "modulo_2", "nombre": "Módulo 12", "descripcion": "Suma y Resta de Fracciones"},
+        {"modulo_key": "modulo_3", "nombre": "Módulo 13", "descripcion": "Multiplicación de Fracciones"},
+        {"modulo_key": "modulo_4", "nombre": "Módulo 14", "descripcion": "División de Fracciones"},
+        {"modulo_key": "modulo_5", "nombre": "Módulo 15", "descripcion": "Suma y Resta de Decimales"},
+        {"modulo_key": "modulo_6", "nombre": "Módulo 16", "descripcion": "Multiplicación de Decimales"},
+        {"modulo_key": "modulo_7", "nombre": "Módulo 17", "descripcion": "División de Decimales"},
+        {"modulo_key": "modulo_8", "nombre": "Módulo 18", "descripcion": "Conjuntos Numéricos"},
+        {"modulo_key": "modulo_9", "nombre": "Módulo 19", "descripcion": "Operatoria Combinada de N° Racionales"},
+        {"modulo_key": "modulo_10", "nombre": "Módulo 20", "descripcion": "Resolución de Problemas de N° Racionales"}
+    ],
+    "unidad_4": [
+        {"modulo_key": "modulo_1", "nombre": "Módulo 21", "descripcion": "Conceptos Claves de %"},
+        {"modulo_key": "modulo_2", "nombre": "Módulo 22", "descripcion": "Cálculo de % más directos"},
+        {"modulo_key": "modulo_3", "nombre": "Módulo 23", "descripcion": "Cálculo de cualquier %"},
+        {"modulo_key": "modulo_4", "nombre": "Módulo 24", "descripcion": "Resolución de Problemas de % 1"},
+        {"modulo_key": "modulo_5", "nombre": "Módulo 25", "descripcion": "Resolución de Problemas de % 2"}
+    ],
+    "unidad_5": [
+        {"modulo_key": "modulo_1", "nombre": "Módulo 26", "descripcion": "Conceptos Claves de Raíces"},
+        {"modulo_key": "modulo_2", "nombre": "Módulo 27", "descripcion": "Cálculo de Raíces"},
+        {"modulo_key": "modulo_3", "nombre": "Módulo 28", "descripcion": "Propiedades de Raíces"},
+        {"modulo_key": "modulo_4", "nombre": "Módulo 29", "descripcion": "Resolución de Problemas de Raíces"},
+        {"modulo_key": "modulo_5", "nombre": "Módulo 30", "descripcion": "Conceptos Claves de Potencias"},
+        {"modulo_key": "modulo_6", "nombre": "Módulo 31", "descripcion": "Cálculo de Potencias"},
+        {"modulo_key": "modulo_7", "nombre": "Módulo 32", "descripcion": "Propiedades de Potencias"},
+        {"modulo_key": "modulo_8", "nombre": "Módulo 33", "descripcion": "Resolución de Problemas de Potencias"}
+    ]
+}
+
+
+def timestamps():
+    return [
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    ]
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table('unidades'):
+        op.create_table(
+            'unidades',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('unidad_key', sa.String(), nullable=False, unique=True),
+            sa.Column('nombre', sa.String(), nullable=False),
+            sa.Column('descripcion', sa.String(), nullable=True),
+            sa.Column('orden', sa.Integer(), nullable=False),
+            *timestamps(),
+        )
+        op.create_index('ix_unidades_id', 'unidades', ['id'])
+    if not inspector.has_table('modulos'):
+        op.create_table(
+            'modulos',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('unidad_id', sa.Integer(), sa.ForeignKey('unidades.id', ondelete='CASCADE'), nullable=False),
+            sa.Column('modulo_key', sa.String(), nullable=False),
+            sa.Column('nombre', sa.String(), nullable=False),
+            sa.Column('descripcion', sa.String(), nullable=True),
+            sa.Column('orden', sa.Integer(), nullable=False),
+            *timestamps(),
+            sa.UniqueConstraint('unidad_id', 'modulo_key', name='uq_modulos_unidad_modulo_key'),
+        )
+        op.create_index('ix_modulos_id', 'modulos', ['id'])
+
+    # Sembrar el currículo solo si el catálogo está vacío
+    bind = op.get_bind()
+    if bind.execute(sa.text('SELECT COUNT(*) FROM unidades')).scalar():
+        return
+    unidades_table = sa.table(
+        'unidades',
+        sa.column('unidad_key', sa.String), sa.column('nombre', sa.String),
+        sa.column('descripcion', sa.String), sa.column('orden', sa.Integer),
+    )
+    modulos_table = sa.table(
+        'modulos',
+        sa.column('unidad_id', sa.Integer), sa.column('modulo_key', sa.String), sa.column('nombre', sa.String),
+        sa.column('descripcion', sa.String), sa.column('orden', sa.Integer),
+    )
+    for orden, unidad in enumerate(UNIDADES, start=1):
+        bind.execute(unidades_table.insert().values(orden=orden, **unidad))
+        unidad_id = bind.execute(
+            sa.text('SELECT id FROM unidades WHERE unidad_key = :key'), {'key': unidad['unidad_key']}
+        ).scalar()
+        op.bulk_insert(modulos_table, [
+            dict(modulo, unidad_id=unidad_id, orden=modulo_orden)
+            for modulo_orden, modulo in enumerate(MODULOS[unidad['unidad_key']], start=1)
+        ])
+
+
+def downgrade() -> None:
+    op.drop_table('modulos')
+    op.drop_table('unidades')
@@ -0,0 +1,38 @@
+"""keyset pagination indexes
+
+Índices para la paginación por cursor de /estudiantes/, /tutores/ y /usuarios/.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+KEYSET_INDEXES = [
+    ('ix_estudiantes_apellido_id', 'estudiantes', ['apellido', 'id']),
+    ('ix_tutores_apellido_id', 'tutores', ['apellido', 'id']),
+    ('ix_usuarios_nombre_completo_id', 'usuarios', ['nombre_completo', 'id']),
+]
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    for index_name, table_name, columns in KEYSET_INDEXES:
+        if index_name in {index['name'] for index in inspector.get_indexes(table_name)}:
+            continue
+        op.create_index(index_name, table_name, columns)
+
+
+def downgrade() -> None:
+    for index_name, table_name, _ in KEYSET_INDEXES:
+        op.drop_index(index_name, table_name=table_name)
@@ -0,0 +1,44 @@
+"""search trigram indexes
+
+Extensión pg_trgm e índices GIN de trigramas para GET /search: nombre completo de estudiantes
+y tutores, y RUT normalizado (sin puntos ni guión) de estudiantes. Las expresiones deben ser
+idénticas a las de app.routers.search para que PostgreSQL use los índices.
+Solo aplica en PostgreSQL; en SQLite la búsqueda se resuelve en Python.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+TRIGRAM_INDEXES = [
+    ('ix_estudiantes_nombre_completo_trgm', 'estudiantes', "(nombre || ' ' || apellido)"),
+    ('ix_estudiantes_rut_trgm', 'estudiantes', "upper(replace(replace(rut, '.', ''), '-', ''))"),
+    ('ix_tutores_nombre_completo_trgm', 'tutores', "(nombre || ' ' || apellido)"),
+]
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for index_name, table_name, expression in TRIGRAM_INDEXES:
+        op.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table_name} USING gin (({expression}) gin_trgm_ops)")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    for index_name, _, _ in TRIGRAM_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {index_name}")
+    # La extensión pg_trgm se deja instalada: puede estar en uso por otros objetos
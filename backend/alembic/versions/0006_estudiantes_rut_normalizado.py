@@ -0,0 +1,90 @@
+"""estudiantes rut normalizado
+
+Columnas rut_numero (entero) y rut_dv con índice único, para que el mismo RUT con o sin
+puntos y guión no se registre dos veces y los duplicados de una importación se detecten con
+una sola consulta. Backfill desde `rut`: los RUT con dígito verificador inválido quedan en NULL
+y, si dos estudiantes comparten RUT normalizado, solo se completa el de menor id (se informan
+los ids para revisarlos a mano).
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import re
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+BATCH_SIZE = 1000
+
+
+def parse_rut(value):
+    # Copia congelada de app.utils.rut.parse_rut (la migración no debe depender del código de la app)
+    match = re.match(r'^(\d{1,8})([\dK])$', re.sub(r'[.\-\s]', '', value or '').upper())
+    if not match:
+        return None
+    numero, dv = int(match.group(1)), match.group(2)
+    total, rest = 0, numero
+    for factor in (2, 3, 4, 5, 6, 7, 2, 3):
+        rest, digit = divmod(rest, 10)
+        total += digit * factor
+    remainder = 11 - total % 11
+    expected = '0' if remainder == 11 else 'K' if remainder == 10 else str(remainder)
+    return (numero, dv) if numero and expected == dv else None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    columns = {column['name'] for column in inspector.get_columns('estudiantes')}
+    if 'rut_numero' not in columns:
+        op.add_column('estudiantes', sa.Column('rut_numero', sa.Integer(), nullable=True))
+    if 'rut_dv' not in columns:
+        op.add_column('estudiantes', sa.Column('rut_dv', sa.String(length=1), nullable=True))
+
+    estudiantes = sa.table(
+        'estudiantes',
+        sa.column('id', sa.Integer), sa.column('rut', sa.String),
+        sa.column('rut_numero', sa.Integer), sa.column('rut_dv', sa.String),
+    )
+    rows = bind.execute(sa.select(estudiantes.c.id, estudiantes.c.rut).order_by(estudiantes.c.id)).all()
+
+    updates, seen, duplicated = [], {}, []
+    for estudiante_id, rut in rows:
+        parsed = parse_rut(rut)
+        if parsed is None:
+            continue
+        if parsed[0] in seen:
+            duplicated.append((seen[parsed[0]], estudiante_id))
+            continue
+        seen[parsed[0]] = estudiante_id
+        updates.append({'row_id': estudiante_id, 'numero': parsed[0], 'dv': parsed[1]})
+
+    statement = (
+        estudiantes.update()
+        .where(estudiantes.c.id == sa.bindparam('row_id'))
+        .values(rut_numero=sa.bindparam('numero'), rut_dv=sa.bindparam('dv'))
+    )
+    for start in range(0, len(updates), BATCH_SIZE):
+        bind.execute(statement, updates[start:start + BATCH_SIZE])
+
+    print(f"[MIGRACION 0006] RUT normalizado en {len(updates)} de {len(rows)} estudiantes")
+    for original_id, duplicate_id in duplicated:
+        print(f"[MIGRACION 0006] Estudiante {duplicate_id} tiene el mismo RUT que {original_id}; rut_numero queda en NULL")
+
+    if 'ix_estudiantes_rut_numero' not in {index['name'] for index in inspector.get_indexes('estudiantes')}:
+        op.create_index('ix_estudiantes_rut_numero', 'estudiantes', ['rut_numero'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_estudiantes_rut_numero', table_name='estudiantes')
+    op.drop_column('estudiantes', 'rut_dv')
+    op.drop_column('estudiantes', 'rut_numero')
@@ -0,0 +1,71 @@
+"""on delete cascade
+
+Las claves foráneas de asistencia, tickets y pruebas hacia estudiantes y tutores pasan a
+ON DELETE CASCADE: borrar un estudiante o tutor (uno o varios con /bulk-delete) es un solo
+DELETE y la base de datos elimina sus registros.
+En SQLite, que no permite modificar claves foráneas existentes, la tabla se recrea con
+batch_alter_table (las claves de 0001 no tienen nombre; se les asigna uno con naming_convention).
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+CASCADE_FOREIGN_KEYS = [
+    ('asistencia_estudiantes', 'estudiante_id', 'estudiantes'),
+    ('asistencia_tutores', 'tutor_id', 'tutores'),
+    ('tickets_estudiantes', 'estudiante_id', 'estudiantes'),
+    ('prueba_diagnostico_estudiantes', 'estudiante_id', 'estudiantes'),
+    ('prueba_unidad_estudiantes', 'estudiante_id', 'estudiantes'),
+]
+
+
+# Nombre de las claves foráneas sin nombre al recrear tablas en SQLite
+SQLITE_NAMING_CONVENTION = {'fk': '%(table_name)s_%(column_0_name)s_fkey'}
+
+
+def current_foreign_key(table_name, column, referred_table):
+    inspector = sa.inspect(op.get_bind())
+    for foreign_key in inspector.get_foreign_keys(table_name):
+        if foreign_key['constrained_columns'] == [column] and foreign_key['referred_table'] == referred_table:
+            return foreign_key
+    return None
+
+
+def replace_foreign_key(table_name, column, referred_table, ondelete):
+    foreign_key = current_foreign_key(table_name, column, referred_table)
+    if foreign_key is not None and (foreign_key.get('options') or {}).get('ondelete') == ondelete:
+        return
+    name = f'{table_name}_{column}_fkey'
+
+    if op.get_bind().dialect.name == 'sqlite':
+        with op.batch_alter_table(table_name, naming_convention=SQLITE_NAMING_CONVENTION) as batch_op:
+            if foreign_key is not None:
+                batch_op.drop_constraint(foreign_key['name'] or name, type_='foreignkey')
+            batch_op.create_foreign_key(name, referred_table, [column], ['id'], ondelete=ondelete)
+        return
+
+    if foreign_key is not None:
+        op.drop_constraint(foreign_key['name'], table_name, type_='foreignkey')
+    op.create_foreign_key(name, table_name, referred_table, [column], ['id'], ondelete=ondelete)
+
+
+def upgrade() -> None:
+    for table_name, column, referred_table in CASCADE_FOREIGN_KEYS:
+        replace_foreign_key(table_name, column, referred_table, 'CASCADE')
+
+
+def downgrade() -> None:
+    for table_name, column, referred_table in CASCADE_FOREIGN_KEYS:
+        replace_foreign_key(table_name, column, referred_table, None)
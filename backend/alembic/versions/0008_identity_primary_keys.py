@@ -0,0 +1,71 @@
+"""identity primary keys
+
+Las claves primarias serial pasan a GENERATED BY DEFAULT AS IDENTITY. La secuencia de cada
+tabla parte en max(id) + 1, así los INSERT dejan de chocar con ids existentes y las rutas de
+escritura ya no necesitan reintentar con setval o max(id) + 1. Si más adelante se insertan
+filas con id explícito, el reconciliador (app.utils.sequences, al iniciar la app y con
+POST /admin/sequences/reconcile) adelanta las secuencias en una pasada.
+Solo aplica en PostgreSQL; en SQLite `INTEGER PRIMARY KEY` ya es autoincremental.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+TABLES = [
+    'colegios', 'equipos', 'usuarios', 'tutores', 'estudiantes',
+    'asistencia_estudiantes', 'asistencia_tutores', 'tickets_estudiantes',
+    'prueba_diagnostico_estudiantes', 'prueba_unidad_estudiantes',
+    'unidades', 'modulos',
+]
+
+
+def is_identity(bind, table_name):
+    return bind.execute(sa.text(
+        "SELECT is_identity FROM information_schema.columns "
+        "WHERE table_schema = current_schema() AND table_name = :table AND column_name = 'id'"
+    ), {'table': table_name}).scalar() == 'YES'
+
+
+def next_id(bind, table_name):
+    return bind.execute(sa.text(f'SELECT COALESCE(MAX(id), 0) + 1 FROM {table_name}')).scalar()
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+    for table_name in TABLES:
+        if is_identity(bind, table_name):
+            continue
+        sequence = bind.execute(sa.text("SELECT pg_get_serial_sequence(:table, 'id')"), {'table': table_name}).scalar()
+        op.execute(f'ALTER TABLE {table_name} ALTER COLUMN id DROP DEFAULT')
+        if sequence:
+            op.execute(f'DROP SEQUENCE {sequence}')
+        op.execute(
+            f'ALTER TABLE {table_name} ALTER COLUMN id '
+            f'ADD GENERATED BY DEFAULT AS IDENTITY (START WITH {next_id(bind, table_name)})'
+        )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+    for table_name in TABLES:
+        if not is_identity(bind, table_name):
+            continue
+        op.execute(f'ALTER TABLE {table_name} ALTER COLUMN id DROP IDENTITY')
+        op.execute(f'CREATE SEQUENCE {table_name}_id_seq OWNED BY {table_name}.id START WITH {next_id(bind, table_name)}')
+        op.execute(f"ALTER TABLE {table_name} ALTER COLUMN id SET DEFAULT nextval('{table_name}_id_seq')")
@@ -0,0 +1,40 @@
+"""mastery covering indexes
+
+Índices cubrientes (unidad, modulo, estudiante_id, resultado) para el reporte de dominio por
+módulo (/analytics/mastery) sobre tickets y pruebas.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19 23:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+
+MASTERY_COLUMNS = ['unidad', 'modulo', 'estudiante_id', 'resultado']
+MASTERY_INDEXES = [
+    ('ix_tickets_estudiantes_mastery', 'tickets_estudiantes'),
+    ('ix_prueba_diagnostico_estudiantes_mastery', 'prueba_diagnostico_estudiantes'),
+    ('ix_prueba_unidad_estudiantes_mastery', 'prueba_unidad_estudiantes'),
+]
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    for index_name, table_name in MASTERY_INDEXES:
+        if index_name in {index['name'] for index in inspector.get_indexes(table_name)}:
+            continue
+        op.create_index(index_name, table_name, MASTERY_COLUMNS)
+
+
+def downgrade() -> None:
+    for index_name, table_name in MASTERY_INDEXES:
+        op.drop_index(index_name, table_name=table_name)
@@ -0,0 +1,372 @@
+"""
+Asistencia en memoria como matriz columnar para estadísticas.
+
+Cada grupo (estudiantes o tutores) se carga como una matriz NumPy int8 de personas × semanas
+del calendario, con el estado codificado (0 = sin registro). Junto a la matriz se guardan los
+mapas id -> fila de personas, equipos y colegios, así las estadísticas (porcentajes, promedios
+por equipo, series por semana, inasistencias) son reducciones vectorizadas sobre toda la
+matriz en vez de recorrer objetos ORM uno por uno.
+
+La matriz se mantiene al día de forma incremental:
+- Las escrituras hechas por la app (commits que tocan asistencia, personas o equipos) la marcan
+  como desactualizada; la siguiente lectura trae solo las filas modificadas desde la última
+  sincronización (updated_at/created_at), sin recargar todo.
+- Un watcher revisa cada ANALYTICS_REFRESH_SECONDS los cambios hechos fuera de la app (DBeaver).
+- Si cambian las personas o equipos, o desaparecen registros, se reconstruye completa. Los
+  borrados se detectan con la cantidad y la suma de ids: un borrado las baja aunque en la misma
+  ventana se inserten filas nuevas (cuyos ids, mayores al máximo anterior, se descuentan).
+"""
+from datetime import timedelta
+from sqlalchemy import event, func, or_, select
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional, Sequence
+from app.models.attendance import AsistenciaEstudiante, AsistenciaTutor, EstadoAsistencia
+from app.models.equipo import Equipo
+from app.models.student import Estudiante
+from app.models.tutor import Tutor
+import asyncio
+import numpy as np
+import os
+
+ANALYTICS_REFRESH_SECONDS = int(os.getenv("ANALYTICS_REFRESH_SECONDS", "30"))  # 0 desactiva el watcher
+
+# updated_at toma la hora de inicio de la transacción: una escritura que confirma tarde puede
+# quedar con una marca anterior a la última sincronización, así que se relee este margen
+SYNC_OVERLAP = timedelta(minutes=5)
+
+# Códigos de estado en la matriz
+SIN_REGISTRO = 0
+STATUS_CODES = {
+    EstadoAsistencia.ASISTIO: 1,
+    EstadoAsistencia.NO_ASISTIO: 2,
+    EstadoAsistencia.SUSPENDIDA: 3,
+    EstadoAsistencia.VACACIONES: 4,
+}
+ASISTIO = STATUS_CODES[EstadoAsistencia.ASISTIO]
+NO_ASISTIO = STATUS_CODES[EstadoAsistencia.NO_ASISTIO]
+TOTAL_CODES = len(STATUS_CODES) + 1
+
+def percentage(numerator, denominator):
+    """numerator / denominator * 100 elemento a elemento, 0 donde el denominador es 0"""
+    numerator = np.asarray(numerator, dtype=np.float64)
+    denominator = np.asarray(denominator, dtype=np.float64)
+    return np.divide(numerator * 100, denominator, out=np.zeros_like(numerator), where=denominator > 0)
+
+def records_version_columns(model, timestamp):
+    """Columnas de la versión de una tabla de registros: (cantidad, última modificación, id máximo, suma de ids)"""
+    return (
+        func.count(model.id), func.max(timestamp),
+        func.coalesce(func.max(model.id), 0), func.coalesce(func.sum(model.id), 0)
+    )
+
+def new_record(record_id: int, created_at, previous: tuple) -> bool:
+    """Registro insertado después de la versión `previous` (id mayor al máximo o creado después)"""
+    return record_id > previous[2] or (created_at is not None and previous[1] is not None and created_at > previous[1])
+
+def only_additions(previous: tuple, version: tuple, new_records: Sequence[tuple]) -> bool:
+    """
+    True si de la versión `previous` a `version` solo hubo inserciones y modificaciones.
+    `new_records` son los (id, created_at) insertados desde `previous`: si la cantidad y la suma de
+    ids no cuadran con ellos, se borraron registros aunque la cantidad total no haya bajado. Un id
+    ya visto en un registro nuevo (SQLite reutiliza el id máximo borrado) también es un borrado.
+    """
+    count, last, _, id_sum = version
+    previous_count, previous_last, previous_max_id, previous_id_sum = previous
+    if last is None or (previous_last is not None and last < previous_last):
+        return False
+    added_ids = [record_id for record_id, _ in new_records]
+    if any(record_id <= previous_max_id for record_id in added_ids):
+        return False
+    return count == previous_count + len(added_ids) and id_sum == previous_id_sum + sum(added_ids)
+
+class AttendanceMatrix:
+    """Matriz int8 personas × semanas con los índices de personas, equipos y colegios"""
+
+    def __init__(self, week_keys: Sequence[str], person_ids, equipo_ids, colegio_ids, active,
+                 names: List[str], cursos: Optional[List[str]], statuses):
+        self.week_keys = tuple(week_keys)
+        self.week_index = {week_key: position for position, week_key in enumerate(self.week_keys)}
+
+        # Personas ordenadas por id (la fila de un id se ubica con searchsorted o row_index)
+        self.person_ids = np.asarray(person_ids, dtype=np.int64)
+        self.row_index: Dict[int, int] = {person_id: row for row, person_id in enumerate(self.person_ids.tolist())}
+        self.equipo_ids = np.asarray(equipo_ids, dtype=np.int64)
+        self.colegio_ids = np.asarray(colegio_ids, dtype=np.int64)  # 0 si el equipo no tiene colegio
+        self.active = np.asarray(active, dtype=bool)
+        self.names = names
+        self.cursos = cursos
+
+        # Índices compactos de equipos y colegios, para reducir por grupo con np.bincount
+        self.equipos, self.equipo_rows = np.unique(self.equipo_ids, return_inverse=True)
+        self.colegios, self.colegio_rows = np.unique(self.colegio_ids, return_inverse=True)
+        self.equipo_index: Dict[int, int] = {equipo_id: i for i, equipo_id in enumerate(self.equipos.tolist())}
+        self.colegio_index: Dict[int, int] = {colegio_id: i for i, colegio_id in enumerate(self.colegios.tolist())}
+
+        self.statuses = np.asarray(statuses, dtype=np.int8)
+        self.version = 0  # Aumenta con cada cambio; sirve de clave para cachés derivados
+        self._counts = None
+
+    @property
+    def shape(self):
+        return self.statuses.shape
+
+    def rows_for(self, person_ids):
+        """Fila de cada id (-1 si la persona no está en la matriz)"""
+        person_ids = np.asarray(person_ids, dtype=np.int64)
+        if not len(self.person_ids):
+            return np.full(len(person_ids), -1, dtype=np.int64)
+        rows = np.minimum(np.searchsorted(self.person_ids, person_ids), len(self.person_ids) - 1)
+        return np.where(self.person_ids[rows] == person_ids, rows, -1)
+
+    def set_cells(self, rows, weeks, codes):
+        self.statuses[rows, weeks] = codes
+        self.version += 1
+        self._counts = None
+
+    def rows_mask(self, equipo_id: Optional[int] = None, colegio_id: Optional[int] = None):
+        """Filas de un equipo y/o colegio (todas si no hay filtros)"""
+        mask = np.ones(len(self.person_ids), dtype=bool)
+        if equipo_id is not None:
+            mask &= self.equipo_ids == equipo_id
+        if colegio_id is not None:
+            mask &= self.colegio_ids == colegio_id
+        return mask
+
+    def status_counts(self):
+        """Semanas por persona y estado: matriz (personas, TOTAL_CODES); columna = código de estado"""
+        if self._counts is None:
+            # Sumas en int16/int32: el calendario tiene menos de 32767 semanas y acumular en int64 cuesta el doble
+            self._counts = np.stack(
+                [(self.statuses == code).sum(axis=1, dtype=np.int16) for code in range(TOTAL_CODES)], axis=1
+            )
+        return self._counts
+
+    def person_stats(self):
+        """(asistidas, inasistencias, semanas con registro) por persona"""
+        counts = self.status_counts()
+        return counts[:, ASISTIO], counts[:, NO_ASISTIO], counts[:, 1:].sum(axis=1, dtype=np.int64)
+
+    def attendance_rates(self):
+        """Porcentaje de asistencia por persona sobre las semanas con registro"""
+        attended, _, recorded = self.person_stats()
+        return percentage(attended, recorded)
+
+    def group_totals(self, group_rows, groups_count: int, mask=None):
+        """Personas, asistidas, inasistencias y registros por grupo (equipo o colegio)"""
+        attended, absent, recorded = self.person_stats()
+        weights = None if mask is None else mask.astype(np.int64)
+        if mask is not None:
+            attended, absent, recorded = attended * weights, absent * weights, recorded * weights
+        return (
+            np.bincount(group_rows, weights=weights, minlength=groups_count).astype(np.int64),
+            np.bincount(group_rows, weights=attended, minlength=groups_count).astype(np.int64),
+            np.bincount(group_rows, weights=absent, minlength=groups_count).astype(np.int64),
+            np.bincount(group_rows, weights=recorded, minlength=groups_count).astype(np.int64),
+        )
+
+    def team_totals(self, mask=None):
+        return self.group_totals(self.equipo_rows, len(self.equipos), mask)
+
+    def school_totals(self, mask=None):
+        return self.group_totals(self.colegio_rows, len(self.colegios), mask)
+
+    def weekly_series(self, mask=None):
+        """Por semana: asistidas, inasistencias y registros de las filas de `mask`"""
+        statuses = self.statuses if mask is None else self.statuses[mask]
+        return (
+            (statuses == ASISTIO).sum(axis=0, dtype=np.int32),
+            (statuses == NO_ASISTIO).sum(axis=0, dtype=np.int32),
+            (statuses != SIN_REGISTRO).sum(axis=0, dtype=np.int32),
+        )
+
+    def group_weekly(self, group_rows, groups_count: int, mask=None):
+        """Por grupo (equipo o colegio) y semana: matrices (grupos, semanas) de asistidas, inasistencias y registros"""
+        statuses, group_rows = (self.statuses, group_rows) if mask is None else (self.statuses[mask], group_rows[mask])
+        weeks = statuses.shape[1]
+        # Celda (grupo, semana) aplanada a un índice, para contar todo con np.bincount
+        cells = (group_rows[:, None] * weeks + np.arange(weeks)).ravel()
+        size = groups_count * weeks
+
+        def count(values):
+            return np.bincount(cells, weights=values.ravel(), minlength=size).astype(np.int32).reshape(groups_count, weeks)
+
+        return count(statuses == ASISTIO), count(statuses == NO_ASISTIO), count(statuses != SIN_REGISTRO)
+
+class AttendanceMatrixStore:
+    """Mantiene la AttendanceMatrix de un grupo y la sincroniza con la base de datos"""
+
+    def __init__(self, name: str, person_model, attendance_model, person_column, with_course: bool):
+        self.name = name
+        self.person_model = person_model
+        self.attendance_model = attendance_model
+        self.person_column = person_column
+        self.with_course = with_course
+
+        self.matrix: Optional[AttendanceMatrix] = None
+        self.stale = True
+        self._lock = None  # se crea dentro del event loop (Python 3.9 lo asocia al loop al construirlo)
+        self._people_version = None
+        self._records_version = None  # (cantidad, última modificación, id máximo, suma de ids) de la asistencia
+
+    def mark_stale(self):
+        self.stale = True
+
+    async def get(self) -> AttendanceMatrix:
+        """Matriz al día (sincroniza solo si hubo escrituras desde la última lectura)"""
+        if self.matrix is None or self.stale:
+            await self.refresh()
+        return self.matrix
+
+    def _record_timestamp(self):
+        return func.coalesce(self.attendance_model.updated_at, self.attendance_model.created_at)
+
+    async def _versions(self, db):
+        person = self.person_model
+        row = (await db.execute(select(
+            select(func.count()).select_from(person).scalar_subquery(),
+            select(func.max(func.coalesce(person.updated_at, person.created_at))).scalar_subquery(),
+            select(func.count()).select_from(Equipo).scalar_subquery(),
+            select(func.max(func.coalesce(Equipo.updated_at, Equipo.created_at))).scalar_subquery(),
+            *(select(column).scalar_subquery() for column in records_version_columns(self.attendance_model, self._record_timestamp())),
+        ))).one()
+        return tuple(row[:4]), tuple(row[4:])
+
+    async def _load(self, db, week_keys: Sequence[str]) -> AttendanceMatrix:
+        person = self.person_model
+        columns = [
+            person.id, person.nombre, person.apellido, person.equipo_id,
+            func.coalesce(Equipo.colegio_id, 0), func.coalesce(person.activo, True)
+        ]
+        if self.with_course:
+            columns.append(person.curso)
+        people = (await db.execute(
+            select(*columns).outerjoin(Equipo, Equipo.id == person.equipo_id).order_by(person.id)
+        )).all()
+
+        statuses = np.zeros((len(people), len(week_keys)), dtype=np.int8)
+        matrix = AttendanceMatrix(
+            week_keys,
+            person_ids=[row[0] for row in people],
+            equipo_ids=[row[3] for row in people],
+            colegio_ids=[row[4] for row in people],
+            active=[bool(row[5]) for row in people],
+            names=[f"{row[1]} {row[2]}" for row in people],
+            cursos=[row[6] for row in people] if self.with_course else None,
+            statuses=statuses,
+        )
+        records = (await db.execute(
+            select(self.person_column, self.attendance_model.semana, self.attendance_model.estado)
+            .order_by(self.attendance_model.id)
+        )).all()
+        self._apply(matrix, records)
+        return matrix
+
+    def _apply(self, matrix: AttendanceMatrix, records) -> int:
+        """Escribe (persona, semana, estado) en la matriz; ignora personas o semanas desconocidas"""
+        if not records or not len(matrix.person_ids):
+            return 0
+        rows = matrix.rows_for(np.fromiter((record[0] for record in records), dtype=np.int64, count=len(records)))
+        weeks = np.fromiter((matrix.week_index.get(record[1], -1) for record in records), dtype=np.int64, count=len(records))
+        codes = np.fromiter((STATUS_CODES[record[2]] for record in records), dtype=np.int8, count=len(records))
+
+        known = (rows >= 0) & (weeks >= 0)
+        matrix.set_cells(rows[known], weeks[known], codes[known])
+        return int(np.count_nonzero(known))
+
+    async def refresh(self) -> bool:
+        """Sincroniza la matriz; devuelve True si hubo cambios"""
+        from app.routers.attendance_2026 import load_2026_calendar
+
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            # Se limpia antes de leer: una escritura confirmada durante la sincronización la vuelve a marcar
+            self.stale = False
+            try:
+                return await self._sync(load_2026_calendar)
+            except Exception:
+                self.stale = True
+                raise
+
+    async def _sync(self, load_calendar) -> bool:
+        from app.database import AsyncSessionLocal
+
+        async with AsyncSessionLocal() as db:
+            people_version, records_version = await self._versions(db)
+            if self.matrix is not None and people_version == self._people_version:
+                if records_version == self._records_version:
+                    return False
+                previous = self._records_version
+                model = self.attendance_model
+                # Registros nuevos o modificados: se aplican solo las filas cambiadas (si hubo borrados se recarga)
+                query = select(self.person_column, model.semana, model.estado, model.id, model.created_at)
+                if previous[1] is not None:
+                    query = query.where(or_(self._record_timestamp() >= previous[1] - SYNC_OVERLAP, model.id > previous[2]))
+                changed = (await db.execute(query.order_by(model.id))).all()
+                new_records = [record[3:] for record in changed if new_record(record[3], record[4], previous)]
+                if only_additions(previous, records_version, new_records):
+                    self._apply(self.matrix, changed)
+                    self._records_version = records_version
+                    return True
+
+            week_keys = [week["semana_key"] for week in load_calendar()]
+            previous = self.matrix
+            self.matrix = await self._load(db, week_keys)
+            if previous is not None:
+                # La versión sigue creciendo entre recargas completas (los cachés derivados la usan de clave)
+                self.matrix.version = max(self.matrix.version, previous.version + 1)
+            self._people_version, self._records_version = people_version, records_version
+            print(f"[ANALYTICS] Matriz de asistencia de {self.name}: {self.matrix.shape[0]} × {self.matrix.shape[1]}")
+            return True
+
+    async def watch(self, interval: int):
+        """Revisa periódicamente los cambios hechos fuera de la app"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"[ANALYTICS] Error al sincronizar la asistencia de {self.name}: {e}")
+
+student_attendance = AttendanceMatrixStore(
+    "estudiantes", Estudiante, AsistenciaEstudiante, AsistenciaEstudiante.estudiante_id, with_course=True
+)
+tutor_attendance = AttendanceMatrixStore(
+    "tutores", Tutor, AsistenciaTutor, AsistenciaTutor.tutor_id, with_course=False
+)
+
+# Qué objetos (con mark_stale) quedan desactualizados cuando se escribe cada tabla
+_STALE_ON_WRITE: Dict[object, list] = {}
+
+def invalidate_on_write(target, *models):
+    """Marca `target` como desactualizado cuando se confirma una escritura en cualquiera de `models`"""
+    for model in models:
+        _STALE_ON_WRITE.setdefault(model.__table__, []).append(target)
+
+invalidate_on_write(student_attendance, Estudiante, AsistenciaEstudiante, Equipo)
+invalidate_on_write(tutor_attendance, Tutor, AsistenciaTutor, Equipo)
+
+def _pending(session) -> set:
+    return session.info.setdefault("analytics_pending", set())
+
+@event.listens_for(Session, "after_flush")
+def _track_flush(session, flush_context):
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        table = getattr(type(instance), "__table__", None)
+        _pending(session).update(_STALE_ON_WRITE.get(table, ()))
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_bulk(orm_execute_state):
+    # UPDATE/DELETE masivos (ej. /bulk-deactivate) no pasan por el flush
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = orm_execute_state.bind_mapper.local_table if orm_execute_state.bind_mapper else None
+        _pending(orm_execute_state.session).update(_STALE_ON_WRITE.get(table, ()))
+
+@event.listens_for(Session, "after_commit")
+def _mark_committed(session):
+    for target in session.info.pop("analytics_pending", ()):
+        target.mark_stale()
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session):
+    session.info.pop("analytics_pending", None)
@@ -0,0 +1,123 @@
+"""
+Relación entre asistencia y logro: por estudiante activo, su porcentaje de asistencia (matriz en
+memoria) contra su logro promedio en tickets y en pruebas de unidad.
+
+El logro promedio sale de una consulta agrupada por estudiante y tipo (resultado convertido a
+porcentaje en SQL); el resto son arreglos columnares alineados con las filas de la matriz. La
+correlación por equipo se calcula para todos los equipos a la vez con sumas por grupo
+(np.bincount), sin recorrer estudiantes.
+"""
+from sqlalchemy import func, select
+from app.analytics.attendance_matrix import AttendanceMatrix
+from app.analytics.scores import score_case
+from app.models.tickets import TicketEstudiante, EstadoTicket
+from app.models.prueba_unidad import PruebaUnidadEstudiante, PorcentajeLogro
+import numpy as np
+
+# Tramos de asistencia (%) para los promedios de logro
+ATTENDANCE_BINS = np.array([0, 50, 60, 70, 80, 90, 100])
+
+# Mínimo de estudiantes para informar una correlación
+MIN_CORRELATION_STUDENTS = 5
+
+ACHIEVEMENTS = {
+    "tickets": (TicketEstudiante, EstadoTicket),
+    "unidad": (PruebaUnidadEstudiante, PorcentajeLogro),
+}
+
+async def achievement_by_student(db, matrix: AttendanceMatrix, tipo: str):
+    """Logro promedio por fila de la matriz (NaN si el estudiante no tiene resultados)"""
+    model, levels = ACHIEVEMENTS[tipo]
+    points = score_case(model.resultado, levels)
+    grouped = (await db.execute(
+        select(model.estudiante_id, func.avg(points)).group_by(model.estudiante_id).having(func.count(points) > 0)
+    )).all()
+
+    achievement = np.full(len(matrix.person_ids), np.nan)
+    if grouped:
+        rows = matrix.rows_for([row[0] for row in grouped])
+        means = np.fromiter((row[1] for row in grouped), dtype=np.float64, count=len(grouped))
+        known = rows >= 0
+        achievement[rows[known]] = means[known]
+    return achievement
+
+def grouped_pearson(groups, groups_count: int, x, y):
+    """Coeficiente de Pearson por grupo a partir de sumas (n, Σx, Σy, Σx², Σy², Σxy)"""
+    def total(values):
+        return np.bincount(groups, weights=values, minlength=groups_count)
+
+    n = np.bincount(groups, minlength=groups_count).astype(np.float64)
+    sum_x, sum_y = total(x), total(y)
+    covariance = n * total(x * y) - sum_x * sum_y
+    variance = (n * total(x * x) - sum_x ** 2) * (n * total(y * y) - sum_y ** 2)
+    valid = (n >= MIN_CORRELATION_STUDENTS) & (variance > 1e-9)
+    return np.divide(covariance, np.sqrt(np.where(valid, variance, 1)), out=np.full(groups_count, np.nan), where=valid)
+
+def ranks(values):
+    """Rango de cada valor (promedio en empates), para la correlación de Spearman"""
+    order = np.argsort(values, kind="stable")
+    sorted_values = values[order]
+    # Primer y último índice de cada bloque de valores iguales
+    starts = np.flatnonzero(np.r_[True, sorted_values[1:] != sorted_values[:-1]])
+    ends = np.r_[starts[1:], len(values)]
+    block = np.repeat(np.arange(len(starts)), ends - starts)
+    result = np.empty(len(values))
+    result[order] = ((starts + ends - 1) / 2)[block]
+    return result
+
+def rounded(value, digits: int = 3):
+    return None if value is None or np.isnan(value) else round(float(value), digits)
+
+def correlation_report(matrix: AttendanceMatrix, mask, attendance, achievement) -> dict:
+    """Correlaciones, pendiente y promedios por tramo y por equipo para un tipo de logro"""
+    valid = mask & ~np.isnan(achievement)
+    x, y = attendance[valid], achievement[valid]
+    count = len(x)
+    single = np.zeros(count, dtype=np.int64)
+
+    pearson = grouped_pearson(single, 1, x, y)[0] if count else np.nan
+    spearman = grouped_pearson(single, 1, ranks(x), ranks(y))[0] if count else np.nan
+    slope = None
+    if count >= MIN_CORRELATION_STUDENTS and np.var(x) > 1e-9:
+        # Puntos de logro por cada 10 puntos de asistencia (regresión lineal simple)
+        slope = rounded(np.polyfit(x, y, 1)[0] * 10, 2)
+
+    bin_index = np.clip(np.digitize(x, ATTENDANCE_BINS[1:-1]), 0, len(ATTENDANCE_BINS) - 2)
+    bins_count = len(ATTENDANCE_BINS) - 1
+    bin_students = np.bincount(bin_index, minlength=bins_count)
+    bin_attendance = np.bincount(bin_index, weights=x, minlength=bins_count)
+    bin_achievement = np.bincount(bin_index, weights=y, minlength=bins_count)
+
+    team_rows = matrix.equipo_rows[valid]
+    teams_count = len(matrix.equipos)
+    team_students = np.bincount(team_rows, minlength=teams_count)
+    team_pearson = grouped_pearson(team_rows, teams_count, x, y)
+    team_attendance = np.bincount(team_rows, weights=x, minlength=teams_count)
+    team_achievement = np.bincount(team_rows, weights=y, minlength=teams_count)
+
+    return {
+        "students": count,
+        "pearson": rounded(pearson),
+        "spearman": rounded(spearman),
+        "slope_per_10_points": slope,
+        "bins": [
+            {
+                "from": int(ATTENDANCE_BINS[position]),
+                "to": int(ATTENDANCE_BINS[position + 1]),
+                "students": int(bin_students[position]),
+                "mean_attendance": rounded(bin_attendance[position] / bin_students[position], 2) if bin_students[position] else None,
+                "mean_achievement": rounded(bin_achievement[position] / bin_students[position], 2) if bin_students[position] else None
+            }
+            for position in range(bins_count)
+        ],
+        "teams": [
+            {
+                "equipo_id": equipo_id,
+                "students": int(team_students[position]),
+                "pearson": rounded(team_pearson[position]),
+                "mean_attendance": rounded(team_attendance[position] / team_students[position], 2),
+                "mean_achievement": rounded(team_achievement[position] / team_students[position], 2)
+            }
+            for position, equipo_id in enumerate(matrix.equipos.tolist()) if team_students[position]
+        ]
+    }
@@ -0,0 +1,247 @@
+"""
+Drill-down programa → colegio → equipo → estudiante con agregados precalculados por nivel.
+
+Cada nodo entrega sus propios agregados (asistencia, logro promedio en tickets y pruebas,
+estudiantes activos y desertores, tutores activos) y los de sus hijos. Los totales por equipo,
+colegio y programa se precalculan al sincronizar, así cada consulta solo arma la respuesta del
+nodo y sus hijos (O(hijos)):
+
+- Asistencia y estado activo vienen de la matriz en memoria (que ya se sincroniza por cambios).
+- El logro se guarda por estudiante (suma y cantidad de resultados por tipo). Tras una escritura
+  solo se recalculan los estudiantes con resultados modificados desde la última sincronización;
+  si hubo borrados se recarga completo, igual que la matriz.
+- Los totales por nivel se suman con np.bincount desde los arreglos por estudiante.
+"""
+from sqlalchemy import func, or_, select
+from typing import Dict, List, Optional
+from app.analytics.attendance_matrix import (
+    ANALYTICS_REFRESH_SECONDS, SYNC_OVERLAP, AttendanceMatrix, invalidate_on_write, new_record, only_additions,
+    percentage, records_version_columns, student_attendance
+)
+from app.analytics.mastery import ASSESSMENTS
+from app.analytics.scores import score_case
+from app.models.equipo import Equipo
+from app.models.school import Colegio
+from app.models.tutor import Tutor
+import asyncio
+import numpy as np
+import time
+
+MASTERY_TYPES = tuple(ASSESSMENTS)
+
+# Columnas de los vectores de totales de cada nodo
+TOTALS = ("students", "active", "tutors", "attended", "recorded") + tuple(
+    f"{tipo}_{part}" for tipo in MASTERY_TYPES for part in ("sum", "count")
+)
+COLUMN = {name: position for position, name in enumerate(TOTALS)}
+
+SIN_COLEGIO = 0  # id del nodo que agrupa a los equipos sin colegio
+
+def summary(totals, leaf: bool = False) -> dict:
+    """Agregados de un nodo a partir de su vector de totales (un estudiante no lleva conteos)"""
+    result = {} if leaf else {
+        "students": int(totals[COLUMN["students"]]),
+        "active_students": int(totals[COLUMN["active"]]),
+        "deserted_students": int(totals[COLUMN["students"]] - totals[COLUMN["active"]]),
+        "tutors": int(totals[COLUMN["tutors"]]),
+    }
+    result["attendance_percentage"] = round(float(percentage(totals[COLUMN["attended"]], totals[COLUMN["recorded"]])), 2)
+    result["mastery"] = {
+        tipo: round(float(totals[COLUMN[f"{tipo}_sum"]] / totals[COLUMN[f"{tipo}_count"]]), 2)
+        if totals[COLUMN[f"{tipo}_count"]] else None
+        for tipo in MASTERY_TYPES
+    }
+    return result
+
+class MasteryColumns:
+    """Suma y cantidad de resultados por estudiante (filas de la matriz) y tipo de evaluación"""
+
+    def __init__(self, matrix: AttendanceMatrix):
+        self.matrix = matrix
+        self.sums = np.zeros((len(matrix.person_ids), len(MASTERY_TYPES)))
+        self.counts = np.zeros((len(matrix.person_ids), len(MASTERY_TYPES)), dtype=np.int64)
+        self.versions: Dict[str, tuple] = {}
+
+    def apply(self, position: int, grouped):
+        if not grouped:
+            return
+        rows = self.matrix.rows_for([row[0] for row in grouped])
+        known = rows >= 0
+        self.sums[rows[known], position] = np.fromiter((row[1] or 0 for row in grouped), dtype=np.float64, count=len(grouped))[known]
+        self.counts[rows[known], position] = np.fromiter((row[2] for row in grouped), dtype=np.int64, count=len(grouped))[known]
+
+class DrilldownTree:
+    """Agregados precalculados de programa, colegios y equipos, más las filas de estudiantes por equipo"""
+
+    def __init__(self, matrix: AttendanceMatrix, mastery: MasteryColumns, equipos, colegios, tutors_per_team: Dict[int, int]):
+        self.matrix = matrix
+        self.version = matrix.version
+        self.computed_at = time.monotonic()
+
+        # Totales por estudiante: (personas, columnas de TOTALS)
+        attended, _, recorded = matrix.person_stats()
+        student_totals = np.zeros((len(matrix.person_ids), len(TOTALS)))
+        student_totals[:, COLUMN["students"]] = 1
+        student_totals[:, COLUMN["active"]] = matrix.active
+        student_totals[:, COLUMN["attended"]] = attended
+        student_totals[:, COLUMN["recorded"]] = recorded
+        for position, tipo in enumerate(MASTERY_TYPES):
+            student_totals[:, COLUMN[f"{tipo}_sum"]] = mastery.sums[:, position]
+            student_totals[:, COLUMN[f"{tipo}_count"]] = mastery.counts[:, position]
+        self.student_totals = student_totals
+
+        # Equipos: todos los de la tabla, aunque no tengan estudiantes
+        self.equipos = {equipo_id: (nombre, colegio_id or SIN_COLEGIO) for equipo_id, nombre, colegio_id in equipos}
+        self.colegios = {colegio_id: nombre for colegio_id, nombre in colegios}
+        if any(colegio_id == SIN_COLEGIO for _, colegio_id in self.equipos.values()):
+            self.colegios[SIN_COLEGIO] = "Sin colegio"
+
+        equipo_ids = list(self.equipos)
+        equipo_position = {equipo_id: position for position, equipo_id in enumerate(equipo_ids)}
+        team_totals = np.zeros((len(equipo_ids), len(TOTALS)))
+        student_teams = np.fromiter((equipo_position.get(equipo_id, -1) for equipo_id in matrix.equipo_ids.tolist()),
+                                    dtype=np.int64, count=len(matrix.person_ids))
+        known = student_teams >= 0
+        for column in range(len(TOTALS)):
+            team_totals[:, column] = np.bincount(student_teams[known], weights=student_totals[known, column], minlength=len(equipo_ids))
+        team_totals[:, COLUMN["tutors"]] = [tutors_per_team.get(equipo_id, 0) for equipo_id in equipo_ids]
+        self.team_totals = {equipo_id: team_totals[position] for position, equipo_id in enumerate(equipo_ids)}
+
+        # Filas de estudiantes de cada equipo, ordenadas por nombre
+        order = np.lexsort((np.array(matrix.names, dtype=object).astype(str), student_teams))
+        self.team_students: Dict[int, np.ndarray] = {}
+        bounds = np.searchsorted(student_teams[order], np.arange(len(equipo_ids) + 1))
+        for position, equipo_id in enumerate(equipo_ids):
+            self.team_students[equipo_id] = order[bounds[position]:bounds[position + 1]]
+
+        self.school_teams: Dict[int, List[int]] = {colegio_id: [] for colegio_id in self.colegios}
+        for equipo_id, (_, colegio_id) in self.equipos.items():
+            self.school_teams.setdefault(colegio_id, []).append(equipo_id)
+        self.school_totals = {
+            colegio_id: sum((self.team_totals[equipo_id] for equipo_id in teams), np.zeros(len(TOTALS)))
+            for colegio_id, teams in self.school_teams.items()
+        }
+        self.program_totals = team_totals.sum(axis=0) if len(equipo_ids) else np.zeros(len(TOTALS))
+
+        # Agregados ya armados de cada nodo de grupo
+        self.program = summary(self.program_totals)
+        self.schools = {colegio_id: summary(totals) for colegio_id, totals in self.school_totals.items()}
+        self.teams = {equipo_id: summary(totals) for equipo_id, totals in self.team_totals.items()}
+
+    def school_node(self, colegio_id: int) -> dict:
+        return {"nivel": "colegio", "id": colegio_id, "nombre": self.colegios[colegio_id], **self.schools[colegio_id]}
+
+    def team_node(self, equipo_id: int) -> dict:
+        nombre, colegio_id = self.equipos[equipo_id]
+        return {"nivel": "equipo", "id": equipo_id, "nombre": nombre, "colegio_id": colegio_id, **self.teams[equipo_id]}
+
+    def student_node(self, row: int) -> dict:
+        matrix = self.matrix
+        return {
+            "nivel": "estudiante",
+            "id": int(matrix.person_ids[row]),
+            "nombre": matrix.names[row],
+            "curso": matrix.cursos[row],
+            "equipo_id": int(matrix.equipo_ids[row]),
+            "activo": bool(matrix.active[row]),
+            **summary(self.student_totals[row], leaf=True),
+        }
+
+    def node(self, nivel: str, node_id: Optional[int]) -> Optional[dict]:
+        """Nodo con sus agregados y los de sus hijos; None si no existe"""
+        if nivel == "programa":
+            children = [self.school_node(colegio_id) for colegio_id in sorted(self.colegios, key=lambda key: self.colegios[key])]
+            return {"nivel": "programa", "id": None, "nombre": "Programa", **self.program, "children": children}
+        if nivel == "colegio" and node_id in self.colegios:
+            teams = sorted(self.school_teams.get(node_id, []), key=lambda key: self.equipos[key][0])
+            return {**self.school_node(node_id), "children": [self.team_node(equipo_id) for equipo_id in teams]}
+        if nivel == "equipo" and node_id in self.equipos:
+            rows = self.team_students[node_id].tolist()
+            return {**self.team_node(node_id), "children": [self.student_node(row) for row in rows]}
+        if nivel == "estudiante" and node_id is not None:
+            row = int(self.matrix.rows_for([node_id])[0])
+            return {**self.student_node(row), "children": []} if row >= 0 else None
+        return None
+
+class DrilldownStore:
+    """Mantiene el DrilldownTree; recalcula el logro solo de los estudiantes con resultados modificados"""
+
+    def __init__(self):
+        self.tree: Optional[DrilldownTree] = None
+        self.mastery: Optional[MasteryColumns] = None
+        self.stale = True
+        self._lock = None
+
+    def mark_stale(self):
+        self.stale = True
+
+    def _expired(self, matrix: AttendanceMatrix) -> bool:
+        tree = self.tree
+        if tree is None or self.stale or tree.matrix is not matrix or tree.version != matrix.version:
+            return True
+        return ANALYTICS_REFRESH_SECONDS > 0 and time.monotonic() - tree.computed_at > ANALYTICS_REFRESH_SECONDS
+
+    async def get(self) -> DrilldownTree:
+        matrix = await student_attendance.get()
+        if not self._expired(matrix):
+            return self.tree
+
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            matrix = await student_attendance.get()
+            if self._expired(matrix):
+                self.stale = False
+                try:
+                    self.tree = await self._build(matrix)
+                except Exception:
+                    self.stale = True
+                    raise
+            return self.tree
+
+    async def _sync_mastery(self, db, matrix: AttendanceMatrix):
+        # Las filas de la matriz cambian al recargarla completa: ahí el logro se recalcula entero
+        mastery = self.mastery if self.mastery is not None and self.mastery.matrix is matrix else MasteryColumns(matrix)
+        for position, tipo in enumerate(MASTERY_TYPES):
+            model = ASSESSMENTS[tipo][0]
+            timestamp = func.coalesce(model.updated_at, model.created_at)
+            version = tuple((await db.execute(select(*records_version_columns(model, timestamp)))).one())
+            previous = mastery.versions.get(tipo)
+            if version == previous:
+                continue
+
+            points = score_case(model.resultado, model.resultado.type.enum_class)
+            query = select(model.estudiante_id, func.sum(points), func.count(points)).group_by(model.estudiante_id)
+            incremental = False
+            if previous is not None and previous[1] is not None:
+                candidates = (await db.execute(
+                    select(model.id, model.created_at).where(or_(model.id > previous[2], model.created_at > previous[1]))
+                )).all()
+                new_records = [tuple(record) for record in candidates if new_record(record[0], record[1], previous)]
+                incremental = only_additions(previous, version, new_records)
+            if incremental:
+                # Solo los estudiantes con resultados creados o modificados desde la última sincronización
+                changed = select(model.estudiante_id).where(or_(timestamp >= previous[1] - SYNC_OVERLAP, model.id > previous[2]))
+                query = query.where(model.estudiante_id.in_(changed))
+            else:
+                mastery.sums[:, position] = 0
+                mastery.counts[:, position] = 0
+            mastery.apply(position, (await db.execute(query)).all())
+            mastery.versions[tipo] = version
+        self.mastery = mastery
+        return mastery
+
+    async def _build(self, matrix: AttendanceMatrix) -> DrilldownTree:
+        from app.database import AsyncSessionLocal
+
+        async with AsyncSessionLocal() as db:
+            mastery = await self._sync_mastery(db, matrix)
+            equipos = (await db.execute(select(Equipo.id, Equipo.nombre, Equipo.colegio_id))).all()
+            colegios = (await db.execute(select(Colegio.id, Colegio.nombre))).all()
+            tutors_per_team = dict((await db.execute(
+                select(Tutor.equipo_id, func.count()).where(func.coalesce(Tutor.activo, True)).group_by(Tutor.equipo_id)
+            )).all())
+        return DrilldownTree(matrix, mastery, equipos, colegios, tutors_per_team)
+
+drilldown_store = DrilldownStore()
+invalidate_on_write(drilldown_store, Colegio, Equipo, Tutor, *(model for model, _ in ASSESSMENTS.values()))
@@ -0,0 +1,133 @@
+"""
+Ganancia de aprendizaje: prueba de unidad (post) menos prueba diagnóstico (pre) del mismo
+estudiante, unidad y módulo.
+
+Las dos tablas se cruzan en una sola consulta por (estudiante_id, unidad, modulo), con los
+resultados ya convertidos a porcentaje en SQL; solo cuentan los pares con ambos resultados. Las
+distribuciones (promedio, cuartiles y porcentaje que mejora) por estudiante, equipo y módulo se
+calculan vectorizadas con NumPy, ordenando una vez por grupo.
+"""
+from sqlalchemy import and_, select
+from typing import List, Optional
+from app.analytics.mastery import student_filters
+from app.analytics.scores import score_case
+from app.curriculum import curriculum_catalog
+from app.models.student import Estudiante
+from app.models.prueba_diagnostico import PruebaDiagnosticoEstudiante, PorcentajeLogro as PorcentajeLogroDiagnostico
+from app.models.prueba_unidad import PruebaUnidadEstudiante, PorcentajeLogro as PorcentajeLogroUnidad
+import numpy as np
+
+# Bordes del histograma de ganancia promedio por estudiante (puntos porcentuales)
+GAIN_BINS = np.arange(-100, 101, 20)
+
+class GainPairs:
+    """Pares pre/post como columnas NumPy"""
+
+    def __init__(self, rows):
+        self.student_ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+        self.equipo_ids = np.fromiter((row[1] for row in rows), dtype=np.int64, count=len(rows))
+        self.modules = [(row[2], row[3]) for row in rows]
+        self.pre = np.fromiter((row[4] for row in rows), dtype=np.float64, count=len(rows))
+        self.post = np.fromiter((row[5] for row in rows), dtype=np.float64, count=len(rows))
+        self.gain = self.post - self.pre
+
+    def __len__(self):
+        return len(self.gain)
+
+async def load_gain_pairs(db, equipo_id: Optional[int], colegio_id: Optional[int], unidad: Optional[str]) -> GainPairs:
+    pre, post = PruebaDiagnosticoEstudiante, PruebaUnidadEstudiante
+    pre_score = score_case(pre.resultado, PorcentajeLogroDiagnostico)
+    post_score = score_case(post.resultado, PorcentajeLogroUnidad)
+    query = student_filters(
+        select(pre.estudiante_id, Estudiante.equipo_id, pre.unidad, pre.modulo, pre_score, post_score)
+        .join(post, and_(post.estudiante_id == pre.estudiante_id, post.unidad == pre.unidad, post.modulo == pre.modulo))
+        .join(Estudiante, Estudiante.id == pre.estudiante_id)
+        .where(pre.resultado != PorcentajeLogroDiagnostico.VACIO, post.resultado != PorcentajeLogroUnidad.VACIO),
+        equipo_id, colegio_id, "equipo"
+    )
+    if unidad:
+        query = query.where(pre.unidad == unidad)
+    return GainPairs((await db.execute(query)).all())
+
+def group_distribution(groups, groups_count: int, pairs: GainPairs) -> dict:
+    """
+    Distribución de la ganancia por grupo (`groups` = índice de grupo de cada par). Los cuartiles
+    salen de un solo ordenamiento por (grupo, ganancia), interpolando como np.percentile.
+    """
+    counts = np.bincount(groups, minlength=groups_count)
+    safe_counts = np.maximum(counts, 1)
+    order = np.lexsort((pairs.gain, groups))
+    sorted_gain = pairs.gain[order]
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    def quantile(q):
+        position = starts + (safe_counts - 1) * q
+        low = np.floor(position).astype(np.int64)
+        high = np.minimum(low + 1, starts + safe_counts - 1)
+        fraction = position - low
+        return sorted_gain[low] * (1 - fraction) + sorted_gain[high] * fraction
+
+    return {
+        "pairs": counts,
+        "mean_pre": np.bincount(groups, weights=pairs.pre, minlength=groups_count) / safe_counts,
+        "mean_post": np.bincount(groups, weights=pairs.post, minlength=groups_count) / safe_counts,
+        "mean_gain": np.bincount(groups, weights=pairs.gain, minlength=groups_count) / safe_counts,
+        "p25_gain": quantile(0.25),
+        "median_gain": quantile(0.5),
+        "p75_gain": quantile(0.75),
+        "improved_rate": np.bincount(groups, weights=pairs.gain > 0, minlength=groups_count) / safe_counts * 100,
+        "declined_rate": np.bincount(groups, weights=pairs.gain < 0, minlength=groups_count) / safe_counts * 100,
+    }
+
+def distribution_rows(keys: List[dict], distribution: dict) -> List[dict]:
+    """Una fila por grupo: la clave del grupo más sus métricas redondeadas"""
+    rows = []
+    for position, key in enumerate(keys):
+        row = dict(key)
+        for name, values in distribution.items():
+            row[name] = int(values[position]) if name == "pairs" else round(float(values[position]), 2)
+        rows.append(row)
+    return rows
+
+def learning_gain_report(pairs: GainPairs, include_students: bool) -> dict:
+    if not len(pairs):
+        return {"overall": None, "teams": [], "modules": [], "student_histogram": [], "students": [] if include_students else None}
+
+    overall = distribution_rows([{}], group_distribution(np.zeros(len(pairs), dtype=np.int64), 1, pairs))[0]
+
+    teams, team_groups = np.unique(pairs.equipo_ids, return_inverse=True)
+    team_rows = distribution_rows(
+        [{"equipo_id": equipo_id} for equipo_id in teams.tolist()],
+        group_distribution(team_groups, len(teams), pairs)
+    )
+
+    # Módulos en el orden del catálogo (los que no están en el catálogo al final)
+    catalog = curriculum_catalog.index
+    module_keys = sorted(set(pairs.modules), key=lambda key: (catalog.pair_index.get(key, len(catalog.pairs)), key))
+    module_position = {key: position for position, key in enumerate(module_keys)}
+    module_groups = np.fromiter((module_position[key] for key in pairs.modules), dtype=np.int64, count=len(pairs))
+    module_rows = distribution_rows(
+        [{"unidad": unidad, "modulo": modulo} for unidad, modulo in module_keys],
+        group_distribution(module_groups, len(module_keys), pairs)
+    )
+
+    students, student_groups = np.unique(pairs.student_ids, return_inverse=True)
+    student_distribution = group_distribution(student_groups, len(students), pairs)
+    histogram, _ = np.histogram(np.clip(student_distribution["mean_gain"], GAIN_BINS[0], GAIN_BINS[-1]), bins=GAIN_BINS)
+
+    student_rows = None
+    if include_students:
+        student_rows = distribution_rows(
+            [{"student_id": student_id} for student_id in students.tolist()], student_distribution
+        )
+
+    return {
+        "overall": overall,
+        "teams": team_rows,
+        "modules": module_rows,
+        "student_histogram": [
+            {"from": int(GAIN_BINS[position]), "to": int(GAIN_BINS[position + 1]), "students": int(total)}
+            for position, total in enumerate(histogram.tolist())
+        ],
+        "students": student_rows
+    }
@@ -0,0 +1,96 @@
+"""
+Distribución de resultados por módulo (tickets, prueba diagnóstico y prueba de unidad).
+
+Una consulta agrupada por tipo de evaluación cuenta los registros por (unidad, módulo, equipo o
+colegio, resultado) usando el índice cubriente ix_*_mastery; el promedio de logro y la tasa de
+completitud se calculan en Python sobre esas pocas filas agregadas, sin traer registros
+individuales. Solo se consideran estudiantes activos.
+"""
+from sqlalchemy import func, select
+from typing import Dict, List, Optional
+from app.analytics.scores import LOGRO_LEVELS, TICKET_LEVELS, VACIO, score
+from app.curriculum import curriculum_catalog
+from app.models.equipo import Equipo
+from app.models.student import Estudiante
+from app.models.tickets import TicketEstudiante
+from app.models.prueba_diagnostico import PruebaDiagnosticoEstudiante
+from app.models.prueba_unidad import PruebaUnidadEstudiante
+
+# tipo -> (modelo, niveles de resultado en orden descendente)
+ASSESSMENTS = {
+    "tickets": (TicketEstudiante, TICKET_LEVELS),
+    "diagnostico": (PruebaDiagnosticoEstudiante, LOGRO_LEVELS),
+    "unidad": (PruebaUnidadEstudiante, LOGRO_LEVELS),
+}
+
+GROUP_BY = {"equipo": Estudiante.equipo_id, "colegio": Equipo.colegio_id}
+
+def student_filters(query, equipo_id: Optional[int], colegio_id: Optional[int], por: str):
+    """Estudiantes activos del equipo/colegio pedido; agrega el join a equipos si hace falta"""
+    if por == "colegio" or colegio_id is not None:
+        query = query.join(Equipo, Equipo.id == Estudiante.equipo_id)
+    query = query.where(func.coalesce(Estudiante.activo, True))
+    if equipo_id is not None:
+        query = query.where(Estudiante.equipo_id == equipo_id)
+    if colegio_id is not None:
+        query = query.where(Equipo.colegio_id == colegio_id)
+    return query
+
+async def students_per_group(db, por: str, equipo_id: Optional[int], colegio_id: Optional[int]) -> Dict[Optional[int], int]:
+    group = GROUP_BY[por]
+    query = student_filters(select(group, func.count()).select_from(Estudiante), equipo_id, colegio_id, por)
+    return dict((await db.execute(query.group_by(group))).all())
+
+async def mastery_report(db, tipo: str, por: str, unidad: Optional[str],
+                         equipo_id: Optional[int], colegio_id: Optional[int]) -> List[dict]:
+    """Conteo por nivel y logro promedio por (unidad, módulo, grupo) de un tipo de evaluación"""
+    model, levels = ASSESSMENTS[tipo]
+    group = GROUP_BY[por]
+    query = student_filters(
+        select(model.unidad, model.modulo, group, model.resultado, func.count())
+        .join(Estudiante, Estudiante.id == model.estudiante_id),
+        equipo_id, colegio_id, por
+    )
+    if unidad:
+        query = query.where(model.unidad == unidad)
+    grouped = (await db.execute(query.group_by(model.unidad, model.modulo, group, model.resultado))).all()
+
+    entries: Dict[tuple, dict] = {}
+    for unidad_key, modulo_key, group_id, resultado, total in grouped:
+        entry = entries.get((unidad_key, modulo_key, group_id))
+        if entry is None:
+            entry = entries[(unidad_key, modulo_key, group_id)] = {
+                "unidad": unidad_key,
+                "modulo": modulo_key,
+                f"{por}_id": group_id,
+                "counts": dict.fromkeys(levels, 0)
+            }
+        entry["counts"][resultado.value] += total
+
+    catalog = curriculum_catalog.index
+    report = []
+    for (unidad_key, modulo_key, group_id), entry in entries.items():
+        counts = entry["counts"]
+        graded = sum(total for level, total in counts.items() if level != VACIO)
+        achievement = sum(score(level) * total for level, total in counts.items() if level != VACIO)
+        position = catalog.pair_index.get((unidad_key, modulo_key))
+        pair = catalog.pairs[position] if position is not None else None
+        entry.update({
+            "unidad_nombre": pair.unidad_nombre if pair else unidad_key,
+            "modulo_nombre": pair.modulo_nombre if pair else modulo_key,
+            "graded": graded,
+            "mean_achievement": round(achievement / graded, 2) if graded else None
+        })
+        report.append((position if position is not None else len(catalog.pairs), unidad_key, modulo_key, group_id or 0, entry))
+
+    # Orden del programa (unidad y módulo del catálogo); los que ya no están en el catálogo al final
+    report.sort(key=lambda item: item[:4])
+    return [entry for *_, entry in report]
+
+def add_completion(report: List[dict], students: Dict[Optional[int], int], por: str) -> List[dict]:
+    """Estudiantes activos del grupo y porcentaje de ellos con resultado en cada módulo"""
+    for entry in report:
+        group_students = students.get(entry[f"{por}_id"], 0)
+        entry["students"] = group_students
+        entry["completion_rate"] = round(min(entry["graded"] / group_students, 1) * 100, 2) if group_students else 0
+    return report
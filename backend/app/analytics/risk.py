@@ -0,0 +1,209 @@
+"""
+Alerta temprana de deserción: puntaje de riesgo por estudiante.
+
+Combina cuatro señales, todas calculadas de forma vectorizada sobre el programa completo:
+- Racha de inasistencias: semanas seguidas "no asistió" en el orden del calendario (gaps and
+  islands con sumas acumuladas). Las semanas suspendidas, de vacaciones o sin registro no cortan
+  ni alargan la racha.
+- Tendencia: asistencia de las últimas RISK_RECENT_WEEKS semanas con registros contra la de las
+  semanas anteriores; solo cuenta la caída.
+- Tickets pendientes: módulos que el equipo ya trabajó (algún ticket con resultado) en los que
+  el estudiante no tiene ticket con resultado.
+- Pruebas de unidad bajo RISK_LOW_SCORE. La prueba diagnóstico no se usa: es la medición previa
+  a la tutoría y un resultado bajo ahí es esperable.
+
+El resultado se guarda en caché hasta la siguiente escritura (asistencia, tickets o pruebas) o
+hasta ANALYTICS_REFRESH_SECONDS, para recoger cambios hechos fuera de la app.
+"""
+from sqlalchemy import func, select
+from typing import List, Optional
+from app.analytics.attendance_matrix import (
+    ANALYTICS_REFRESH_SECONDS, ASISTIO, NO_ASISTIO, AttendanceMatrix, invalidate_on_write, percentage, student_attendance
+)
+from app.analytics.scores import score
+from app.models.tickets import TicketEstudiante, EstadoTicket
+from app.models.prueba_unidad import PruebaUnidadEstudiante, PorcentajeLogro
+import asyncio
+import numpy as np
+import time
+
+RISK_STREAK_WEEKS = 3  # Racha con la que la señal de inasistencia llega al máximo
+RISK_RECENT_WEEKS = 4
+RISK_LOW_SCORE = 60.0
+
+# Peso de cada señal en el puntaje (0-100)
+RISK_WEIGHTS = {"racha": 0.35, "tendencia": 0.2, "tickets": 0.25, "pruebas": 0.2}
+
+# Puntaje mínimo de cada nivel, de mayor a menor
+RISK_LEVELS = (("alto", 60.0), ("medio", 35.0), ("bajo", 0.0))
+
+def absence_streaks(statuses):
+    """(racha actual, racha máxima) de inasistencias consecutivas por fila"""
+    absent = statuses == NO_ASISTIO
+    attended = statuses == ASISTIO
+    # Inasistencias acumuladas; en cada semana asistida la racha vuelve a partir desde ese acumulado
+    run = np.cumsum(absent, axis=1, dtype=np.int16)
+    reset = np.maximum.accumulate(np.where(attended, run, 0), axis=1)
+    streak = run - reset
+    if not streak.shape[1]:
+        empty = np.zeros(len(statuses), dtype=np.int16)
+        return empty, empty
+    return streak[:, -1], streak.max(axis=1)
+
+def attendance_trend(statuses, recent_weeks: int):
+    """Porcentaje de asistencia en las últimas `recent_weeks` semanas con registros y en las anteriores"""
+    recorded_weeks = np.flatnonzero((statuses != 0).any(axis=0))
+    end = int(recorded_weeks[-1]) + 1 if len(recorded_weeks) else 0
+    start = max(0, end - recent_weeks)
+
+    def rates(window):
+        attended = (window == ASISTIO).sum(axis=1)
+        classes = attended + (window == NO_ASISTIO).sum(axis=1)
+        return percentage(attended, classes), classes
+
+    recent, recent_classes = rates(statuses[:, start:end])
+    previous, previous_classes = rates(statuses[:, :start])
+    return recent, recent_classes, previous, previous_classes
+
+class RiskReport:
+    """Señales y puntaje de riesgo por fila de la matriz de asistencia de estudiantes"""
+
+    def __init__(self, matrix: AttendanceMatrix, missing_tickets, expected_tickets, low_pruebas, graded_pruebas):
+        self.matrix = matrix
+        self.version = matrix.version
+        self.computed_at = time.monotonic()
+
+        self.current_streak, self.max_streak = absence_streaks(matrix.statuses)
+        self.recent, recent_classes, self.previous, previous_classes = attendance_trend(matrix.statuses, RISK_RECENT_WEEKS)
+        self.has_trend = (recent_classes > 0) & (previous_classes > 0)
+        self.missing_tickets, self.expected_tickets = missing_tickets, expected_tickets
+        self.low_pruebas, self.graded_pruebas = low_pruebas, graded_pruebas
+
+        signals = {
+            "racha": np.minimum(self.current_streak / RISK_STREAK_WEEKS, 1.0),
+            "tendencia": np.where(self.has_trend, np.clip((self.previous - self.recent) / 100, 0, 1), 0.0),
+            "tickets": percentage(missing_tickets, expected_tickets) / 100,
+            "pruebas": percentage(low_pruebas, graded_pruebas) / 100,
+        }
+        self.scores = np.round(100 * sum(RISK_WEIGHTS[name] * signal for name, signal in signals.items()), 1)
+        self.levels = np.full(len(self.scores), len(RISK_LEVELS) - 1, dtype=np.int8)
+        for position in range(len(RISK_LEVELS) - 2, -1, -1):
+            self.levels[self.scores >= RISK_LEVELS[position][1]] = position
+
+    def reasons(self, row: int) -> List[str]:
+        reasons = []
+        if self.current_streak[row] >= 2:
+            reasons.append(f"{self.current_streak[row]} semanas seguidas sin asistir")
+        if self.has_trend[row] and self.previous[row] - self.recent[row] >= 20:
+            reasons.append(f"Asistencia reciente {self.recent[row]:.0f}% (antes {self.previous[row]:.0f}%)")
+        if self.missing_tickets[row]:
+            reasons.append(f"{self.missing_tickets[row]} de {self.expected_tickets[row]} tickets sin resultado")
+        if self.low_pruebas[row]:
+            reasons.append(f"{self.low_pruebas[row]} de {self.graded_pruebas[row]} pruebas de unidad bajo {RISK_LOW_SCORE:.0f}%")
+        return reasons
+
+    def student(self, row: int) -> dict:
+        matrix = self.matrix
+        return {
+            "student_id": int(matrix.person_ids[row]),
+            "student_name": matrix.names[row],
+            "course": matrix.cursos[row],
+            "equipo_id": int(matrix.equipo_ids[row]),
+            "score": float(self.scores[row]),
+            "level": RISK_LEVELS[self.levels[row]][0],
+            "current_streak": int(self.current_streak[row]),
+            "max_streak": int(self.max_streak[row]),
+            "recent_attendance": round(float(self.recent[row]), 2),
+            "previous_attendance": round(float(self.previous[row]), 2),
+            "missing_tickets": int(self.missing_tickets[row]),
+            "expected_tickets": int(self.expected_tickets[row]),
+            "low_pruebas": int(self.low_pruebas[row]),
+            "graded_pruebas": int(self.graded_pruebas[row]),
+            "reasons": self.reasons(row),
+        }
+
+async def ticket_signals(db, matrix: AttendanceMatrix):
+    """Tickets esperados (módulos trabajados por el equipo) y pendientes por estudiante"""
+    done = (await db.execute(
+        select(TicketEstudiante.estudiante_id, TicketEstudiante.unidad, TicketEstudiante.modulo)
+        .where(TicketEstudiante.resultado != EstadoTicket.VACIO)
+    )).all()
+    people = len(matrix.person_ids)
+    if not done:
+        return np.zeros(people, dtype=np.int64), np.zeros(people, dtype=np.int64)
+
+    rows = matrix.rows_for([row[0] for row in done])
+    _, modules = np.unique([f"{row[1]}/{row[2]}" for row in done], return_inverse=True)
+    known = rows >= 0
+    delivered = np.zeros((people, int(modules.max()) + 1), dtype=bool)
+    delivered[rows[known], modules[known]] = True
+
+    # Un módulo es esperado para todo el equipo apenas algún estudiante del equipo tiene resultado
+    team_delivered = np.zeros((len(matrix.equipos), delivered.shape[1]), dtype=np.int64)
+    np.add.at(team_delivered, matrix.equipo_rows, delivered)
+    expected = (team_delivered > 0)[matrix.equipo_rows]
+    return (expected & ~delivered).sum(axis=1), expected.sum(axis=1)
+
+async def prueba_signals(db, matrix: AttendanceMatrix):
+    """Pruebas de unidad rendidas y bajo RISK_LOW_SCORE por estudiante (una consulta agrupada)"""
+    grouped = (await db.execute(
+        select(PruebaUnidadEstudiante.estudiante_id, PruebaUnidadEstudiante.resultado, func.count())
+        .where(PruebaUnidadEstudiante.resultado != PorcentajeLogro.VACIO)
+        .group_by(PruebaUnidadEstudiante.estudiante_id, PruebaUnidadEstudiante.resultado)
+    )).all()
+    people = len(matrix.person_ids)
+    graded = np.zeros(people, dtype=np.int64)
+    low = np.zeros(people, dtype=np.int64)
+    if not grouped:
+        return low, graded
+
+    rows = matrix.rows_for([row[0] for row in grouped])
+    counts = np.array([row[2] for row in grouped], dtype=np.int64)
+    is_low = np.array([score(row[1]) < RISK_LOW_SCORE for row in grouped])
+    known = rows >= 0
+    np.add.at(graded, rows[known], counts[known])
+    np.add.at(low, rows[known & is_low], counts[known & is_low])
+    return low, graded
+
+class RiskEngine:
+    """Caché del RiskReport; se recalcula tras una escritura o si cambió la matriz de asistencia"""
+
+    def __init__(self):
+        self.report: Optional[RiskReport] = None
+        self.stale = True
+        self._lock = None
+
+    def mark_stale(self):
+        self.stale = True
+
+    def _expired(self, matrix: AttendanceMatrix) -> bool:
+        report = self.report
+        if report is None or self.stale or report.version != matrix.version or report.matrix is not matrix:
+            return True
+        return ANALYTICS_REFRESH_SECONDS > 0 and time.monotonic() - report.computed_at > ANALYTICS_REFRESH_SECONDS
+
+    async def get(self) -> RiskReport:
+        from app.database import AsyncSessionLocal
+
+        matrix = await student_attendance.get()
+        if not self._expired(matrix):
+            return self.report
+
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            matrix = await student_attendance.get()
+            if self._expired(matrix):
+                self.stale = False
+                try:
+                    async with AsyncSessionLocal() as db:
+                        missing, expected = await ticket_signals(db, matrix)
+                        low, graded = await prueba_signals(db, matrix)
+                    self.report = RiskReport(matrix, missing, expected, low, graded)
+                except Exception:
+                    self.stale = True
+                    raise
+            return self.report
+
+risk_engine = RiskEngine()
+invalidate_on_write(risk_engine, TicketEstudiante, PruebaUnidadEstudiante)
@@ -0,0 +1,35 @@
+"""
+Valores numéricos de los resultados de tickets y pruebas.
+
+Las pruebas diagnóstico y de unidad tienen cada una su enum PorcentajeLogro (mismos valores), así
+que se mapean por `.value`. "vacío" significa sin resultado y queda como NaN, no como 0.
+"""
+from sqlalchemy import case, null
+from app.models.tickets import EstadoTicket
+from app.models.prueba_unidad import PorcentajeLogro as PorcentajeLogroUnidad
+import numpy as np
+
+VACIO = "vacío"
+
+LOGRO_SCORES = {"100%": 100.0, "80%": 80.0, "60%": 60.0, "40%": 40.0, "20%": 20.0, "0%": 0.0, VACIO: np.nan}
+TICKET_SCORES = {"100%": 100.0, "80%": 80.0, VACIO: np.nan}
+
+# Niveles en orden descendente, como se muestran en los reportes
+LOGRO_LEVELS = [estado.value for estado in PorcentajeLogroUnidad]
+TICKET_LEVELS = [estado.value for estado in (EstadoTicket.CIEN_PORCIENTO, EstadoTicket.OCHENTA_PORCIENTO, EstadoTicket.VACIO)]
+
+def score(resultado) -> float:
+    """Porcentaje de logro de un resultado (enum o string); NaN si está vacío"""
+    value = getattr(resultado, "value", resultado)
+    return LOGRO_SCORES.get(value, TICKET_SCORES.get(value, np.nan))
+
+def scores(resultados) -> np.ndarray:
+    """score() sobre una columna completa de resultados"""
+    return np.fromiter((score(resultado) for resultado in resultados), dtype=np.float64, count=len(resultados))
+
+def score_case(column, levels_enum):
+    """CASE SQL que convierte un resultado (ticket o prueba) en su porcentaje; NULL si está vacío"""
+    return case(
+        *((column == estado, score(estado)) for estado in levels_enum if estado.value != VACIO),
+        else_=null()
+    )
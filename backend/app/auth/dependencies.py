@@ -1,7 +1,9 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.models.user import Usuario
 from app.auth.security import verify_token
 
@@ -28,12 +30,39 @@ def get_current_user(
     
     return user
 
+async def get_current_user_async(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+) -> Usuario:
+    """Versión asíncrona de get_current_user para endpoints "async def" """
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="No se pudieron validar las credenciales",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    
+    email = verify_token(credentials.credentials)
+    if email is None:
+        raise credentials_exception
+    
+    user = (await db.execute(select(Usuario).where(Usuario.email == email))).scalars().first()
+    if user is None:
+        raise credentials_exception
+    
+    return user
+
 def get_current_active_user(current_user: Usuario = Depends(get_current_user)) -> Usuario:
     """Obtiene el usuario actual activo"""
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Usuario inactivo")
     return current_user
 
+async def get_current_active_user_async(current_user: Usuario = Depends(get_current_user_async)) -> Usuario:
+    """Versión asíncrona de get_current_active_user"""
+    if not current_user.is_active:
+        raise HTTPException(status_code=400, detail="Usuario inactivo")
+    return current_user
+
 def get_admin_user(current_user: Usuario = Depends(get_current_active_user)) -> Usuario:
     """Obtiene un usuario administrador"""
     if current_user.rol != "admin":
@@ -43,6 +72,15 @@ def get_admin_user(current_user: Usuario = Depends(get_current_active_user)) ->
         )
     return current_user
 
+async def get_admin_user_async(current_user: Usuario = Depends(get_current_active_user_async)) -> Usuario:
+    """Versión asíncrona de get_admin_user"""
+    if current_user.rol != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="No tienes permisos de administrador"
+        )
+    return current_user
+
 def get_tutor_user(current_user: Usuario = Depends(get_current_active_user)) -> Usuario:
     """Obtiene un usuario tutor"""
     if current_user.rol != "tutor":
@@ -0,0 +1,199 @@
+"""
+Catálogo curricular (unidades y módulos) de tickets, prueba de diagnóstico y prueba de unidad.
+
+El catálogo vive en las tablas `unidades` y `modulos` y se carga en memoria como un
+CurriculumIndex inmutable: lista ordenada de pares (unidad, módulo) con su posición, para que
+las grillas y exportaciones ubiquen cada registro por índice en vez de recorrer dicts anidados.
+
+La versión es un hash del contenido. Un watcher revisa las tablas cada
+CURRICULUM_REFRESH_SECONDS y reemplaza el índice completo si la versión cambió, así un cambio
+en el currículo (por ejemplo desde DBeaver) no requiere redeploy. POST /admin/curriculum/reload
+fuerza la recarga inmediata.
+"""
+from sqlalchemy import select
+from types import MappingProxyType
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from app.utils.http_cache import PreserializedJSON
+import asyncio
+import hashlib
+import json
+import os
+
+CURRICULUM_REFRESH_SECONDS = int(os.getenv("CURRICULUM_REFRESH_SECONDS", "60"))  # 0 desactiva el watcher
+
+# Currículo por defecto (el mismo que siembra la migración 0003); se usa hasta que carga la base de datos
+DEFAULT_UNIDADES = [
+    {"unidad_key": "unidad_1", "nombre": "Unidad 1", "descripcion": "Primera unidad del programa"},
+    {"unidad_key": "unidad_2", "nombre": "Unidad 2", "descripcion": "Segunda unidad del programa"},
+    {"unidad_key": "unidad_3", "nombre": "Unidad 3", "descripcion": "Tercera unidad del programa"},
+    {"unidad_key": "unidad_4", "nombre": "Unidad 4", "descripcion": "Cuarta unidad del programa"},
+    {"unidad_key": "unidad_5", "nombre": "Unidad 5", "descripcion": "Quinta unidad del programa"}
+]
+
+# Nota: Los modulo_key se mantienen como modulo_1, modulo_2, etc. para cada unidad
+# para mantener compatibilidad con datos existentes en la base de datos
+DEFAULT_MODULOS = {
+    "unidad_1": [
+        {"modulo_key": "modulo_1", "nombre": "Módulo 1", "descripcion": "Adicción de N° Naturales"},
+        {"modulo_key": "modulo_2", "nombre": "Módulo 2", "descripcion": "Sustracción de N° Naturales"},
+        {"modulo_key": "modulo_3", "nombre": "Módulo 3", "descripcion": "Multiplicación de N° Naturales"},
+        {"modulo_key": "modulo_4", "nombre": "Módulo 4", "descripcion": "División de N° Naturales"},
+        {"modulo_key": "modulo_5", "nombre": "Módulo 5", "descripcion": "Operatoria Combinada de N° Naturales"}
+    ],
+    "unidad_2": [
+        {"modulo_key": "modulo_1", "nombre": "Módulo 6", "descripcion": "Adicción de N° Enteros"},
+        {"modulo_key": "modulo_2", "nombre": "Módulo 7", "descripcion": "Sustracción de N° Enteros"},
+        {"modulo_key": "modulo_3", "nombre": "Módulo 8", "descripcion": "Multiplicación y división de N° Enteros"},
+        {"modulo_key": "modulo_4", "nombre": "Módulo 9", "descripcion": "Operatoria Combinada de N° Enteros"},
+        {"modulo_key": "modulo_5", "nombre": "Módulo 10", "descripcion": "Resolución de Problemas de N° Enteros"}
+    ],
+    "unidad_3": [
+        {"modulo_key": "modulo_1", "nombre": "Módulo 11", "descripcion": "Conceptos Claves de Fracciones"},
+        {"modulo_key": "modulo_2", "nombre": "Módulo 12", "descripcion": "Suma y Resta de Fracciones"},
+        {"modulo_key": "modulo_3", "nombre": "Módulo 13", "descripcion": "Multiplicación de Fracciones"},
+        {"modulo_key": "modulo_4", "nombre": "Módulo 14", "descripcion": "División de Fracciones"},
+        {"modulo_key": "modulo_5", "nombre": "Módulo 15", "descripcion": "Suma y Resta de Decimales"},
+        {"modulo_key": "modulo_6", "nombre": "Módulo 16", "descripcion": "Multiplicación de Decimales"},
+        {"modulo_key": "modulo_7", "nombre": "Módulo 17", "descripcion": "División de Decimales"},
+        {"modulo_key": "modulo_8", "nombre": "Módulo 18", "descripcion": "Conjuntos Numéricos"},
+        {"modulo_key": "modulo_9", "nombre": "Módulo 19", "descripcion": "Operatoria Combinada de N° Racionales"},
+        {"modulo_key": "modulo_10", "nombre": "Módulo 20", "descripcion": "Resolución de Problemas de N° Racionales"}
+    ],
+    "unidad_4": [
+        {"modulo_key": "modulo_1", "nombre": "Módulo 21", "descripcion": "Conceptos Claves de %"},
+        {"modulo_key": "modulo_2", "nombre": "Módulo 22", "descripcion": "Cálculo de % más directos"},
+        {"modulo_key": "modulo_3", "nombre": "Módulo 23", "descripcion": "Cálculo de cualquier %"},
+        {"modulo_key": "modulo_4", "nombre": "Módulo 24", "descripcion": "Resolución de Problemas de % 1"},
+        {"modulo_key": "modulo_5", "nombre": "Módulo 25", "descripcion": "Resolución de Problemas de % 2"}
+    ],
+    "unidad_5": [
+        {"modulo_key": "modulo_1", "nombre": "Módulo 26", "descripcion": "Conceptos Claves de Raíces"},
+        {"modulo_key": "modulo_2", "nombre": "Módulo 27", "descripcion": "Cálculo de Raíces"},
+        {"modulo_key": "modulo_3", "nombre": "Módulo 28", "descripcion": "Propiedades de Raíces"},
+        {"modulo_key": "modulo_4", "nombre": "Módulo 29", "descripcion": "Resolución de Problemas de Raíces"},
+        {"modulo_key": "modulo_5", "nombre": "Módulo 30", "descripcion": "Conceptos Claves de Potencias"},
+        {"modulo_key": "modulo_6", "nombre": "Módulo 31", "descripcion": "Cálculo de Potencias"},
+        {"modulo_key": "modulo_7", "nombre": "Módulo 32", "descripcion": "Propiedades de Potencias"},
+        {"modulo_key": "modulo_8", "nombre": "Módulo 33", "descripcion": "Resolución de Problemas de Potencias"}
+    ]
+}
+
+class ModuloPair(NamedTuple):
+    unidad_key: str
+    unidad_nombre: str
+    modulo_key: str
+    modulo_nombre: str
+
+def curriculum_version(unidades: List[dict], modulos_por_unidad: Dict[str, List[dict]]) -> str:
+    content = json.dumps([unidades, modulos_por_unidad], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(content.encode()).hexdigest()[:16]
+
+class CurriculumIndex:
+    """Índice inmutable del currículo; cuando cambia la versión se construye uno nuevo y se reemplaza"""
+
+    def __init__(self, unidades: List[dict], modulos_por_unidad: Dict[str, List[dict]], version: Optional[str] = None):
+        self.version = version or curriculum_version(unidades, modulos_por_unidad)
+        self.unidades: Tuple[dict, ...] = tuple(unidades)
+        self.modulos_por_unidad = MappingProxyType({
+            unidad["unidad_key"]: tuple(modulos_por_unidad.get(unidad["unidad_key"], []))
+            for unidad in unidades
+        })
+
+        # Pares (unidad, módulo) en el orden del programa y su posición
+        self.pairs: Tuple[ModuloPair, ...] = tuple(
+            ModuloPair(unidad["unidad_key"], unidad["nombre"], modulo["modulo_key"], modulo["nombre"])
+            for unidad in unidades
+            for modulo in self.modulos_por_unidad[unidad["unidad_key"]]
+        )
+        self.pair_index = MappingProxyType({
+            (pair.unidad_key, pair.modulo_key): position for position, pair in enumerate(self.pairs)
+        })
+
+        # Respuestas de /unidades y /modulos serializadas una sola vez por versión
+        self.unidades_response = PreserializedJSON({"unidades": list(self.unidades)})
+        self.modulos_responses = MappingProxyType({
+            unidad_key: PreserializedJSON({"modulos": list(modulos)})
+            for unidad_key, modulos in self.modulos_por_unidad.items()
+        })
+        self.sin_modulos_response = PreserializedJSON({"modulos": []})
+
+    def modulos(self, unidad_key: str) -> Tuple[dict, ...]:
+        return self.modulos_por_unidad.get(unidad_key, ())
+
+    def slots_by_student(self, records: Iterable) -> Dict[int, list]:
+        """
+        Ubica cada registro (ticket o prueba) en la posición de su par (unidad, módulo):
+        estudiante_id -> lista del largo de `pairs` con el registro o None.
+        Los registros de unidades o módulos que ya no están en el catálogo se ignoran.
+        """
+        slots: Dict[int, list] = {}
+        total = len(self.pairs)
+        for record in records:
+            position = self.pair_index.get((record.unidad, record.modulo))
+            if position is None:
+                continue
+            student_slots = slots.get(record.estudiante_id)
+            if student_slots is None:
+                student_slots = slots[record.estudiante_id] = [None] * total
+            student_slots[position] = record
+        return slots
+
+class CurriculumCatalog:
+    """Mantiene el CurriculumIndex vigente y lo recarga desde la base de datos cuando cambia"""
+
+    def __init__(self):
+        self.index = CurriculumIndex(DEFAULT_UNIDADES, DEFAULT_MODULOS)
+        self.loaded_from_db = False
+        self._lock = None  # se crea dentro del event loop (Python 3.9 lo asocia al loop al construirlo)
+
+    async def fetch(self):
+        """Lee unidades y módulos ordenados desde la base de datos"""
+        from app.database import AsyncSessionLocal
+        from app.models.curriculum import Unidad, Modulo
+
+        async with AsyncSessionLocal() as db:
+            unidades = (await db.execute(select(Unidad).order_by(Unidad.orden, Unidad.id))).scalars().all()
+            modulos = (await db.execute(
+                select(Modulo.unidad_id, Modulo.modulo_key, Modulo.nombre, Modulo.descripcion)
+                .order_by(Modulo.unidad_id, Modulo.orden, Modulo.id)
+            )).all()
+
+        keys_by_id = {unidad.id: unidad.unidad_key for unidad in unidades}
+        modulos_por_unidad: Dict[str, List[dict]] = {unidad.unidad_key: [] for unidad in unidades}
+        for unidad_id, modulo_key, nombre, descripcion in modulos:
+            modulos_por_unidad[keys_by_id[unidad_id]].append(
+                {"modulo_key": modulo_key, "nombre": nombre, "descripcion": descripcion}
+            )
+        unidades_data = [
+            {"unidad_key": unidad.unidad_key, "nombre": unidad.nombre, "descripcion": unidad.descripcion}
+            for unidad in unidades
+        ]
+        return unidades_data, modulos_por_unidad
+
+    async def refresh(self) -> bool:
+        """Recarga el catálogo; devuelve True si la versión cambió"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            unidades, modulos_por_unidad = await self.fetch()
+            if not unidades:
+                # Tablas vacías (migración 0003 sin aplicar): se mantiene el catálogo actual
+                return False
+            self.loaded_from_db = True
+            version = curriculum_version(unidades, modulos_por_unidad)
+            if version == self.index.version:
+                return False
+            self.index = CurriculumIndex(unidades, modulos_por_unidad, version)
+            print(f"[CURRICULUM] Catálogo actualizado a la versión {version}")
+            return True
+
+    async def watch(self, interval: int):
+        """Revisa periódicamente si el currículo cambió en la base de datos"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"[CURRICULUM] Error al revisar el catálogo: {e}")
+
+curriculum_catalog = CurriculumCatalog()
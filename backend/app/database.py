@@ -1,7 +1,14 @@
-from sqlalchemy import create_engine
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.routing import APIRoute
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
 import os
+import threading
+import time
 from dotenv import load_dotenv
 
 # Cargar solo el archivo .env local, no .env.aws
@@ -13,19 +20,225 @@ DATABASE_URL = os.getenv("DATABASE_URL", "postgresql://tutorias_db_user:kDL6Flvx
 # Configuración de CORS desde variables de entorno
 ALLOWED_ORIGINS = os.getenv("ALLOWED_ORIGINS", "http://localhost:5173,http://localhost:3000").split(",")
 
+# Configuración del pool de conexiones desde variables de entorno
+# Render (plan free) cierra las conexiones inactivas, por eso se reciclan y se validan con pre-ping
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))  # segundos esperando una conexión libre
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # segundos antes de reciclar una conexión
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))  # 0 desactiva el límite
+DB_CONNECT_TIMEOUT = int(os.getenv("DB_CONNECT_TIMEOUT", "10"))  # segundos para abrir la conexión TCP
+DB_POOL_WARMUP = int(os.getenv("DB_POOL_WARMUP", "2"))  # conexiones que se abren al iniciar la app (0 lo desactiva)
+
+class PoolMetrics:
+    """Contadores del pool de conexiones para dimensionarlo según la concurrencia de uvicorn"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.peak_checked_out = 0
+        self.invalidations = 0
+
+    def record_wait(self, seconds: float, checked_out: int):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+            self.peak_checked_out = max(self.peak_checked_out, checked_out)
+
+    def record_invalidation(self):
+        with self._lock:
+            self.invalidations += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            avg_wait = self.total_wait / self.checkouts if self.checkouts else 0.0
+            return {
+                "checkouts": self.checkouts,
+                "avg_wait_ms": round(avg_wait * 1000, 3),
+                "max_wait_ms": round(self.max_wait * 1000, 3),
+                "peak_checked_out": self.peak_checked_out,
+                "invalidations": self.invalidations,
+            }
+
+pool_metrics = PoolMetrics()
+async_pool_metrics = PoolMetrics()
+
+class TimedQueuePool(QueuePool):
+    """QueuePool que mide cuánto espera cada request por una conexión libre"""
+
+    metrics = pool_metrics
+
+    def _do_get(self):
+        start = time.perf_counter()
+        connection = super()._do_get()
+        self.metrics.record_wait(time.perf_counter() - start, self.checkedout())
+        return connection
+
+class TimedAsyncQueuePool(TimedQueuePool, AsyncAdaptedQueuePool):
+    """Versión del pool medido para el motor asíncrono (asyncpg)"""
+
+    metrics = async_pool_metrics
+
+def build_engine_kwargs(url: str) -> dict:
+    """Argumentos de create_engine según el motor de base de datos"""
+    if url.startswith("sqlite"):
+        # SQLite (pruebas locales) no soporta timeouts de conexión ni statement_timeout
+        return {"connect_args": {"check_same_thread": False}}
+
+    connect_args = {"connect_timeout": DB_CONNECT_TIMEOUT}
+    if DB_STATEMENT_TIMEOUT_MS > 0:
+        connect_args["options"] = f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"
+
+    return {
+        "poolclass": TimedQueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        "connect_args": connect_args,
+    }
+
+def build_async_url(url: str) -> str:
+    """Convierte la URL síncrona (psycopg2) a su equivalente asíncrono"""
+    if url.startswith("sqlite://"):
+        return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+        if url.startswith(prefix):
+            return url.replace(prefix, "postgresql+asyncpg://", 1)
+    return url
+
+def build_async_engine_kwargs(url: str) -> dict:
+    """Argumentos de create_async_engine; asyncpg usa nombres distintos a psycopg2 para los timeouts"""
+    kwargs = build_engine_kwargs(url)
+    if url.startswith("sqlite"):
+        return kwargs
+
+    server_settings = {}
+    if DB_STATEMENT_TIMEOUT_MS > 0:
+        server_settings["statement_timeout"] = str(DB_STATEMENT_TIMEOUT_MS)
+    kwargs["poolclass"] = TimedAsyncQueuePool
+    kwargs["connect_args"] = {"timeout": DB_CONNECT_TIMEOUT, "server_settings": server_settings}
+    return kwargs
+
 # Crear el motor de la base de datos
-engine = create_engine(DATABASE_URL)
+engine = create_engine(DATABASE_URL, **build_engine_kwargs(DATABASE_URL))
+
+# Motor asíncrono para los endpoints de lectura con más tráfico (grillas, estadísticas y listados)
+ASYNC_DATABASE_URL = build_async_url(DATABASE_URL)
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **build_async_engine_kwargs(DATABASE_URL))
+
+@event.listens_for(engine, "invalidate")
+def _on_invalidate(dbapi_connection, connection_record, exception):
+    # Conexiones descartadas (por ejemplo, cerradas por Render y detectadas con pre-ping)
+    pool_metrics.record_invalidation()
+
+@event.listens_for(async_engine.sync_engine, "invalidate")
+def _on_async_invalidate(dbapi_connection, connection_record, exception):
+    async_pool_metrics.record_invalidation()
+
+if DATABASE_URL.startswith("sqlite"):
+    # SQLite no aplica las claves foráneas (ni ON DELETE CASCADE) a menos que se active por conexión
+    @event.listens_for(engine, "connect")
+    @event.listens_for(async_engine.sync_engine, "connect")
+    def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
 
 # Crear la sesión
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
 
 # Base para los modelos
 Base = declarative_base()
 
+def _pool_usage(pool, metrics: PoolMetrics) -> dict:
+    usage = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        usage.update({
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": max(pool.overflow(), 0),
+        })
+    usage.update(metrics.snapshot())
+    return usage
+
+def get_pool_status() -> dict:
+    """Estado actual del pool de conexiones y métricas acumuladas"""
+    status = {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        "statement_timeout_ms": DB_STATEMENT_TIMEOUT_MS,
+        "connect_timeout": DB_CONNECT_TIMEOUT,
+    }
+    status.update(_pool_usage(engine.pool, pool_metrics))
+    status["async"] = _pool_usage(async_engine.pool, async_pool_metrics)
+    return status
+
+class LazySession:
+    """Proxy de Session que solo se crea (y toma una conexión del pool) al primer uso"""
+
+    def __init__(self, factory=SessionLocal):
+        self._factory = factory
+        self._session = None
+
+    def __getattr__(self, name):
+        if self._session is None:
+            self._session = self._factory()
+        return getattr(self._session, name)
+
+    @property
+    def started(self) -> bool:
+        return self._session is not None
+
+    def release(self):
+        """Cierra la sesión y devuelve la conexión al pool; un uso posterior abre una sesión nueva"""
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    close = release
+
+class DbSessionRoute(APIRoute):
+    """Ruta que libera la sesión apenas el handler termina, sin esperar a que se envíe la respuesta"""
+
+    def get_route_handler(self):
+        route_handler = super().get_route_handler()
+
+        async def handler(request: Request):
+            try:
+                return await route_handler(request)
+            finally:
+                lazy_db = getattr(request.state, "db", None)
+                if lazy_db is not None and lazy_db.started:
+                    await run_in_threadpool(lazy_db.release)
+
+        return handler
+
 # Función para obtener la sesión de la base de datos
-def get_db():
-    db = SessionLocal()
+# La sesión es perezosa: endpoints que no consultan (o requests que fallan antes) no usan el pool
+def get_db(request: Request):
+    db = LazySession()
+    request.state.db = db
     try:
         yield db
     finally:
         db.close()
+
+# Sesión asíncrona para endpoints "async def"; no ocupa un hilo del threadpool mientras espera a la base de datos
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def run_with_async_session(fn, *args):
+    """Ejecuta `fn(db, *args)` con su propia sesión (y conexión del pool), para correr consultas en paralelo con asyncio.gather"""
+    async with AsyncSessionLocal() as db:
+        return await fn(db, *args)
@@ -1,21 +1,26 @@
-from fastapi import FastAPI
+from app.startup import startup_timer, lifespan, PROCESS_START
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
-from app.routers import auth_router, equipos_router, tutores_router, estudiantes_router, usuarios_router, attendance, tutor_attendance, attendance_2026, tickets, prueba_diagnostico, prueba_unidad
+from fastapi.responses import JSONResponse
+from app.routers import auth_router, equipos_router, tutores_router, estudiantes_router, usuarios_router, attendance, tutor_attendance, attendance_2026, tickets, prueba_diagnostico, prueba_unidad, admin, bootstrap, dashboard, search, analytics
 from app.routers.schools import router as schools_router
-from app.database import engine, ALLOWED_ORIGINS
-from app import models
-import os
+from app.database import ALLOWED_ORIGINS
+from app.utils.static_assets import asset_server
+from app.utils.compression import CompressionMiddleware, COMPRESSION_ENABLED
+from app.utils.responses import AppJSONResponse
+import time
 
-# Crear las tablas en la base de datos
-models.Base.metadata.create_all(bind=engine)
+# Las tablas se crean y actualizan con Alembic (alembic upgrade head), no al importar la app
+startup_timer.record("imports", time.perf_counter() - PROCESS_START)
+_routers_start = time.perf_counter()
 
 # Crear la aplicación FastAPI
 app = FastAPI(
     title="Plataforma Tutorías API",
     description="API para la gestión de equipos, tutores y estudiantes",
-    version="2.0.0"
+    version="2.0.0",
+    default_response_class=AppJSONResponse,
+    lifespan=lifespan
 )
 
 # Health check endpoint para App Runner
@@ -30,8 +35,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count", "ETag", "Server-Timing"],
 )
 
+# Comprimir respuestas grandes (grillas y exportaciones) con Brotli/gzip
+if COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
 # Incluir los routers
 app.include_router(auth_router)
 app.include_router(equipos_router)
@@ -45,47 +55,46 @@ app.include_router(schools_router)
 app.include_router(tickets.router, prefix="/tickets", tags=["tickets"])
 app.include_router(prueba_diagnostico.router, prefix="/prueba-diagnostico", tags=["prueba-diagnostico"])
 app.include_router(prueba_unidad.router, prefix="/prueba-unidad", tags=["prueba-unidad"])
+app.include_router(admin.router)
+app.include_router(bootstrap.router)
+app.include_router(dashboard.router)
+app.include_router(search.router)
+app.include_router(analytics.router)
+startup_timer.record("routers", time.perf_counter() - _routers_start)
+
+# Servir el frontend compilado (el manifiesto de archivos se carga al iniciar, ver app.startup)
+API_PREFIXES = (
+    "api/", "auth/", "equipos/", "tutores/", "estudiantes/", "usuarios/", "schools/",
+    "attendance/", "tutor-attendance/", "admin/", "bootstrap/", "dashboard/", "search/", "analytics/",
+)
 
-# Montar archivos estáticos del frontend
-frontend_dist_path = "/app/static"
-if os.path.exists(frontend_dist_path):
-    # Montar archivos estáticos (CSS, JS, imágenes)
-    app.mount("/assets", StaticFiles(directory=f"{frontend_dist_path}/assets"), name="assets")
-    
-    # Servir el archivo index.html para todas las rutas del frontend
+if asset_server.available:
     @app.get("/{full_path:path}")
-    async def serve_frontend(full_path: str):
+    async def serve_frontend(full_path: str, request: Request):
         # Si es una ruta de API, no servir el frontend
-        if (full_path.startswith("api/") or 
-            full_path.startswith("auth/") or 
-            full_path.startswith("equipos/") or 
-            full_path.startswith("tutores/") or 
-            full_path.startswith("estudiantes/") or 
-            full_path.startswith("usuarios/") or 
-            full_path.startswith("schools/") or 
-            full_path.startswith("attendance/") or 
-            full_path.startswith("tutor-attendance/") or 
-            full_path == "health"):
+        if full_path.startswith(API_PREFIXES) or full_path == "health":
             return {"error": "Not found"}
-        
-        # Servir archivos estáticos específicos
-        if full_path.endswith(('.js', '.css', '.png', '.jpg', '.jpeg', '.gif', '.svg', '.ico', '.woff', '.woff2')):
-            file_path = os.path.join(frontend_dist_path, full_path)
-            if os.path.exists(file_path) and os.path.isfile(file_path):
-                return FileResponse(file_path)
-        
+
+        # Archivos estáticos (JS, CSS, imágenes) con variante precomprimida y ETag
+        response = asset_server.serve(request, full_path)
+        if response is not None:
+            return response
+
+        # Un asset con hash que no existe no debe responder con index.html
+        if full_path.startswith("assets/"):
+            return JSONResponse(status_code=404, content={"error": "Not found"})
+
         # Para todas las demás rutas del frontend (SPA), servir index.html
-        index_path = os.path.join(frontend_dist_path, "index.html")
-        if os.path.exists(index_path):
-            return FileResponse(index_path)
-        
+        response = asset_server.serve(request, "index.html")
+        if response is not None:
+            return response
+
         return {"error": "Not found"}
 
 # Ruta raíz para servir el frontend React
 @app.get("/")
-async def serve_root():
-    frontend_dist_path = "/app/static"
-    index_path = os.path.join(frontend_dist_path, "index.html")
-    if os.path.exists(index_path):
-        return FileResponse(index_path)
+async def serve_root(request: Request):
+    response = asset_server.serve(request, "index.html")
+    if response is not None:
+        return response
     return {"message": "¡Bienvenido a la Plataforma Tutorías API!"}
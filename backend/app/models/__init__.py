@@ -8,3 +8,4 @@ from .attendance import AsistenciaEstudiante, AsistenciaTutor, EstadoAsistencia
 from .tickets import TicketEstudiante, EstadoTicket
 from .prueba_diagnostico import PruebaDiagnosticoEstudiante, PorcentajeLogro as PorcentajeLogroDiagnostico
 from .prueba_unidad import PruebaUnidadEstudiante, PorcentajeLogro as PorcentajeLogroUnidad
+from .curriculum import Unidad, Modulo
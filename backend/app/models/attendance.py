@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Boolean, DateTime, Enum
+from sqlalchemy import Column, Identity, Integer, String, ForeignKey, Boolean, DateTime, Enum, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -12,9 +12,11 @@ class EstadoAsistencia(enum.Enum):
 
 class AsistenciaEstudiante(Base):
     __tablename__ = "asistencia_estudiantes"
+    # Validador de la grilla (ETag): count y max(updated_at) por estudiante_id sin leer la tabla
+    __table_args__ = (Index("ix_asistencia_estudiantes_version", "estudiante_id", "updated_at", "created_at"),)
     
-    id = Column(Integer, primary_key=True, index=True)
-    estudiante_id = Column(Integer, ForeignKey("estudiantes.id"), nullable=False)
+    id = Column(Integer, Identity(), primary_key=True, index=True)
+    estudiante_id = Column(Integer, ForeignKey("estudiantes.id", ondelete="CASCADE"), nullable=False)
     semana = Column(String, nullable=False)  # "semana_1", "semana_2", etc.
     mes = Column(String, nullable=False)  # "Marzo", "Abril", etc. - calculado desde calendario
     dias = Column(String, nullable=False)  # "2 al 8", "9 al 15", etc. - calculado desde calendario
@@ -27,9 +29,11 @@ class AsistenciaEstudiante(Base):
 
 class AsistenciaTutor(Base):
     __tablename__ = "asistencia_tutores"
+    # Validador de la grilla (ETag): count y max(updated_at) por tutor_id sin leer la tabla
+    __table_args__ = (Index("ix_asistencia_tutores_version", "tutor_id", "updated_at", "created_at"),)
     
-    id = Column(Integer, primary_key=True, index=True)
-    tutor_id = Column(Integer, ForeignKey("tutores.id"), nullable=False)
+    id = Column(Integer, Identity(), primary_key=True, index=True)
+    tutor_id = Column(Integer, ForeignKey("tutores.id", ondelete="CASCADE"), nullable=False)
     semana = Column(String, nullable=False)  # "semana_1", "semana_2", etc.
     mes = Column(String, nullable=False)  # "Marzo", "Abril", etc. - calculado desde calendario
     dias = Column(String, nullable=False)  # "2 al 8", "9 al 15", etc. - calculado desde calendario
@@ -0,0 +1,34 @@
+from sqlalchemy import Column, Identity, Integer, String, ForeignKey, DateTime, UniqueConstraint
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+from app.database import Base
+
+class Unidad(Base):
+    __tablename__ = "unidades"
+
+    id = Column(Integer, Identity(), primary_key=True, index=True)
+    unidad_key = Column(String, unique=True, nullable=False)  # "unidad_1", "unidad_2", etc.
+    nombre = Column(String, nullable=False)  # "Unidad 1"
+    descripcion = Column(String, nullable=True)
+    orden = Column(Integer, nullable=False)  # Orden en grillas y exportaciones
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # Relación con módulos
+    modulos = relationship("Modulo", back_populates="unidad", order_by="Modulo.orden")
+
+class Modulo(Base):
+    __tablename__ = "modulos"
+    __table_args__ = (UniqueConstraint("unidad_id", "modulo_key", name="uq_modulos_unidad_modulo_key"),)
+
+    id = Column(Integer, Identity(), primary_key=True, index=True)
+    unidad_id = Column(Integer, ForeignKey("unidades.id", ondelete="CASCADE"), nullable=False)
+    modulo_key = Column(String, nullable=False)  # "modulo_1", ... (se repite entre unidades, compatible con los registros existentes)
+    nombre = Column(String, nullable=False)  # "Módulo 6" (numeración global del programa)
+    descripcion = Column(String, nullable=True)
+    orden = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # Relación con la unidad
+    unidad = relationship("Unidad", back_populates="modulos")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Identity, Integer, String, DateTime, ForeignKey
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -6,7 +6,7 @@ from app.database import Base
 class Equipo(Base):
     __tablename__ = "equipos"
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, Identity(), primary_key=True, index=True)
     nombre = Column(String, unique=True, nullable=False)  # A, B, C, ..., Z
     descripcion = Column(String, nullable=True)
     colegio_id = Column(Integer, ForeignKey("colegios.id"), nullable=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Enum
+from sqlalchemy import Column, Identity, Integer, String, ForeignKey, DateTime, Enum, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -15,9 +15,15 @@ class PorcentajeLogro(enum.Enum):
 
 class PruebaUnidadEstudiante(Base):
     __tablename__ = "prueba_unidad_estudiantes"
+    # Validador de la grilla (ETag): count y max(updated_at) por estudiante_id sin leer la tabla
+    __table_args__ = (
+        Index("ix_prueba_unidad_estudiantes_version", "estudiante_id", "updated_at", "created_at"),
+        # Reporte de dominio por módulo (/analytics/mastery): índice cubriente, sin leer la tabla
+        Index("ix_prueba_unidad_estudiantes_mastery", "unidad", "modulo", "estudiante_id", "resultado"),
+    )
     
-    id = Column(Integer, primary_key=True, index=True)
-    estudiante_id = Column(Integer, ForeignKey("estudiantes.id"), nullable=False)
+    id = Column(Integer, Identity(), primary_key=True, index=True)
+    estudiante_id = Column(Integer, ForeignKey("estudiantes.id", ondelete="CASCADE"), nullable=False)
     unidad = Column(String, nullable=False)  # "unidad_1", "unidad_2", etc.
     modulo = Column(String, nullable=False)  # "modulo_1", "modulo_2", etc.
     resultado = Column(Enum(PorcentajeLogro), nullable=False, default=PorcentajeLogro.VACIO)
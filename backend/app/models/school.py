@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Column, Identity, Integer, String, DateTime
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -6,7 +6,7 @@ from app.database import Base
 class Colegio(Base):
     __tablename__ = "colegios"
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, Identity(), primary_key=True, index=True)
     nombre = Column(String, nullable=False)
     comuna = Column(String, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
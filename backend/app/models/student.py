@@ -1,13 +1,22 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean
+from sqlalchemy import Column, Identity, Integer, String, ForeignKey, DateTime, Boolean, Index
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 from app.database import Base
+from app.utils.rut import format_rut, parse_rut
 
 class Estudiante(Base):
     __tablename__ = "estudiantes"
+    __table_args__ = (
+        # Validador de la grilla (ETag): count y max(updated_at) por equipo_id sin leer la tabla
+        Index("ix_estudiantes_version", "equipo_id", "updated_at", "created_at"),
+        Index("ix_estudiantes_apellido_id", "apellido", "id"),  # Paginación por cursor (apellido, id)
+        Index("ix_estudiantes_rut_numero", "rut_numero", unique=True),  # Un estudiante por RUT, con o sin formato
+    )
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, Identity(), primary_key=True, index=True)
     rut = Column(String, unique=True, nullable=False)  # RUT con formato XX.XXX.XXX-X
+    rut_numero = Column(Integer, nullable=True)  # RUT normalizado sin dígito verificador (NULL si el RUT no es válido)
+    rut_dv = Column(String(1), nullable=True)  # Dígito verificador ("0"-"9" o "K")
     nombre = Column(String, nullable=False)
     apellido = Column(String, nullable=False)
     curso = Column(String, nullable=False)  # Ej: "3° Básico", "1° Medio"
@@ -23,10 +32,21 @@ class Estudiante(Base):
     # Relación con la tabla equipos
     equipo = relationship("Equipo", back_populates="estudiantes")
     # Relación con la tabla asistencia_estudiantes
-    asistencia_estudiantes = relationship("AsistenciaEstudiante", back_populates="estudiante")
+    asistencia_estudiantes = relationship("AsistenciaEstudiante", back_populates="estudiante", passive_deletes=True)
     # Relación con la tabla tickets_estudiantes
-    tickets_estudiantes = relationship("TicketEstudiante", back_populates="estudiante")
+    tickets_estudiantes = relationship("TicketEstudiante", back_populates="estudiante", passive_deletes=True)
     # Relación con la tabla prueba_diagnostico_estudiantes
-    prueba_diagnostico_estudiantes = relationship("PruebaDiagnosticoEstudiante", back_populates="estudiante")
+    prueba_diagnostico_estudiantes = relationship("PruebaDiagnosticoEstudiante", back_populates="estudiante", passive_deletes=True)
     # Relación con la tabla prueba_unidad_estudiantes
-    prueba_unidad_estudiantes = relationship("PruebaUnidadEstudiante", back_populates="estudiante")
+    prueba_unidad_estudiantes = relationship("PruebaUnidadEstudiante", back_populates="estudiante", passive_deletes=True)
+    
+    @validates("rut")
+    def _normalizar_rut(self, key, rut):
+        """Guarda el RUT con formato XX.XXX.XXX-X y sus columnas normalizadas"""
+        parsed = parse_rut(rut)
+        if parsed is None:
+            # RUT antiguo sin dígito verificador válido: se guarda tal cual
+            self.rut_numero, self.rut_dv = None, None
+            return rut
+        self.rut_numero, self.rut_dv = parsed
+        return format_rut(*parsed)
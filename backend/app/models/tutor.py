@@ -1,12 +1,17 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean
+from sqlalchemy import Column, Identity, Integer, String, ForeignKey, DateTime, Boolean, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database import Base
 
 class Tutor(Base):
     __tablename__ = "tutores"
+    __table_args__ = (
+        # Validador de la grilla (ETag): count y max(updated_at) por equipo_id sin leer la tabla
+        Index("ix_tutores_version", "equipo_id", "updated_at", "created_at"),
+        Index("ix_tutores_apellido_id", "apellido", "id"),  # Paginación por cursor (apellido, id)
+    )
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, Identity(), primary_key=True, index=True)
     nombre = Column(String, nullable=False)
     apellido = Column(String, nullable=False)
     email = Column(String, unique=True, index=True, nullable=False)
@@ -19,4 +24,4 @@ class Tutor(Base):
     # Relación con la tabla equipos
     equipo = relationship("Equipo", back_populates="tutores")
     # Relación con la tabla asistencia_tutores
-    asistencia_tutores = relationship("AsistenciaTutor", back_populates="tutor")
+    asistencia_tutores = relationship("AsistenciaTutor", back_populates="tutor", passive_deletes=True)
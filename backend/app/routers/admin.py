@@ -0,0 +1,47 @@
+from fastapi import APIRouter, Depends, HTTPException
+from app.database import get_pool_status, async_engine, DbSessionRoute
+from app.auth.dependencies import get_admin_user
+from app.curriculum import curriculum_catalog
+from app.utils.sequences import reconcile_sequences
+
+router = APIRouter(prefix="/admin", tags=["admin"], route_class=DbSessionRoute)
+
+@router.get("/pool-stats")
+def get_pool_stats(
+    current_user = Depends(get_admin_user)
+):
+    """Estado del pool de conexiones: conexiones en uso, overflow y tiempos de espera (solo administradores)"""
+    return get_pool_status()
+
+@router.post("/curriculum/reload")
+async def reload_curriculum(
+    current_user = Depends(get_admin_user)
+):
+    """Recargar el catálogo curricular desde las tablas unidades/modulos sin esperar al watcher"""
+    try:
+        changed = await curriculum_catalog.refresh()
+    except Exception as e:
+        print(f"Error en reload_curriculum: {e}")
+        raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
+    
+    catalog = curriculum_catalog.index
+    return {
+        "changed": changed,
+        "version": catalog.version,
+        "total_unidades": len(catalog.unidades),
+        "total_modulos": len(catalog.pairs)
+    }
+
+@router.post("/sequences/reconcile")
+async def reconcile_id_sequences(
+    current_user = Depends(get_admin_user)
+):
+    """Adelantar en una pasada las secuencias de IDs que quedaron atrás (por ejemplo tras insertar filas con id explícito)"""
+    try:
+        async with async_engine.begin() as conn:
+            fixed = await reconcile_sequences(conn)
+    except Exception as e:
+        print(f"Error en reconcile_id_sequences: {e}")
+        raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
+    
+    return {"fixed": fixed, "total_fixed": len(fixed)}
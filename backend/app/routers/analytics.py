@@ -0,0 +1,304 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from app.analytics.attendance_matrix import percentage, student_attendance, tutor_attendance
+from app.analytics.correlation import ACHIEVEMENTS, achievement_by_student, correlation_report
+from app.analytics.drilldown import drilldown_store
+from app.analytics.learning_gain import learning_gain_report, load_gain_pairs
+from app.analytics.mastery import ASSESSMENTS, GROUP_BY, add_completion, mastery_report, students_per_group
+from app.analytics.risk import RISK_LEVELS, risk_engine
+from app.auth.dependencies import get_current_active_user_async
+from app.models.equipo import Equipo
+from app.models.school import Colegio
+from app.database import get_async_db, DbSessionRoute, run_with_async_session
+from app.utils.pagination import MAX_PAGE_SIZE
+import asyncio
+import numpy as np
+
+router = APIRouter(prefix="/analytics", tags=["analytics"], route_class=DbSessionRoute)
+
+ATTENDANCE_STORES = {"estudiantes": student_attendance, "tutores": tutor_attendance}
+
+def scoped_rows(matrix, current_user, equipo_id: Optional[int], colegio_id: Optional[int]):
+    """Filas visibles para el usuario: un tutor solo ve su equipo, aunque pida otro"""
+    mask = matrix.rows_mask(equipo_id, colegio_id)
+    if current_user.rol != "admin":
+        mask &= matrix.equipo_ids == current_user.equipo_id
+    return mask
+
+def scoped_equipo(current_user, equipo_id: Optional[int]) -> Optional[int]:
+    """Equipo a consultar en reportes que se filtran en SQL: el tutor solo puede ver el suyo"""
+    if current_user.rol == "admin":
+        return equipo_id
+    if equipo_id is not None and equipo_id != current_user.equipo_id:
+        raise HTTPException(status_code=403, detail="No tienes permisos para ver este equipo")
+    return current_user.equipo_id
+
+@router.get("/attendance")
+async def get_attendance_analytics(
+    grupo: str = Query("estudiantes", description="estudiantes o tutores"),
+    equipo_id: Optional[int] = Query(None, description="ID del equipo"),
+    colegio_id: Optional[int] = Query(None, description="ID del colegio"),
+    current_user = Depends(get_current_active_user_async)
+):
+    """Porcentaje general, promedio por equipo y serie semanal de asistencia, calculados sobre la matriz en memoria"""
+    store = ATTENDANCE_STORES.get(grupo)
+    if store is None:
+        raise HTTPException(status_code=400, detail=f"Grupo no válido. Opciones: {', '.join(ATTENDANCE_STORES)}")
+
+    try:
+        matrix = await store.get()
+        mask = scoped_rows(matrix, current_user, equipo_id, colegio_id)
+
+        attended, absent, recorded = matrix.person_stats()
+        rates = matrix.attendance_rates()
+        people, team_attended, team_absent, team_recorded = matrix.team_totals(mask)
+        # Promedio de los porcentajes individuales por equipo (cada persona pesa lo mismo)
+        rate_sums = np.bincount(matrix.equipo_rows, weights=rates * mask, minlength=len(matrix.equipos))
+        team_rates = np.round(percentage(team_attended, team_recorded), 2)
+        team_means = np.round(np.divide(rate_sums, people, out=np.zeros_like(rate_sums), where=people > 0), 2)
+
+        teams = [
+            {
+                "equipo_id": equipo_id,
+                "total_personas": int(people[position]),
+                "attended_weeks": int(team_attended[position]),
+                "absent_weeks": int(team_absent[position]),
+                "attendance_percentage": float(team_rates[position]),
+                "average_person_percentage": float(team_means[position])
+            }
+            for position, equipo_id in enumerate(matrix.equipos.tolist()) if people[position]
+        ]
+
+        week_attended, week_absent, week_recorded = matrix.weekly_series(mask)
+        week_rates = np.round(percentage(week_attended, week_recorded), 2)
+        weeks = [
+            {
+                "semana_key": week_key,
+                "attended": int(week_attended[position]),
+                "absent": int(week_absent[position]),
+                "recorded": int(week_recorded[position]),
+                "attendance_percentage": float(week_rates[position])
+            }
+            for position, week_key in enumerate(matrix.week_keys)
+        ]
+
+        total_attended = int(attended[mask].sum())
+        total_recorded = int(recorded[mask].sum())
+        return {
+            "grupo": grupo,
+            "version": matrix.version,
+            "total_personas": int(np.count_nonzero(mask)),
+            "attended_weeks": total_attended,
+            "absent_weeks": int(absent[mask].sum()),
+            "recorded_weeks": total_recorded,
+            "overall_average": round(float(percentage(total_attended, total_recorded)), 2),
+            "with_3_plus_absences": int(np.count_nonzero(absent[mask] > 3)),
+            "teams": teams,
+            "weeks": weeks
+        }
+    except Exception as e:
+        print(f"Error en get_attendance_analytics: {e}")
+        raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
+
+@router.get("/attendance-heatmap")
+async def get_attendance_heatmap(
+    grupo: str = Query("estudiantes", description="estudiantes o tutores"),
+    por: str = Query("equipo", description="Filas por equipo o colegio"),
+    equipo_id: Optional[int] = Query(None, description="ID del equipo"),
+    colegio_id: Optional[int] = Query(None, description="ID del colegio"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_active_user_async)
+):
+    """
+    Matriz compacta equipo (o colegio) × semana con el porcentaje de asistencia de cada celda
+    (null si la celda no tiene registros), para los gráficos sin descargar la grilla completa
+    """
+    store = ATTENDANCE_STORES.get(grupo)
+    if store is None:
+        raise HTTPException(status_code=400, detail=f"Grupo no válido. Opciones: {', '.join(ATTENDANCE_STORES)}")
+    if por not in ("equipo", "colegio"):
+        raise HTTPException(status_code=400, detail="Agrupación no válida. Opciones: equipo, colegio")
+
+    try:
+        matrix = await store.get()
+        mask = scoped_rows(matrix, current_user, equipo_id, colegio_id)
+        if por == "equipo":
+            group_ids, group_rows, model = matrix.equipos, matrix.equipo_rows, Equipo
+        else:
+            group_ids, group_rows, model = matrix.colegios, matrix.colegio_rows, Colegio
+
+        attended, _, recorded = matrix.group_weekly(group_rows, len(group_ids), mask)
+        rates = np.round(percentage(attended, recorded), 1)
+        people = np.bincount(group_rows[mask], minlength=len(group_ids))
+        names = dict((await db.execute(select(model.id, model.nombre).where(model.id.in_(group_ids.tolist())))).all())
+
+        return {
+            "grupo": grupo,
+            "por": por,
+            "version": matrix.version,
+            "weeks": list(matrix.week_keys),
+            "rows": [
+                {
+                    f"{por}_id": group_id or None,
+                    "nombre": names.get(group_id, "Sin colegio"),
+                    "personas": int(people[position]),
+                    "rates": [rate if total else None for rate, total in zip(rates[position].tolist(), recorded[position].tolist())]
+                }
+                for position, group_id in enumerate(group_ids.tolist()) if people[position]
+            ]
+        }
+    except Exception as e:
+        print(f"Error en get_attendance_heatmap: {e}")
+        raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
+
+@router.get("/at-risk")
+async def get_at_risk_students(
+    equipo_id: Optional[int] = Query(None, description="ID del equipo"),
+    colegio_id: Optional[int] = Query(None, description="ID del colegio"),
+    nivel: str = Query("medio", description="Nivel mínimo de riesgo: alto, medio o bajo"),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE, description="Máximo de estudiantes en la respuesta"),
+    current_user = Depends(get_current_active_user_async)
+):
+    """
+    Estudiantes activos ordenados por puntaje de riesgo de deserción (racha de inasistencias,
+    caída de la asistencia reciente, tickets pendientes y pruebas de unidad bajas)
+    """
+    levels = [name for name, _ in RISK_LEVELS]
+    if nivel not in levels:
+        raise HTTPException(status_code=400, detail=f"Nivel no válido. Opciones: {', '.join(levels)}")
+
+    try:
+        report = await risk_engine.get()
+        mask = scoped_rows(report.matrix, current_user, equipo_id, colegio_id) & report.matrix.active
+
+        level_counts = np.bincount(report.levels[mask], minlength=len(RISK_LEVELS))
+        selected = np.flatnonzero(mask & (report.levels <= levels.index(nivel)))
+        # Mayor puntaje primero; a igual puntaje, por id
+        selected = selected[np.argsort(-report.scores[selected], kind="stable")][:limit]
+
+        return {
+            "version": report.version,
+            "total_evaluated": int(np.count_nonzero(mask)),
+            "by_level": {name: int(level_counts[position]) for position, name in enumerate(levels)},
+            "students": [report.student(row) for row in selected.tolist()]
+        }
+    except Exception as e:
+        print(f"Error en get_at_risk_students: {e}")
+        raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
+
+@router.get("/mastery")
+async def get_mastery_report(
+    tipo: Optional[str] = Query(None, description="tickets, diagnostico o unidad (todos si se omite)"),
+    por: str = Query("equipo", description="Agrupar por equipo o colegio"),
+    unidad: Optional[str] = Query(None, description="Unidad (ej: unidad_1)"),
+    equipo_id: Optional[int] = Query(None, description="ID del equipo"),
+    colegio_id: Optional[int] = Query(None, description="ID del colegio"),
+    current_user = Depends(get_current_active_user_async)
+):
+    """
+    Por unidad, módulo y equipo (o colegio): cantidad de resultados en cada nivel, logro promedio
+    y porcentaje de estudiantes activos con resultado. Una consulta agrupada por tipo, en paralelo.
+    """
+    tipos = [tipo] if tipo else list(ASSESSMENTS)
+    if any(item not in ASSESSMENTS for item in tipos):
+        raise HTTPException(status_code=400, detail=f"Tipo no válido. Opciones: {', '.join(ASSESSMENTS)}")
+    if por not in GROUP_BY:
+        raise HTTPException(status_code=400, detail=f"Agrupación no válida. Opciones: {', '.join(GROUP_BY)}")
+    equipo_id = scoped_equipo(current_user, equipo_id)
+
+    try:
+        students, *reports = await asyncio.gather(
+            run_with_async_session(students_per_group, por, equipo_id, colegio_id),
+            *(run_with_async_session(mastery_report, item, por, unidad, equipo_id, colegio_id) for item in tipos)
+        )
+        result = {"por": por}
+        for item, report in zip(tipos, reports):
+            result[item] = add_completion(report, students, por)
+        return result
+    except Exception as e:
+        print(f"Error en get_mastery_report: {e}")
+        raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
+
+@router.get("/learning-gain")
+async def get_learning_gain(
+    equipo_id: Optional[int] = Query(None, description="ID del equipo"),
+    colegio_id: Optional[int] = Query(None, description="ID del colegio"),
+    unidad: Optional[str] = Query(None, description="Unidad (ej: unidad_1)"),
+    estudiantes: bool = Query(False, description="Incluir la distribución de cada estudiante"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_active_user_async)
+):
+    """
+    Ganancia de aprendizaje (prueba de unidad menos prueba diagnóstico, en puntos porcentuales)
+    general, por equipo y por módulo, con histograma de la ganancia promedio por estudiante
+    """
+    equipo_id = scoped_equipo(current_user, equipo_id)
+    try:
+        pairs = await load_gain_pairs(db, equipo_id, colegio_id, unidad)
+        return learning_gain_report(pairs, estudiantes)
+    except Exception as e:
+        print(f"Error en get_learning_gain: {e}")
+        raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
+
+@router.get("/attendance-achievement")
+async def get_attendance_achievement(
+    equipo_id: Optional[int] = Query(None, description="ID del equipo"),
+    colegio_id: Optional[int] = Query(None, description="ID del colegio"),
+    current_user = Depends(get_current_active_user_async)
+):
+    """
+    Relación entre el porcentaje de asistencia y el logro promedio (tickets y pruebas de unidad)
+    de los estudiantes activos: correlación de Pearson y Spearman, pendiente, promedios por tramo
+    de asistencia y correlación por equipo
+    """
+    try:
+        matrix = await student_attendance.get()
+        _, _, recorded = matrix.person_stats()
+        mask = scoped_rows(matrix, current_user, equipo_id, colegio_id) & matrix.active & (recorded > 0)
+        attendance = matrix.attendance_rates()
+
+        achievements = await asyncio.gather(
+            *(run_with_async_session(achievement_by_student, matrix, tipo) for tipo in ACHIEVEMENTS)
+        )
+        result = {"version": matrix.version, "students": int(np.count_nonzero(mask))}
+        for tipo, achievement in zip(ACHIEVEMENTS, achievements):
+            result[tipo] = correlation_report(matrix, mask, attendance, achievement)
+        return result
+    except Exception as e:
+        print(f"Error en get_attendance_achievement: {e}")
+        raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
+
+DRILLDOWN_LEVELS = ("programa", "colegio", "equipo", "estudiante")
+
+@router.get("/drilldown")
+async def get_drilldown(
+    nivel: str = Query("programa", description="programa, colegio, equipo o estudiante"),
+    id: Optional[int] = Query(None, description="ID del colegio, equipo o estudiante (0 = equipos sin colegio)"),
+    current_user = Depends(get_current_active_user_async)
+):
+    """
+    Nodo del árbol programa → colegio → equipo → estudiante con sus agregados (asistencia, logro,
+    activos/desertores, tutores) y los de sus hijos, leídos de resúmenes precalculados
+    """
+    if nivel not in DRILLDOWN_LEVELS:
+        raise HTTPException(status_code=400, detail=f"Nivel no válido. Opciones: {', '.join(DRILLDOWN_LEVELS)}")
+    if nivel != "programa" and id is None:
+        raise HTTPException(status_code=400, detail="Se requiere el id del nodo")
+
+    try:
+        tree = await drilldown_store.get()
+    except Exception as e:
+        print(f"Error en get_drilldown: {e}")
+        raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
+
+    node = tree.node(nivel, id)
+    if node is None:
+        raise HTTPException(status_code=404, detail="Nodo no encontrado")
+    if current_user.rol != "admin":
+        # Tutor solo puede navegar su equipo y sus estudiantes
+        equipo_id = node["id"] if nivel == "equipo" else node.get("equipo_id")
+        if nivel in ("programa", "colegio") or equipo_id != current_user.equipo_id:
+            raise HTTPException(status_code=403, detail="No tienes permisos para ver este nodo")
+    return node
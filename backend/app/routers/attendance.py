@@ -1,10 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from typing import List
-from app.database import get_db
-from app.models.attendance import AsistenciaEstudiante, AsistenciaTutor, EstadoAsistencia
+from app.database import get_db, DbSessionRoute
+from app.models.attendance import AsistenciaEstudiante, EstadoAsistencia
 from app.models.student import Estudiante
-from app.models.tutor import Tutor
 from app.models.school import Colegio
 from app.schemas.attendance import (
     AttendanceCreate, 
@@ -14,9 +13,11 @@ from app.schemas.attendance import (
     StudentAttendanceUpdate,
     StudentAttendance as StudentAttendanceSchema
 )
-from app.auth.dependencies import get_current_user
+from app.auth.dependencies import get_current_user, get_current_user_async
+from app.analytics.attendance_matrix import percentage, student_attendance, tutor_attendance
+import numpy as np
 
-router = APIRouter(prefix="/attendance", tags=["attendance"])
+router = APIRouter(prefix="/attendance", tags=["attendance"], route_class=DbSessionRoute)
 
 @router.get("/summary", response_model=List[StudentAttendanceSummary])
 def get_attendance_summary(
@@ -66,136 +67,111 @@ def get_attendance_summary(
     
     return summary
 
-@router.get("/students/attendance-stats")
-def get_students_attendance_stats(
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
-):
-    """Obtiene estadísticas de asistencia de estudiantes para el dashboard"""
-    
-    # Obtener todos los estudiantes
-    estudiantes = db.query(Estudiante).all()
-    
-    stats = []
-    total_attended = 0
-    total_possible = 0
-    students_with_3_plus_absences = []
-    
-    for estudiante in estudiantes:
-        # Obtener registros de asistencia del estudiante
-        attendance_records = db.query(AsistenciaEstudiante).filter(
-            AsistenciaEstudiante.estudiante_id == estudiante.id
-        ).all()
-        
-        attended_weeks = 0
-        absent_weeks = 0
-        
-        for record in attendance_records:
-            if record.estado == EstadoAsistencia.ASISTIO:
-                attended_weeks += 1
-            elif record.estado == EstadoAsistencia.NO_ASISTIO:
-                absent_weeks += 1
-        
-        # Calcular porcentaje de asistencia
-        total_weeks = len(attendance_records) if attendance_records else 10
-        attendance_percentage = (attended_weeks / total_weeks) * 100 if total_weeks > 0 else 0
-        
-        stats.append({
-            "student_id": estudiante.id,
-            "student_name": f"{estudiante.nombre} {estudiante.apellido}",
-            "course": estudiante.curso,
-            "attendance_percentage": round(attendance_percentage, 2),
-            "attended_weeks": attended_weeks,
-            "absent_weeks": absent_weeks,
-            "total_weeks": total_weeks
-        })
-        
-        total_attended += attended_weeks
-        total_possible += total_weeks
-        
-        # Verificar si tiene más de 3 inasistencias
-        if absent_weeks > 3:
-            students_with_3_plus_absences.append({
-                "student_id": estudiante.id,
-                "student_name": f"{estudiante.nombre} {estudiante.apellido}",
-                "course": estudiante.curso,
-                "absent_weeks": absent_weeks
-            })
+def attendance_totals(matrix):
+    """
+    Asistidas, inasistencias y semanas consideradas por persona, vectorizado sobre la matriz.
+    Sin registros se consideran 10 semanas (mismo criterio que antes del cálculo en memoria).
+    """
+    attended, absent, recorded = matrix.person_stats()
+    total_weeks = np.where(recorded > 0, recorded, 10)
+    return attended, absent, total_weeks
+
+async def build_students_attendance_stats() -> dict:
+    """Estadísticas de asistencia de estudiantes (usado por /students/attendance-stats y /dashboard)"""
+    matrix = await student_attendance.get()
+    attended, absent, total_weeks = attendance_totals(matrix)
+    percentages = np.round(percentage(attended, total_weeks), 2).tolist()
+    attended, absent, total_weeks = attended.tolist(), absent.tolist(), total_weeks.tolist()
+    ids = matrix.person_ids.tolist()
+    
+    stats = [
+        {
+            "student_id": ids[row],
+            "student_name": matrix.names[row],
+            "course": matrix.cursos[row],
+            "attendance_percentage": percentages[row],
+            "attended_weeks": attended[row],
+            "absent_weeks": absent[row],
+            "total_weeks": total_weeks[row]
+        }
+        for row in range(len(ids))
+    ]
+    
+    # Estudiantes con más de 3 inasistencias
+    students_with_3_plus_absences = [
+        {
+            "student_id": ids[row],
+            "student_name": matrix.names[row],
+            "course": matrix.cursos[row],
+            "absent_weeks": absent[row]
+        }
+        for row in range(len(ids)) if absent[row] > 3
+    ]
     
     # Calcular promedio general
-    overall_average = (total_attended / total_possible) * 100 if total_possible > 0 else 0
+    overall_average = percentage(sum(attended), sum(total_weeks))
     
     return {
         "students_stats": stats,
-        "overall_average": round(overall_average, 2),
+        "overall_average": round(float(overall_average), 2),
         "students_with_3_plus_absences": students_with_3_plus_absences,
-        "total_students": len(estudiantes)
+        "total_students": len(ids)
     }
 
-@router.get("/tutors/attendance-stats")
-def get_tutors_attendance_stats(
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
+@router.get("/students/attendance-stats")
+async def get_students_attendance_stats(
+    current_user = Depends(get_current_user_async)
 ):
-    """Obtiene estadísticas de asistencia de tutores para el dashboard"""
-    
-    # Obtener todos los tutores
-    tutores = db.query(Tutor).all()
-    
-    stats = []
-    total_attended = 0
-    total_possible = 0
-    tutors_with_3_plus_absences = []
-    
-    for tutor in tutores:
-        # Obtener registros de asistencia del tutor
-        attendance_records = db.query(AsistenciaTutor).filter(
-            AsistenciaTutor.tutor_id == tutor.id
-        ).all()
-        
-        attended_weeks = 0
-        absent_weeks = 0
-        
-        for record in attendance_records:
-            if record.estado == EstadoAsistencia.ASISTIO:
-                attended_weeks += 1
-            elif record.estado == EstadoAsistencia.NO_ASISTIO:
-                absent_weeks += 1
-        
-        # Calcular porcentaje de asistencia
-        total_weeks = len(attendance_records) if attendance_records else 10
-        attendance_percentage = (attended_weeks / total_weeks) * 100 if total_weeks > 0 else 0
-        
-        stats.append({
-            "tutor_id": tutor.id,
-            "tutor_name": f"{tutor.nombre} {tutor.apellido}",
-            "attendance_percentage": round(attendance_percentage, 2),
-            "attended_weeks": attended_weeks,
-            "absent_weeks": absent_weeks,
-            "total_weeks": total_weeks
-        })
-        
-        total_attended += attended_weeks
-        total_possible += total_weeks
-        
-        # Verificar si tiene más de 3 inasistencias
-        if absent_weeks > 3:
-            tutors_with_3_plus_absences.append({
-                "tutor_id": tutor.id,
-                "tutor_name": f"{tutor.nombre} {tutor.apellido}",
-                "absent_weeks": absent_weeks
-            })
+    """Obtiene estadísticas de asistencia de estudiantes para el dashboard"""
+    return await build_students_attendance_stats()
+
+async def build_tutors_attendance_stats() -> dict:
+    """Estadísticas de asistencia de tutores (usado por /tutors/attendance-stats y /dashboard)"""
+    matrix = await tutor_attendance.get()
+    attended, absent, total_weeks = attendance_totals(matrix)
+    percentages = np.round(percentage(attended, total_weeks), 2).tolist()
+    attended, absent, total_weeks = attended.tolist(), absent.tolist(), total_weeks.tolist()
+    ids = matrix.person_ids.tolist()
+    
+    stats = [
+        {
+            "tutor_id": ids[row],
+            "tutor_name": matrix.names[row],
+            "attendance_percentage": percentages[row],
+            "attended_weeks": attended[row],
+            "absent_weeks": absent[row],
+            "total_weeks": total_weeks[row]
+        }
+        for row in range(len(ids))
+    ]
+    
+    # Tutores con más de 3 inasistencias
+    tutors_with_3_plus_absences = [
+        {
+            "tutor_id": ids[row],
+            "tutor_name": matrix.names[row],
+            "absent_weeks": absent[row]
+        }
+        for row in range(len(ids)) if absent[row] > 3
+    ]
     
     # Calcular promedio general
-    overall_average = (total_attended / total_possible) * 100 if total_possible > 0 else 0
+    overall_average = percentage(sum(attended), sum(total_weeks))
     
     return {
         "tutors_stats": stats,
-        "overall_average": round(overall_average, 2),
+        "overall_average": round(float(overall_average), 2),
         "tutors_with_3_plus_absences": tutors_with_3_plus_absences,
-        "total_tutors": len(tutores)
+        "total_tutors": len(ids)
     }
 
+@router.get("/tutors/attendance-stats")
+async def get_tutors_attendance_stats(
+    current_user = Depends(get_current_user_async)
+):
+    """Obtiene estadísticas de asistencia de tutores para el dashboard"""
+    return await build_tutors_attendance_stats()
+
 @router.post("/", response_model=AttendanceCreate)
 def create_attendance_record(
     attendance: AttendanceCreate,
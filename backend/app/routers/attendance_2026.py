@@ -1,20 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import text
-from typing import List, Optional
-from app.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import select
+from typing import Dict, List, Optional
+from app.database import get_db, get_async_db, DbSessionRoute
+from app.utils.responses import AppJSONResponse
+from app.utils.http_cache import grid_etag, etag_matches, not_modified, grid_cache_headers, PreserializedJSON
 from app.models.attendance import AsistenciaEstudiante, AsistenciaTutor, EstadoAsistencia
 from app.models.student import Estudiante
 from app.models.tutor import Tutor
 from app.models.school import Colegio
 from app.models.equipo import Equipo
 from app.schemas.attendance import AttendanceStatus
-from app.auth.dependencies import get_current_user
+from app.auth.dependencies import get_current_user, get_current_user_async
 from pydantic import BaseModel
+from functools import lru_cache
 import json
 import os
 
-router = APIRouter(prefix="/attendance-2026", tags=["attendance-2026"])
+router = APIRouter(prefix="/attendance-2026", tags=["attendance-2026"], route_class=DbSessionRoute)
 
 class AttendanceUpdateRequest(BaseModel):
     student_id: Optional[int] = None
@@ -22,7 +26,8 @@ class AttendanceUpdateRequest(BaseModel):
     week_key: str
     status: str
 
-# Cargar calendario 2026
+# Cargar calendario 2026 (se lee una sola vez por proceso; el archivo solo cambia con un deploy)
+@lru_cache(maxsize=1)
 def load_2026_calendar():
     """Cargar el calendario 2026 desde archivo JSON"""
     calendar_path = os.path.join(os.path.dirname(__file__), "..", "..", "calendar_2026.json")
@@ -82,63 +87,81 @@ def get_equipos_list(
         print(f"Error en get_equipos_list: {e}")
         raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
 
+@lru_cache(maxsize=1)
+def calendar_weeks_response() -> PreserializedJSON:
+    """Respuesta de /calendar/weeks serializada una sola vez por proceso"""
+    calendar = load_2026_calendar()
+    return PreserializedJSON({"weeks": calendar, "total_weeks": len(calendar)})
+
 @router.get("/calendar/weeks")
-def get_calendar_weeks():
+async def get_calendar_weeks(request: Request):
     """Obtener el calendario completo de 2026 con todas las semanas"""
+    return calendar_weeks_response().response(request)
+
+async def load_weekly_attendance(db: AsyncSession, model, person_column, person_ids, week_keys: List[str]) -> Dict[int, Dict[str, str]]:
+    """Cargar en una sola consulta la asistencia semanal de todas las personas seleccionadas"""
+    query = select(person_column, model.semana, model.estado).where(person_column.in_(person_ids))
+    if week_keys:
+        query = query.where(model.semana.in_(week_keys))
+    
+    weekly_attendance: Dict[int, Dict[str, str]] = {}
+    for person_id, semana, estado in (await db.execute(query)).all():
+        if estado:  # Verificar que estado no sea None
+            weekly_attendance.setdefault(person_id, {})[semana] = estado.value
+    return weekly_attendance
+
+def get_month_week_keys(month: Optional[str]) -> List[str]:
+    """Claves de las semanas del mes indicado (lista vacía si no se filtra por mes)"""
+    if not month:
+        return []
     calendar = load_2026_calendar()
-    return {"weeks": calendar, "total_weeks": len(calendar)}
+    return [week["semana_key"] for week in calendar if week["mes"] == month]
 
 @router.get("/students")
-def get_students_attendance(
+async def get_students_attendance(
+    request: Request,
     month: Optional[str] = Query(None, description="Mes para filtrar (ej: Marzo, Abril)"),
     school_id: Optional[int] = Query(None, description="ID del colegio"),
     equipo_id: Optional[int] = Query(None, description="ID del equipo"),
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user_async)
 ):
     """Obtener estudiantes con sus registros de asistencia filtrados por mes, colegio y equipo"""
     
     try:
-        # Construir query base
-        query = db.query(Estudiante)
+        # Construir query base (ids de los estudiantes que cumplen los filtros)
+        student_ids = select(Estudiante.id)
         
         # Aplicar filtros
         if school_id:
-            query = query.join(Equipo).join(Colegio).filter(Colegio.id == school_id)
+            student_ids = student_ids.join(Equipo).join(Colegio).where(Colegio.id == school_id)
         
         if equipo_id:
-            query = query.filter(Estudiante.equipo_id == equipo_id)
+            student_ids = student_ids.where(Estudiante.equipo_id == equipo_id)
         
-        estudiantes = query.all()
+        # Si la grilla no cambió desde la última visita, responder 304 sin consultarla
+        week_keys = get_month_week_keys(month)
+        etag = await grid_etag(db, request, current_user, [
+            (Estudiante, Estudiante.id.in_(student_ids)),
+            (AsistenciaEstudiante, AsistenciaEstudiante.estudiante_id.in_(student_ids)),
+        ], extra=week_keys)
+        if etag_matches(request, etag):
+            return not_modified(etag)
         
-        # Obtener semanas del mes si se especifica
-        calendar = load_2026_calendar()
-        month_weeks = []
-        if month:
-            month_weeks = [week for week in calendar if week["mes"] == month]
+        estudiantes = (await db.execute(
+            select(Estudiante)
+            .options(joinedload(Estudiante.equipo).joinedload(Equipo.colegio))
+            .where(Estudiante.id.in_(student_ids))
+        )).scalars().all()
+        
+        # Obtener registros de asistencia de todos los estudiantes en una sola consulta
+        weekly_attendance = await load_weekly_attendance(
+            db, AsistenciaEstudiante, AsistenciaEstudiante.estudiante_id, student_ids, week_keys
+        )
         
         result = []
         
         for estudiante in estudiantes:
-            # Obtener registros de asistencia del estudiante
-            attendance_query = db.query(AsistenciaEstudiante).filter(
-                AsistenciaEstudiante.estudiante_id == estudiante.id
-            )
-            
-            if month_weeks:
-                week_keys = [week["semana_key"] for week in month_weeks]
-                attendance_query = attendance_query.filter(
-                    AsistenciaEstudiante.semana.in_(week_keys)
-                )
-            
-            attendance_records = attendance_query.all()
-            
-            # Crear diccionario de asistencia
-            weekly_attendance = {}
-            for record in attendance_records:
-                if record.estado:  # Verificar que estado no sea None
-                    weekly_attendance[record.semana] = record.estado.value
-            
             result.append({
                 "id": estudiante.id,
                 "nombre": estudiante.nombre,
@@ -148,70 +171,64 @@ def get_students_attendance(
                 "equipo_id": estudiante.equipo_id,
                 "colegio_nombre": estudiante.equipo.colegio.nombre if estudiante.equipo and estudiante.equipo.colegio else "Sin colegio",
                 "equipo_nombre": estudiante.equipo.nombre if estudiante.equipo else "Sin equipo",
-                "weekly_attendance": weekly_attendance
+                "weekly_attendance": weekly_attendance.get(estudiante.id, {})
             })
         
-        return {
+        return AppJSONResponse({
             "students": result,
             "total_students": len(result),
             "month": month,
             "school_id": school_id,
             "equipo_id": equipo_id
-        }
+        }, headers=grid_cache_headers(etag))
     except Exception as e:
         print(f"Error en get_students_attendance: {e}")
         raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
 
 @router.get("/tutors")
-def get_tutors_attendance(
+async def get_tutors_attendance(
+    request: Request,
     month: Optional[str] = Query(None, description="Mes para filtrar (ej: Marzo, Abril)"),
     school_id: Optional[int] = Query(None, description="ID del colegio"),
     equipo_id: Optional[int] = Query(None, description="ID del equipo"),
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user_async)
 ):
     """Obtener tutores con sus registros de asistencia filtrados por mes, colegio y equipo"""
     
-    # Construir query base
-    query = db.query(Tutor)
+    # Construir query base (ids de los tutores que cumplen los filtros)
+    tutor_ids = select(Tutor.id)
     
     # Aplicar filtros
     if school_id:
-        query = query.join(Equipo).join(Colegio).filter(Colegio.id == school_id)
+        tutor_ids = tutor_ids.join(Equipo).join(Colegio).where(Colegio.id == school_id)
     
     if equipo_id:
-        query = query.filter(Tutor.equipo_id == equipo_id)
+        tutor_ids = tutor_ids.where(Tutor.equipo_id == equipo_id)
     
-    tutores = query.all()
+    # Si la grilla no cambió desde la última visita, responder 304 sin consultarla
+    week_keys = get_month_week_keys(month)
+    etag = await grid_etag(db, request, current_user, [
+        (Tutor, Tutor.id.in_(tutor_ids)),
+        (AsistenciaTutor, AsistenciaTutor.tutor_id.in_(tutor_ids)),
+    ], extra=week_keys)
+    if etag_matches(request, etag):
+        return not_modified(etag)
     
-    # Obtener semanas del mes si se especifica
-    calendar = load_2026_calendar()
-    month_weeks = []
-    if month:
-        month_weeks = [week for week in calendar if week["mes"] == month]
+    tutores = (await db.execute(
+        select(Tutor)
+        .options(joinedload(Tutor.equipo).joinedload(Equipo.colegio))
+        .where(Tutor.id.in_(tutor_ids))
+    )).scalars().all()
+    
+    # Obtener registros de asistencia de todos los tutores en una sola consulta
+    weekly_attendance = await load_weekly_attendance(
+        db, AsistenciaTutor, AsistenciaTutor.tutor_id, tutor_ids, week_keys
+    )
     
     result = []
     
     for tutor in tutores:
-        # Obtener registros de asistencia del tutor
-        attendance_query = db.query(AsistenciaTutor).filter(
-            AsistenciaTutor.tutor_id == tutor.id
-        )
-        
-        if month_weeks:
-            week_keys = [week["semana_key"] for week in month_weeks]
-            attendance_query = attendance_query.filter(
-                AsistenciaTutor.semana.in_(week_keys)
-            )
-        
-        attendance_records = attendance_query.all()
-        
-        # Crear diccionario de asistencia
-        weekly_attendance = {}
-        for record in attendance_records:
-            if record.estado:  # Verificar que estado no sea None
-                weekly_attendance[record.semana] = record.estado.value
-        
         result.append({
             "id": tutor.id,
             "nombre": tutor.nombre,
@@ -221,16 +238,16 @@ def get_tutors_attendance(
             "equipo_id": tutor.equipo_id,
             "colegio_nombre": tutor.equipo.colegio.nombre if tutor.equipo and tutor.equipo.colegio else "Sin colegio",
             "equipo_nombre": tutor.equipo.nombre if tutor.equipo else "Sin equipo",
-            "weekly_attendance": weekly_attendance
+            "weekly_attendance": weekly_attendance.get(tutor.id, {})
         })
     
-    return {
+    return AppJSONResponse({
         "tutors": result,
         "total_tutors": len(result),
         "month": month,
         "school_id": school_id,
         "equipo_id": equipo_id
-    }
+    }, headers=grid_cache_headers(etag))
 
 @router.post("/students")
 def update_student_attendance(
@@ -308,47 +325,8 @@ def update_student_attendance(
                 db.refresh(new_record)
             except Exception as commit_error:
                 db.rollback()
-                error_str = str(commit_error)
-                print(f"Error en commit/refresh (create): {error_str}")
+                print(f"Error en commit/refresh (create): {str(commit_error)}")
                 print(f"Estudiante ID: {request.student_id}, Semana: {request.week_key}, Estado: {request.status}, Mes: {mes_value}")
-                
-                # Detectar error de secuencia desincronizada y resetear automáticamente
-                if "duplicate key" in error_str.lower() or "unique violation" in error_str.lower() or "llave duplicada" in error_str.lower():
-                    try:
-                        print("[*] Detectado error de secuencia desincronizada. Reseteando automáticamente...")
-                        # Resetear secuencia de asistencia_estudiantes
-                        db.execute(text("""
-                            SELECT setval(
-                                pg_get_serial_sequence('asistencia_estudiantes', 'id'),
-                                COALESCE((SELECT MAX(id) FROM asistencia_estudiantes), 1),
-                                true
-                            );
-                        """))
-                        db.commit()
-                        print("[OK] Secuencia reseteada. Reintentando operación...")
-                        
-                        # Reintentar la operación
-                        db.add(new_record)
-                        db.commit()
-                        db.refresh(new_record)
-                        
-                        return {
-                            "message": "Registro de asistencia creado (secuencia reseteada automáticamente)",
-                            "record": {
-                                "id": new_record.id,
-                                "student_id": new_record.estudiante_id,
-                                "week": new_record.semana,
-                                "status": new_record.estado.value if new_record.estado else None
-                            }
-                        }
-                    except Exception as retry_error:
-                        db.rollback()
-                        print(f"[ERROR] Error al resetear secuencia o reintentar: {str(retry_error)}")
-                        raise HTTPException(
-                            status_code=500,
-                            detail=f"Error al crear registro después de resetear secuencia: {str(retry_error)}"
-                        )
-                
                 raise HTTPException(status_code=500, detail=f"Error al crear registro: {str(commit_error)}")
             
             return {
@@ -444,47 +422,8 @@ def update_tutor_attendance(
                 db.refresh(new_record)
             except Exception as commit_error:
                 db.rollback()
-                error_str = str(commit_error)
-                print(f"Error en commit/refresh (create tutor): {error_str}")
+                print(f"Error en commit/refresh (create tutor): {str(commit_error)}")
                 print(f"Tutor ID: {request.tutor_id}, Semana: {request.week_key}, Estado: {request.status}, Mes: {mes_value}")
-                
-                # Detectar error de secuencia desincronizada y resetear automáticamente
-                if "duplicate key" in error_str.lower() or "unique violation" in error_str.lower() or "llave duplicada" in error_str.lower():
-                    try:
-                        print("[*] Detectado error de secuencia desincronizada. Reseteando automáticamente...")
-                        # Resetear secuencia de asistencia_tutores
-                        db.execute(text("""
-                            SELECT setval(
-                                pg_get_serial_sequence('asistencia_tutores', 'id'),
-                                COALESCE((SELECT MAX(id) FROM asistencia_tutores), 1),
-                                true
-                            );
-                        """))
-                        db.commit()
-                        print("[OK] Secuencia reseteada. Reintentando operación...")
-                        
-                        # Reintentar la operación
-                        db.add(new_record)
-                        db.commit()
-                        db.refresh(new_record)
-                        
-                        return {
-                            "message": "Registro de asistencia creado (secuencia reseteada automáticamente)",
-                            "record": {
-                                "id": new_record.id,
-                                "tutor_id": new_record.tutor_id,
-                                "week": new_record.semana,
-                                "status": new_record.estado.value if new_record.estado else None
-                            }
-                        }
-                    except Exception as retry_error:
-                        db.rollback()
-                        print(f"[ERROR] Error al resetear secuencia o reintentar: {str(retry_error)}")
-                        raise HTTPException(
-                            status_code=500,
-                            detail=f"Error al crear registro después de resetear secuencia: {str(retry_error)}"
-                        )
-                
                 raise HTTPException(status_code=500, detail=f"Error al crear registro: {str(commit_error)}")
             
             return {
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_db, DbSessionRoute
 from app.models.user import Usuario
 from app.schemas.user import (
     UsuarioLogin, Token, Usuario as UsuarioSchema,
@@ -14,7 +14,7 @@ import secrets
 import uuid
 from app.utils.email import send_password_reset_email
 
-router = APIRouter(prefix="/auth", tags=["autenticación"])
+router = APIRouter(prefix="/auth", tags=["autenticación"], route_class=DbSessionRoute)
 
 @router.post("/login", response_model=Token)
 def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
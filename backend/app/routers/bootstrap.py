@@ -0,0 +1,67 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from app.database import get_async_db, DbSessionRoute
+from app.models.equipo import Equipo
+from app.models.school import Colegio
+from app.schemas.user import Usuario as UsuarioSchema
+from app.schemas.school import School as SchoolSchema
+from app.auth.dependencies import get_current_active_user_async
+from app.routers.attendance_2026 import load_2026_calendar
+from app.curriculum import curriculum_catalog
+from app.utils.http_cache import GRID_CACHE_CONTROL
+from app.utils.responses import AppJSONResponse
+
+router = APIRouter(tags=["bootstrap"], route_class=DbSessionRoute)
+
+@router.get("/bootstrap")
+async def get_bootstrap(
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_active_user_async)
+):
+    """
+    Datos iniciales del frontend en una sola respuesta: usuario actual, equipos visibles con su
+    colegio, colegios, calendario 2026 y catálogo curricular.
+    Reemplaza /auth/me, /equipos/, /equipos/con-colegios/, /schools/, /attendance-2026/calendar/weeks,
+    /tickets/unidades y los /.../equipos de cada página. Hace a lo más 3 consultas (usuario, equipos, colegios).
+    """
+    try:
+        # Equipos visibles: el tutor solo ve su equipo
+        equipos_query = select(Equipo).options(joinedload(Equipo.colegio)).order_by(Equipo.id)
+        if current_user.rol == 'tutor':
+            equipos_query = equipos_query.where(Equipo.id == current_user.equipo_id)
+        equipos = (await db.execute(equipos_query)).scalars().all()
+
+        if current_user.rol == 'admin':
+            colegios = (await db.execute(select(Colegio).order_by(Colegio.id))).scalars().all()
+        else:
+            colegios = list({equipo.colegio.id: equipo.colegio for equipo in equipos if equipo.colegio}.values())
+
+        catalog = curriculum_catalog.index
+        calendar = load_2026_calendar()
+
+        return AppJSONResponse({
+            "user": UsuarioSchema.model_validate(current_user).model_dump(),
+            "equipos": [
+                {
+                    "id": equipo.id,
+                    "nombre": equipo.nombre,
+                    "descripcion": equipo.descripcion,
+                    "colegio_id": equipo.colegio_id,
+                    "colegio_nombre": equipo.colegio.nombre if equipo.colegio else "Sin colegio",
+                    "colegio_comuna": equipo.colegio.comuna if equipo.colegio else "Sin comuna"
+                }
+                for equipo in equipos
+            ],
+            "colegios": [SchoolSchema.model_validate(colegio).model_dump() for colegio in colegios],
+            "calendar": {"weeks": calendar, "total_weeks": len(calendar)},
+            "curriculum": {
+                "version": catalog.version,
+                "unidades": catalog.unidades,
+                "modulos": dict(catalog.modulos_por_unidad)
+            }
+        }, headers={"Cache-Control": GRID_CACHE_CONTROL})
+    except Exception as e:
+        print(f"Error en get_bootstrap: {e}")
+        raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
@@ -0,0 +1,80 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from app.database import run_with_async_session, DbSessionRoute
+from app.models.equipo import Equipo
+from app.auth.dependencies import get_current_user_async
+from app.analytics.attendance_matrix import student_attendance
+from app.routers.attendance import build_students_attendance_stats, build_tutors_attendance_stats
+from app.utils.responses import AppJSONResponse
+import asyncio
+import time
+
+router = APIRouter(tags=["dashboard"], route_class=DbSessionRoute)
+
+async def build_team_averages(db: AsyncSession) -> list:
+    """Promedio de asistencia de los estudiantes de cada equipo (totales por equipo desde la matriz en memoria)"""
+    matrix = await student_attendance.get()
+    # (estudiantes, asistidas, inasistencias, registros) por equipo
+    team_totals = dict(zip(matrix.equipos.tolist(), zip(*(totals.tolist() for totals in matrix.team_totals()))))
+
+    equipos = (await db.execute(
+        select(Equipo).options(joinedload(Equipo.colegio)).order_by(Equipo.id)
+    )).scalars().all()
+
+    teams = []
+    for equipo in equipos:
+        total_students, attended, absent, total_records = team_totals.get(equipo.id, (0, 0, 0, 0))
+        teams.append({
+            "equipo_id": equipo.id,
+            "equipo_nombre": equipo.nombre,
+            "colegio_nombre": equipo.colegio.nombre if equipo.colegio else "Sin colegio",
+            "total_students": total_students,
+            "attended_weeks": attended,
+            "absent_weeks": absent,
+            "attendance_percentage": round(attended / total_records * 100, 2) if total_records > 0 else 0
+        })
+    return teams
+
+async def timed(name: str, timings: dict, fn, with_session: bool = True):
+    """Ejecuta `fn` (en su propia sesión si la necesita) y registra su duración"""
+    start = time.perf_counter()
+    try:
+        return await (run_with_async_session(fn) if with_session else fn())
+    finally:
+        timings[name] = (time.perf_counter() - start) * 1000
+
+@router.get("/dashboard")
+async def get_dashboard(
+    current_user = Depends(get_current_user_async)
+):
+    """
+    Datos del dashboard en una sola respuesta: estadísticas de estudiantes y tutores, listas de
+    riesgo y promedios por equipo. Cada bloque corre en paralelo con su propia conexión del pool,
+    así la latencia es la del bloque más lento y no la suma (ver header Server-Timing).
+    """
+    try:
+        start = time.perf_counter()
+        timings = {}
+        students, tutors, teams = await asyncio.gather(
+            timed("students", timings, build_students_attendance_stats, with_session=False),
+            timed("tutors", timings, build_tutors_attendance_stats, with_session=False),
+            timed("teams", timings, build_team_averages),
+        )
+        timings["total"] = (time.perf_counter() - start) * 1000
+
+        return AppJSONResponse({
+            "students": students,
+            "tutors": tutors,
+            "teams": teams,
+            "at_risk": {
+                "students": students["students_with_3_plus_absences"],
+                "tutors": tutors["tutors_with_3_plus_absences"]
+            }
+        }, headers={
+            "Server-Timing": ", ".join(f"{name};dur={duration:.1f}" for name, duration in timings.items())
+        })
+    except Exception as e:
+        print(f"Error en get_dashboard: {e}")
+        raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
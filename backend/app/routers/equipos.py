@@ -1,14 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
-from app.database import get_db
+from app.database import get_db, DbSessionRoute
 from app.models.equipo import Equipo
 from app.models.tutor import Tutor
 from app.models.school import Colegio
 from app.schemas.equipo import Equipo as EquipoSchema, EquipoCreate, EquipoConDetalles
 from app.auth.dependencies import get_current_active_user, get_admin_user, get_tutor_user
 
-router = APIRouter(prefix="/equipos", tags=["equipos"])
+router = APIRouter(prefix="/equipos", tags=["equipos"], route_class=DbSessionRoute)
 
 @router.get("/", response_model=List[EquipoSchema])
 def get_equipos(
@@ -1,39 +1,76 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Body, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, status, Body, UploadFile, File, Query, Response
+from sqlalchemy import func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
-from typing import List
-from app.database import get_db
+from typing import List, Optional
+from app.database import get_db, get_async_db, DbSessionRoute
 from app.models.student import Estudiante
 from app.models.equipo import Equipo
 from app.models.school import Colegio
 from app.schemas.estudiante import Estudiante as EstudianteSchema, EstudianteCreate, EstudianteDeleteRequest
-from app.models.attendance import AsistenciaEstudiante
-from app.models.tickets import TicketEstudiante
-from app.models.prueba_diagnostico import PruebaDiagnosticoEstudiante
-from app.models.prueba_unidad import PruebaUnidadEstudiante
-from app.auth.dependencies import get_current_active_user, get_admin_user, get_tutor_user
-from openpyxl import load_workbook
-import re
+from app.auth.dependencies import get_current_active_user, get_current_active_user_async, get_admin_user, get_admin_user_async, get_tutor_user
+from app.utils.pagination import paginate, prefix_filter
+from app.utils.fieldsets import model_fields, parse_fields, sparse_select, sparse_response
+from app.utils.rut import parse_rut, parse_ruts
+from app.utils.bulk import bulk_delete, bulk_result, bulk_update
+from app.schemas.bulk import BulkIdsRequest, BulkDeactivateRequest, BulkTransferRequest
 from pydantic import BaseModel
 
-router = APIRouter(prefix="/estudiantes", tags=["estudiantes"])
+router = APIRouter(prefix="/estudiantes", tags=["estudiantes"], route_class=DbSessionRoute)
+
+ESTUDIANTE_FIELDS = model_fields(Estudiante, computed=["nombre_completo"])
 
 @router.get("/", response_model=List[EstudianteSchema])
-def get_estudiantes(
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_active_user)
+async def get_estudiantes(
+    response: Response,
+    equipo_id: Optional[int] = Query(None, description="ID del equipo"),
+    colegio_id: Optional[int] = Query(None, description="ID del colegio"),
+    curso: Optional[str] = Query(None, description="Curso (ej: 1° Medio)"),
+    activo: Optional[bool] = Query(None, description="Filtrar por estado activo/inactivo"),
+    q: Optional[str] = Query(None, description="Prefijo del nombre o apellido"),
+    limit: Optional[int] = Query(None, ge=1, description="Tamaño de página (sin límite si se omite)"),
+    cursor: Optional[str] = Query(None, description="Cursor de la página siguiente (header X-Next-Cursor)"),
+    include_total: bool = Query(False, description="Incluir el total en el header X-Total-Count"),
+    fields: Optional[str] = Query(None, description="Campos separados por coma (ej: id,nombre,apellido)"),
+    directorio: bool = Query(False, description="Solo id y nombre_completo, para selectores"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_active_user_async)
 ):
-    """Obtener estudiantes según el rol del usuario"""
+    """Obtener estudiantes según el rol del usuario, ordenados por apellido con paginación por cursor"""
     try:
-        if current_user.rol == "admin":
-            # Admin puede ver todos los estudiantes
-            estudiantes = db.query(Estudiante).options(
-                joinedload(Estudiante.equipo).joinedload(Equipo.colegio)
-            ).all()
+        names = parse_fields(fields, directorio, ESTUDIANTE_FIELDS)
+        sort_columns = [Estudiante.apellido, Estudiante.id]
+        if names:
+            # Campos parciales: solo esas columnas, sin objetos ORM ni equipo/colegio anidados
+            query = sparse_select(Estudiante, names, sort_columns, {
+                "activo": func.coalesce(Estudiante.activo, True),
+                "nombre_completo": Estudiante.nombre + " " + Estudiante.apellido
+            })
         else:
+            query = select(Estudiante).options(joinedload(Estudiante.equipo).joinedload(Equipo.colegio))
+        
+        if current_user.rol != "admin":
             # Tutor solo puede ver estudiantes de su equipo
-            estudiantes = db.query(Estudiante).options(
-                joinedload(Estudiante.equipo).joinedload(Equipo.colegio)
-            ).filter(Estudiante.equipo_id == current_user.equipo_id).all()
+            query = query.where(Estudiante.equipo_id == current_user.equipo_id)
+        
+        # Filtros
+        if equipo_id:
+            query = query.where(Estudiante.equipo_id == equipo_id)
+        if colegio_id:
+            query = query.where(Estudiante.equipo_id.in_(select(Equipo.id).where(Equipo.colegio_id == colegio_id)))
+        if curso:
+            query = query.where(Estudiante.curso == curso)
+        if activo is not None:
+            # activo NULL se considera activo
+            query = query.where(or_(Estudiante.activo == True, Estudiante.activo.is_(None)) if activo else Estudiante.activo == False)
+        if q and q.strip():
+            query = query.where(prefix_filter([Estudiante.nombre, Estudiante.apellido], q))
+        
+        if names:
+            rows = await paginate(db, query, sort_columns, limit, cursor, include_total, response, scalars=False)
+            return sparse_response(rows, names, response)
+
+        estudiantes = await paginate(db, query, sort_columns, limit, cursor, include_total, response)
         
         # Asegurar que activo tenga un valor por defecto si es None
         for estudiante in estudiantes:
@@ -41,6 +78,8 @@ def get_estudiantes(
                 estudiante.activo = True
         
         return estudiantes
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error en get_estudiantes: {e}")
         import traceback
@@ -92,8 +131,16 @@ def create_estudiante(
             detail="Solo puedes agregar estudiantes a tu equipo"
         )
     
-    # Verificar que el RUT no esté en uso
-    existing_estudiante = db.query(Estudiante).filter(Estudiante.rut == estudiante.rut).first()
+    # Validar el dígito verificador del RUT
+    parsed_rut = parse_rut(estudiante.rut)
+    if parsed_rut is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="El RUT no es válido (revisa el dígito verificador)"
+        )
+    
+    # Verificar que el RUT no esté en uso (con o sin puntos y guión)
+    existing_estudiante = db.query(Estudiante).filter(Estudiante.rut_numero == parsed_rut[0]).first()
     if existing_estudiante:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -108,24 +155,10 @@ def create_estudiante(
         return db_estudiante
     except Exception as e:
         db.rollback()
-        # Si hay error de ID duplicado, intentar obtener el siguiente ID disponible
-        if "llave duplicada" in str(e) or "duplicate key" in str(e):
-            # Obtener el máximo ID actual
-            max_id = db.query(Estudiante).order_by(Estudiante.id.desc()).first()
-            next_id = (max_id.id + 1) if max_id else 1
-            
-            # Crear el estudiante con ID explícito
-            estudiante_data = estudiante.dict()
-            db_estudiante = Estudiante(id=next_id, **estudiante_data)
-            db.add(db_estudiante)
-            db.commit()
-            db.refresh(db_estudiante)
-            return db_estudiante
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Error al crear el estudiante: {str(e)}"
-            )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error al crear el estudiante: {str(e)}"
+        )
 
 @router.delete("/{estudiante_id}")
 def delete_estudiante(
@@ -162,24 +195,48 @@ def delete_estudiante(
         db.refresh(estudiante)
         return {"message": "Estudiante marcado como desertor exitosamente"}
     else:
-        # Eliminación física completa - eliminar todos los registros relacionados
-        # Eliminar registros de asistencia
-        db.query(AsistenciaEstudiante).filter(AsistenciaEstudiante.estudiante_id == estudiante_id).delete()
-        # Eliminar registros de tickets
-        db.query(TicketEstudiante).filter(TicketEstudiante.estudiante_id == estudiante_id).delete()
-        # Eliminar registros de prueba diagnóstico
-        db.query(PruebaDiagnosticoEstudiante).filter(PruebaDiagnosticoEstudiante.estudiante_id == estudiante_id).delete()
-        # Eliminar registros de prueba unidad
-        db.query(PruebaUnidadEstudiante).filter(PruebaUnidadEstudiante.estudiante_id == estudiante_id).delete()
-        # Eliminar el estudiante
+        # Eliminación física completa: asistencia, tickets y pruebas se borran por ON DELETE CASCADE
         db.delete(estudiante)
         db.commit()
         return {"message": "Estudiante eliminado completamente de la base de datos"}
 
-def validate_rut(rut: str) -> bool:
-    """Validar formato de RUT chileno: XX.XXX.XXX-X o X.XXX.XXX-X"""
-    pattern = r'^(\d{1,2}\.\d{3}\.\d{3}-[\dkK])$'
-    return bool(re.match(pattern, rut.strip()))
+@router.post("/bulk-deactivate")
+async def bulk_deactivate_estudiantes(
+    request: BulkDeactivateRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_active_user_async)
+):
+    """Marcar varios estudiantes como desertores (ej. un curso completo) en un solo UPDATE"""
+    affected = await bulk_update(
+        db, Estudiante, request.ids, current_user,
+        activo=False, motivo_desercion=request.motivo_desercion
+    )
+    return bulk_result(f"{len(affected)} estudiantes marcados como desertores", request.ids, affected)
+
+@router.post("/bulk-delete")
+async def bulk_delete_estudiantes(
+    request: BulkIdsRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_active_user_async)
+):
+    """Eliminar varios estudiantes y todos sus registros en un solo DELETE"""
+    affected = await bulk_delete(db, Estudiante, request.ids, current_user)
+    return bulk_result(f"{len(affected)} estudiantes eliminados", request.ids, affected)
+
+@router.post("/bulk-transfer")
+async def bulk_transfer_estudiantes(
+    request: BulkTransferRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_admin_user_async)
+):
+    """Mover varios estudiantes a otro equipo (solo administradores)"""
+    if await db.get(Equipo, request.equipo_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Equipo no encontrado"
+        )
+    affected = await bulk_update(db, Estudiante, request.ids, current_user, equipo_id=request.equipo_id)
+    return bulk_result(f"{len(affected)} estudiantes transferidos al equipo {request.equipo_id}", request.ids, affected)
 
 @router.post("/import")
 async def import_estudiantes(
@@ -199,6 +256,8 @@ async def import_estudiantes(
     try:
         # Leer el archivo Excel
         contents = await file.read()
+        # openpyxl es pesado; se importa solo cuando se usa para no alargar el arranque en frío
+        from openpyxl import load_workbook
         from io import BytesIO
         workbook = load_workbook(filename=BytesIO(contents), read_only=True, data_only=True)
         sheet = workbook.active
@@ -230,16 +289,27 @@ async def import_estudiantes(
                 if header_lower in expected_lower:
                     header_map[expected_lower.index(header_lower)] = idx
         
+        rows = [
+            (row_num, row)
+            for row_num, row in enumerate(sheet.iter_rows(min_row=2, values_only=True), start=2)
+            if any(row)  # Saltar filas vacías
+        ]
+        
+        # Validar todos los RUT de una vez y buscar los que ya existen con una sola consulta
+        parsed_ruts = parse_ruts(row[header_map[0] - 1] for _, row in rows)
+        numeros = {parsed[0] for parsed in parsed_ruts if parsed}
+        registered_ruts = set()
+        if numeros:
+            registered_ruts = set(db.scalars(
+                select(Estudiante.rut_numero).where(Estudiante.rut_numero.in_(numeros))
+            ).all())
+        
         # Procesar filas
         created = 0
         errors = []
         existing_ruts = set()
         
-        for row_num, row in enumerate(sheet.iter_rows(min_row=2, values_only=True), start=2):
-            # Saltar filas vacías
-            if not any(row):
-                continue
-            
+        for (row_num, row), parsed_rut in zip(rows, parsed_ruts):
             try:
                 # Extraer datos según índices
                 rut = str(row[header_map[0] - 1]).strip() if row[header_map[0] - 1] else None
@@ -256,8 +326,8 @@ async def import_estudiantes(
                     errors.append(f"Fila {row_num}: RUT es requerido")
                     continue
                 
-                if not validate_rut(rut):
-                    errors.append(f"Fila {row_num}: RUT '{rut}' no tiene el formato correcto (debe ser XX.XXX.XXX-X o X.XXX.XXX-X)")
+                if parsed_rut is None:
+                    errors.append(f"Fila {row_num}: RUT '{rut}' no es válido (formato XX.XXX.XXX-X con dígito verificador correcto)")
                     continue
                 
                 if not nombre:
@@ -293,15 +363,14 @@ async def import_estudiantes(
                     errors.append(f"Fila {row_num}: Solo puedes agregar estudiantes a tu equipo (ID: {current_user.equipo_id})")
                     continue
                 
-                # Verificar RUT duplicado en el archivo
-                if rut in existing_ruts:
+                # Verificar RUT duplicado en el archivo (con o sin puntos y guión)
+                if parsed_rut[0] in existing_ruts:
                     errors.append(f"Fila {row_num}: RUT '{rut}' está duplicado en el archivo")
                     continue
-                existing_ruts.add(rut)
+                existing_ruts.add(parsed_rut[0])
                 
                 # Verificar que el RUT no esté en uso en la base de datos
-                existing_estudiante = db.query(Estudiante).filter(Estudiante.rut == rut).first()
-                if existing_estudiante:
+                if parsed_rut[0] in registered_ruts:
                     errors.append(f"Fila {row_num}: Ya existe un estudiante con RUT '{rut}'")
                     continue
                 
@@ -325,24 +394,7 @@ async def import_estudiantes(
                     created += 1
                 except Exception as e:
                     db.rollback()
-                    # Si hay error de ID duplicado, intentar obtener el siguiente ID disponible
-                    if "llave duplicada" in str(e) or "duplicate key" in str(e) or "UniqueViolation" in str(e):
-                        try:
-                            # Obtener el máximo ID actual
-                            max_id = db.query(Estudiante).order_by(Estudiante.id.desc()).first()
-                            next_id = (max_id.id + 1) if max_id else 1
-                            
-                            # Crear el estudiante con ID explícito
-                            db_estudiante = Estudiante(id=next_id, **estudiante_data)
-                            db.add(db_estudiante)
-                            db.commit()
-                            db.refresh(db_estudiante)
-                            created += 1
-                        except Exception as e2:
-                            db.rollback()
-                            errors.append(f"Fila {row_num}: Error al crear estudiante (ID duplicado y fallo al corregir) - {str(e2)}")
-                    else:
-                        errors.append(f"Fila {row_num}: Error al procesar - {str(e)}")
+                    errors.append(f"Fila {row_num}: Error al procesar - {str(e)}")
                 
             except Exception as e:
                 db.rollback()
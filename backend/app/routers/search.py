@@ -0,0 +1,126 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import case, func, literal, literal_column, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from app.database import get_async_db, DbSessionRoute
+from app.models.student import Estudiante
+from app.models.tutor import Tutor
+from app.auth.dependencies import get_current_active_user_async
+from app.utils.pagination import escape_like
+from app.utils.trigram import WORD_SIMILARITY_THRESHOLD, word_similarity
+import re
+
+router = APIRouter(tags=["search"], route_class=DbSessionRoute)
+
+SEARCH_TYPES = ("estudiantes", "tutores")
+
+# None hasta la primera búsqueda; luego indica si PostgreSQL tiene pg_trgm instalado
+_trigram_available: Optional[bool] = None
+
+def full_name(model):
+    """nombre || ' ' || apellido con el separador literal: debe coincidir con la expresión del índice GIN"""
+    return model.nombre.op("||")(literal_column("' '")).op("||")(model.apellido)
+
+def normalized_rut(column):
+    """RUT sin puntos ni guión y en mayúsculas (12.345.678-k -> 12345678K), igual que el índice GIN"""
+    without_dots = func.replace(column, literal_column("'.'"), literal_column("''"))
+    return func.upper(func.replace(without_dots, literal_column("'-'"), literal_column("''")))
+
+def rut_search_key(q: str) -> Optional[str]:
+    """La búsqueda como RUT normalizado, si parece un RUT (al menos 3 dígitos)"""
+    value = re.sub(r"[.\-\s]", "", q).upper()
+    return value if re.fullmatch(r"\d{3,}K?", value) else None
+
+async def trigram_available(db: AsyncSession) -> bool:
+    global _trigram_available
+    if _trigram_available is None:
+        if db.bind.dialect.name != "postgresql":
+            _trigram_available = False
+        else:
+            result = await db.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'"))
+            _trigram_available = result.scalar() is not None
+            if not _trigram_available:
+                print("[SEARCH] pg_trgm no está instalado (migración 0005); se usa la búsqueda en Python")
+    return _trigram_available
+
+def search_columns(model) -> list:
+    columns = [model.id, model.nombre, model.apellido]
+    columns += [model.rut, model.curso] if model is Estudiante else [model.email]
+    return columns + [model.equipo_id, func.coalesce(model.activo, True).label("activo")]
+
+def scoped(query, model, current_user):
+    if current_user.rol != "admin":
+        # Tutor solo puede buscar en su equipo
+        query = query.where(model.equipo_id == current_user.equipo_id)
+    return query
+
+async def search_trigram(db: AsyncSession, model, q: str, rut_key: Optional[str], limit: int, current_user) -> List[dict]:
+    """Búsqueda en PostgreSQL: cada condición usa un índice GIN de trigramas (migración 0005)"""
+    name = full_name(model)
+    score = func.word_similarity(q, name)
+    conditions = [name.op("%>")(q), name.ilike(f"%{escape_like(q)}%", escape="\\")]
+
+    if rut_key and model is Estudiante:
+        rut = normalized_rut(model.rut)
+        conditions.append(rut.like(f"%{rut_key}%"))
+        # Coincidencia parcial del RUT: proporción del RUT cubierta por la búsqueda (1 si es exacto)
+        score = func.greatest(score, case(
+            (rut.like(f"%{rut_key}%"), literal(float(len(rut_key))) / func.length(rut)),
+            else_=0.0
+        ))
+
+    query = scoped(select(*search_columns(model), score.label("score")), model, current_user)
+    query = query.where(or_(*conditions)).order_by(score.desc(), model.apellido, model.id).limit(limit)
+    rows = (await db.execute(query)).all()
+    return [{**row._mapping, "score": round(float(row.score), 3)} for row in rows]
+
+async def search_python(db: AsyncSession, model, q: str, rut_key: Optional[str], limit: int, current_user) -> List[dict]:
+    """Búsqueda sin pg_trgm (SQLite en pruebas locales): mismas reglas de coincidencia y orden, en Python"""
+    rows = (await db.execute(scoped(select(*search_columns(model)), model, current_user))).all()
+
+    needle = q.lower()
+    ranked = []
+    for row in rows:
+        name = f"{row.nombre} {row.apellido}"
+        score = word_similarity(q, name)
+        matched = score >= WORD_SIMILARITY_THRESHOLD or needle in name.lower()
+        if rut_key and model is Estudiante:
+            rut = re.sub(r"[.\-]", "", row.rut).upper()
+            if rut_key in rut:
+                matched = True
+                score = max(score, len(rut_key) / len(rut))
+        if matched:
+            ranked.append((-score, row.apellido, row.id, {**row._mapping, "score": round(score, 3)}))
+
+    ranked.sort(key=lambda item: item[:3])
+    return [item[3] for item in ranked[:limit]]
+
+@router.get("/search")
+async def search(
+    q: str = Query(..., min_length=2, description="Nombre, apellido o RUT (con o sin puntos y guión)"),
+    tipo: Optional[str] = Query(None, description="estudiantes o tutores (ambos si se omite)"),
+    limit: int = Query(20, ge=1, le=100, description="Máximo de resultados por tipo"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_active_user_async)
+):
+    """
+    Búsqueda aproximada de estudiantes y tutores por nombre, apellido o RUT, ordenada por similitud.
+    Tolera errores de tipeo (trigramas) y RUT parciales; el tutor solo ve resultados de su equipo.
+    """
+    if tipo is not None and tipo not in SEARCH_TYPES:
+        raise HTTPException(status_code=400, detail="tipo debe ser 'estudiantes' o 'tutores'")
+
+    try:
+        q = q.strip()
+        rut_key = rut_search_key(q)
+        search_fn = search_trigram if await trigram_available(db) else search_python
+
+        result = {"query": q}
+        if tipo in (None, "estudiantes"):
+            result["estudiantes"] = await search_fn(db, Estudiante, q, rut_key, limit, current_user)
+        if tipo in (None, "tutores"):
+            result["tutores"] = await search_fn(db, Tutor, q, rut_key, limit, current_user)
+        return result
+    except Exception as e:
+        print(f"Error en search: {e}")
+        raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
@@ -1,16 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
 from typing import Optional, List
-from app.database import get_db
+from app.database import get_db, get_async_db, DbSessionRoute
+from app.utils.responses import AppJSONResponse
+from app.utils.http_cache import grid_etag, etag_matches, not_modified, grid_cache_headers
+from app.curriculum import curriculum_catalog
 from app.models.tickets import TicketEstudiante, EstadoTicket
 from app.models.student import Estudiante
 from app.models.equipo import Equipo
 from app.models.school import Colegio
-from app.auth.dependencies import get_current_user
+from app.auth.dependencies import get_current_user, get_current_user_async
 from pydantic import BaseModel
 import json
 
-router = APIRouter()
+router = APIRouter(route_class=DbSessionRoute)
 
 # Esquemas Pydantic
 class TicketUpdateRequest(BaseModel):
@@ -19,134 +24,83 @@ class TicketUpdateRequest(BaseModel):
     modulo: str
     resultado: str
 
-# Datos de módulos por unidad con nombres reales
-# Nota: Los modulo_key se mantienen como modulo_1, modulo_2, etc. para cada unidad
-# para mantener compatibilidad con datos existentes en la base de datos
-MODULOS_DATA = {
-    "unidad_1": [
-        {"modulo_key": "modulo_1", "nombre": "Módulo 1", "descripcion": "Adicción de N° Naturales"},
-        {"modulo_key": "modulo_2", "nombre": "Módulo 2", "descripcion": "Sustracción de N° Naturales"},
-        {"modulo_key": "modulo_3", "nombre": "Módulo 3", "descripcion": "Multiplicación de N° Naturales"},
-        {"modulo_key": "modulo_4", "nombre": "Módulo 4", "descripcion": "División de N° Naturales"},
-        {"modulo_key": "modulo_5", "nombre": "Módulo 5", "descripcion": "Operatoria Combinada de N° Naturales"}
-    ],
-    "unidad_2": [
-        {"modulo_key": "modulo_1", "nombre": "Módulo 6", "descripcion": "Adicción de N° Enteros"},
-        {"modulo_key": "modulo_2", "nombre": "Módulo 7", "descripcion": "Sustracción de N° Enteros"},
-        {"modulo_key": "modulo_3", "nombre": "Módulo 8", "descripcion": "Multiplicación y división de N° Enteros"},
-        {"modulo_key": "modulo_4", "nombre": "Módulo 9", "descripcion": "Operatoria Combinada de N° Enteros"},
-        {"modulo_key": "modulo_5", "nombre": "Módulo 10", "descripcion": "Resolución de Problemas de N° Enteros"}
-    ],
-    "unidad_3": [
-        {"modulo_key": "modulo_1", "nombre": "Módulo 11", "descripcion": "Conceptos Claves de Fracciones"},
-        {"modulo_key": "modulo_2", "nombre": "Módulo 12", "descripcion": "Suma y Resta de Fracciones"},
-        {"modulo_key": "modulo_3", "nombre": "Módulo 13", "descripcion": "Multiplicación de Fracciones"},
-        {"modulo_key": "modulo_4", "nombre": "Módulo 14", "descripcion": "División de Fracciones"},
-        {"modulo_key": "modulo_5", "nombre": "Módulo 15", "descripcion": "Suma y Resta de Decimales"},
-        {"modulo_key": "modulo_6", "nombre": "Módulo 16", "descripcion": "Multiplicación de Decimales"},
-        {"modulo_key": "modulo_7", "nombre": "Módulo 17", "descripcion": "División de Decimales"},
-        {"modulo_key": "modulo_8", "nombre": "Módulo 18", "descripcion": "Conjuntos Numéricos"},
-        {"modulo_key": "modulo_9", "nombre": "Módulo 19", "descripcion": "Operatoria Combinada de N° Racionales"},
-        {"modulo_key": "modulo_10", "nombre": "Módulo 20", "descripcion": "Resolución de Problemas de N° Racionales"}
-    ],
-    "unidad_4": [
-        {"modulo_key": "modulo_1", "nombre": "Módulo 21", "descripcion": "Conceptos Claves de %"},
-        {"modulo_key": "modulo_2", "nombre": "Módulo 22", "descripcion": "Cálculo de % más directos"},
-        {"modulo_key": "modulo_3", "nombre": "Módulo 23", "descripcion": "Cálculo de cualquier %"},
-        {"modulo_key": "modulo_4", "nombre": "Módulo 24", "descripcion": "Resolución de Problemas de % 1"},
-        {"modulo_key": "modulo_5", "nombre": "Módulo 25", "descripcion": "Resolución de Problemas de % 2"}
-    ],
-    "unidad_5": [
-        {"modulo_key": "modulo_1", "nombre": "Módulo 26", "descripcion": "Conceptos Claves de Raíces"},
-        {"modulo_key": "modulo_2", "nombre": "Módulo 27", "descripcion": "Cálculo de Raíces"},
-        {"modulo_key": "modulo_3", "nombre": "Módulo 28", "descripcion": "Propiedades de Raíces"},
-        {"modulo_key": "modulo_4", "nombre": "Módulo 29", "descripcion": "Resolución de Problemas de Raíces"},
-        {"modulo_key": "modulo_5", "nombre": "Módulo 30", "descripcion": "Conceptos Claves de Potencias"},
-        {"modulo_key": "modulo_6", "nombre": "Módulo 31", "descripcion": "Cálculo de Potencias"},
-        {"modulo_key": "modulo_7", "nombre": "Módulo 32", "descripcion": "Propiedades de Potencias"},
-        {"modulo_key": "modulo_8", "nombre": "Módulo 33", "descripcion": "Resolución de Problemas de Potencias"}
-    ]
-}
-
 @router.get("/unidades")
-def get_unidades(
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
-):
-    """Obtener lista de unidades disponibles"""
-    try:
-        unidades = [
-            {"unidad_key": "unidad_1", "nombre": "Unidad 1", "descripcion": "Primera unidad del programa"},
-            {"unidad_key": "unidad_2", "nombre": "Unidad 2", "descripcion": "Segunda unidad del programa"},
-            {"unidad_key": "unidad_3", "nombre": "Unidad 3", "descripcion": "Tercera unidad del programa"},
-            {"unidad_key": "unidad_4", "nombre": "Unidad 4", "descripcion": "Cuarta unidad del programa"},
-            {"unidad_key": "unidad_5", "nombre": "Unidad 5", "descripcion": "Quinta unidad del programa"}
-        ]
-        return {"unidades": unidades}
-    except Exception as e:
-        print(f"Error en get_unidades: {e}")
-        raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
+async def get_unidades(request: Request):
+    """Obtener lista de unidades disponibles (catálogo preserializado, no abre sesión de base de datos)"""
+    return curriculum_catalog.index.unidades_response.response(request)
 
 @router.get("/modulos")
-def get_modulos(
-    unidad: Optional[str] = Query(None, description="Unidad para obtener módulos"),
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
+async def get_modulos(
+    request: Request,
+    unidad: Optional[str] = Query(None, description="Unidad para obtener módulos")
 ):
     """Obtener módulos de una unidad específica"""
-    try:
-        if not unidad:
-            return {"modulos": []}
-        
-        if unidad not in MODULOS_DATA:
-            raise HTTPException(status_code=400, detail="Unidad no válida")
-        
-        return {"modulos": MODULOS_DATA[unidad]}
-    except Exception as e:
-        print(f"Error en get_modulos: {e}")
-        raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
+    catalog = curriculum_catalog.index
+    if not unidad:
+        return catalog.sin_modulos_response.response(request)
+    
+    if unidad not in catalog.modulos_responses:
+        raise HTTPException(status_code=400, detail="Unidad no válida")
+    
+    return catalog.modulos_responses[unidad].response(request)
 
 @router.get("/students")
-def get_students_tickets(
+async def get_students_tickets(
+    request: Request,
     unidad: Optional[str] = Query(None, description="Unidad para filtrar"),
     equipo_id: Optional[int] = Query(None, description="ID del equipo"),
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user_async)
 ):
     """Obtener tickets de estudiantes con filtros"""
     try:
         if not unidad:
             raise HTTPException(status_code=400, detail="Unidad es requerida")
         
-        # Construir query base
-        query = db.query(Estudiante).join(Equipo).join(Colegio)
+        # Construir query base (ids de los estudiantes visibles)
+        student_ids = select(Estudiante.id).join(Equipo).join(Colegio)
         
         # Aplicar filtros según el rol del usuario
         if current_user.rol == 'tutor':
             # Tutor solo ve estudiantes de su equipo
-            query = query.filter(Estudiante.equipo_id == current_user.equipo_id)
+            student_ids = student_ids.where(Estudiante.equipo_id == current_user.equipo_id)
         elif current_user.rol == 'admin' and equipo_id:
             # Admin puede filtrar por equipo específico
-            query = query.filter(Estudiante.equipo_id == equipo_id)
-        
-        estudiantes = query.all()
+            student_ids = student_ids.where(Estudiante.equipo_id == equipo_id)
         
         # Obtener módulos de la unidad
-        modulos = MODULOS_DATA.get(unidad, [])
+        catalog = curriculum_catalog.index
+        modulos = catalog.modulos(unidad)
+        
+        # Si la grilla no cambió desde la última visita, responder 304 sin consultarla
+        etag = await grid_etag(db, request, current_user, [
+            (Estudiante, Estudiante.id.in_(student_ids)),
+            (TicketEstudiante, and_(TicketEstudiante.estudiante_id.in_(student_ids), TicketEstudiante.unidad == unidad)),
+        ], extra=catalog.version)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        
+        estudiantes = (await db.execute(
+            select(Estudiante)
+            .options(joinedload(Estudiante.equipo).joinedload(Equipo.colegio))
+            .where(Estudiante.id.in_(student_ids))
+        )).scalars().all()
+        
+        # Obtener en una sola consulta los resultados de la unidad para todos los estudiantes
+        tickets_por_estudiante = {}
+        registros = await db.execute(
+            select(TicketEstudiante.estudiante_id, TicketEstudiante.modulo, TicketEstudiante.resultado).where(
+                TicketEstudiante.estudiante_id.in_(student_ids),
+                TicketEstudiante.unidad == unidad
+            )
+        )
+        for estudiante_id, modulo, resultado in registros.all():
+            tickets_por_estudiante.setdefault(estudiante_id, {})[modulo] = resultado.value if resultado else "vacío"
         
         # Construir respuesta con datos de tickets
         students_data = []
         for estudiante in estudiantes:
-            # Obtener tickets existentes para esta unidad
-            tickets_existentes = db.query(TicketEstudiante).filter(
-                TicketEstudiante.estudiante_id == estudiante.id,
-                TicketEstudiante.unidad == unidad
-            ).all()
-            
-            # Crear diccionario de tickets por módulo
-            tickets_por_modulo = {}
-            for ticket in tickets_existentes:
-                tickets_por_modulo[ticket.modulo] = ticket.resultado.value if ticket.resultado else "vacío"
+            tickets_por_modulo = tickets_por_estudiante.get(estudiante.id, {})
             
             # Crear estructura de datos del estudiante
             student_data = {
@@ -165,11 +119,11 @@ def get_students_tickets(
             
             students_data.append(student_data)
         
-        return {
+        return AppJSONResponse({
             "unidad": unidad,
             "modulos": modulos,
             "students": students_data
-        }
+        }, headers=grid_cache_headers(etag))
         
     except Exception as e:
         print(f"Error en get_students_tickets: {e}")
@@ -213,52 +167,43 @@ def get_all_tickets_for_export(
         
         estudiantes = query.all()
         
-        # Obtener todos los tickets de todos los estudiantes
-        all_tickets_data = []
-        
-        # Crear un mapa de tickets existentes por estudiante
-        tickets_map = {}
-        all_tickets = db.query(TicketEstudiante).all()
-        for ticket in all_tickets:
-            if ticket.estudiante_id not in tickets_map:
-                tickets_map[ticket.estudiante_id] = []
-            tickets_map[ticket.estudiante_id].append(ticket)
+        # Ubicar los registros de los estudiantes visibles en la posición de su par (unidad, módulo)
+        catalog = curriculum_catalog.index
+        registros = db.query(TicketEstudiante).filter(TicketEstudiante.estudiante_id.in_(query.with_entities(Estudiante.id)))
+        tickets_por_estudiante = catalog.slots_by_student(registros)
+        sin_registros = [None] * len(catalog.pairs)
         
         # Para cada estudiante, generar entradas para todas las unidades y módulos
+        all_tickets_data = []
         for estudiante in estudiantes:
-            estudiante_tickets = tickets_map.get(estudiante.id, [])
-            tickets_dict = {(t.unidad, t.modulo): t for t in estudiante_tickets}
+            datos_estudiante = {
+                "estudiante_id": estudiante.id,
+                "rut": estudiante.rut,
+                "nombre": estudiante.nombre,
+                "apellido": estudiante.apellido,
+                "curso": estudiante.curso,
+                "equipo_id": estudiante.equipo_id,
+                "equipo_nombre": estudiante.equipo.nombre if estudiante.equipo else "Sin equipo",
+                "colegio_id": estudiante.equipo.colegio_id if estudiante.equipo else None,
+                "colegio_nombre": estudiante.equipo.colegio.nombre if estudiante.equipo and estudiante.equipo.colegio else "Sin colegio"
+            }
             
-            # Generar todas las combinaciones de unidad y módulo
-            for unidad_key, modulos in MODULOS_DATA.items():
-                unidad_nombre = f"Unidad {unidad_key.split('_')[1]}"
-                for modulo in modulos:
-                    ticket_key = (unidad_key, modulo["modulo_key"])
-                    ticket = tickets_dict.get(ticket_key)
-                    
-                    all_tickets_data.append({
-                        "estudiante_id": estudiante.id,
-                        "rut": estudiante.rut,
-                        "nombre": estudiante.nombre,
-                        "apellido": estudiante.apellido,
-                        "curso": estudiante.curso,
-                        "equipo_id": estudiante.equipo_id,
-                        "equipo_nombre": estudiante.equipo.nombre if estudiante.equipo else "Sin equipo",
-                        "colegio_id": estudiante.equipo.colegio_id if estudiante.equipo else None,
-                        "colegio_nombre": estudiante.equipo.colegio.nombre if estudiante.equipo and estudiante.equipo.colegio else "Sin colegio",
-                        "unidad": unidad_key,
-                        "unidad_nombre": unidad_nombre,
-                        "modulo": modulo["modulo_key"],
-                        "modulo_nombre": modulo["nombre"],
-                        "resultado": ticket.resultado.value if ticket and ticket.resultado else "vacío",
-                        "created_at": ticket.created_at.isoformat() if ticket and ticket.created_at else None,
-                        "updated_at": ticket.updated_at.isoformat() if ticket and ticket.updated_at else None
-                    })
+            for pair, ticket in zip(catalog.pairs, tickets_por_estudiante.get(estudiante.id, sin_registros)):
+                all_tickets_data.append({
+                    **datos_estudiante,
+                    "unidad": pair.unidad_key,
+                    "unidad_nombre": pair.unidad_nombre,
+                    "modulo": pair.modulo_key,
+                    "modulo_nombre": pair.modulo_nombre,
+                    "resultado": ticket.resultado.value if ticket and ticket.resultado else "vacío",
+                    "created_at": ticket.created_at if ticket else None,
+                    "updated_at": ticket.updated_at if ticket else None
+                })
         
-        return {
+        return AppJSONResponse({
             "tickets": all_tickets_data,
             "total": len(all_tickets_data)
-        }
+        })
         
     except Exception as e:
         print(f"Error en get_all_tickets_for_export: {e}")
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from typing import List
-from app.database import get_db
+from app.database import get_db, DbSessionRoute
 from app.models.attendance import AsistenciaTutor, EstadoAsistencia
 from app.models.tutor import Tutor
 from app.models.school import Colegio
@@ -13,7 +13,7 @@ from app.schemas.attendance import (
 )
 from app.auth.dependencies import get_current_user
 
-router = APIRouter(prefix="/tutor-attendance", tags=["tutor-attendance"])
+router = APIRouter(prefix="/tutor-attendance", tags=["tutor-attendance"], route_class=DbSessionRoute)
 
 @router.get("/summary", response_model=List[TutorAttendanceSummary])
 def get_tutor_attendance_summary(
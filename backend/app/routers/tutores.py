@@ -1,36 +1,73 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Body, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, status, Body, UploadFile, File, Query, Response
+from sqlalchemy import func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
-from typing import List
-from app.database import get_db
+from typing import List, Optional
+from app.database import get_db, get_async_db, DbSessionRoute
 from app.models.tutor import Tutor
 from app.models.equipo import Equipo
 from app.models.school import Colegio
 from app.schemas.tutor import Tutor as TutorSchema, TutorCreate, TutorDeleteRequest
-from app.models.attendance import AsistenciaTutor
-from app.auth.dependencies import get_current_active_user, get_admin_user, get_tutor_user
-from openpyxl import load_workbook
+from app.auth.dependencies import get_current_active_user, get_current_active_user_async, get_admin_user, get_admin_user_async, get_tutor_user
+from app.utils.pagination import paginate, prefix_filter
+from app.utils.fieldsets import model_fields, parse_fields, sparse_select, sparse_response
+from app.utils.bulk import bulk_delete, bulk_result, bulk_update
+from app.schemas.bulk import BulkIdsRequest, BulkDeactivateRequest, BulkTransferRequest
 from io import BytesIO
 import re
 
-router = APIRouter(prefix="/tutores", tags=["tutores"])
+router = APIRouter(prefix="/tutores", tags=["tutores"], route_class=DbSessionRoute)
+
+TUTOR_FIELDS = model_fields(Tutor, computed=["nombre_completo"])
 
 @router.get("/", response_model=List[TutorSchema])
-def get_tutores(
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_active_user)
+async def get_tutores(
+    response: Response,
+    equipo_id: Optional[int] = Query(None, description="ID del equipo"),
+    colegio_id: Optional[int] = Query(None, description="ID del colegio"),
+    activo: Optional[bool] = Query(None, description="Filtrar por estado activo/inactivo"),
+    q: Optional[str] = Query(None, description="Prefijo del nombre o apellido"),
+    limit: Optional[int] = Query(None, ge=1, description="Tamaño de página (sin límite si se omite)"),
+    cursor: Optional[str] = Query(None, description="Cursor de la página siguiente (header X-Next-Cursor)"),
+    include_total: bool = Query(False, description="Incluir el total en el header X-Total-Count"),
+    fields: Optional[str] = Query(None, description="Campos separados por coma (ej: id,nombre,apellido)"),
+    directorio: bool = Query(False, description="Solo id y nombre_completo, para selectores"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_active_user_async)
 ):
-    """Obtener tutores según el rol del usuario"""
+    """Obtener tutores según el rol del usuario, ordenados por apellido con paginación por cursor"""
     try:
-        if current_user.rol == "admin":
-            # Admin puede ver todos los tutores
-            tutores = db.query(Tutor).options(
-                joinedload(Tutor.equipo).joinedload(Equipo.colegio)
-            ).all()
+        names = parse_fields(fields, directorio, TUTOR_FIELDS)
+        sort_columns = [Tutor.apellido, Tutor.id]
+        if names:
+            # Campos parciales: solo esas columnas, sin objetos ORM ni equipo/colegio anidados
+            query = sparse_select(Tutor, names, sort_columns, {
+                "activo": func.coalesce(Tutor.activo, True),
+                "nombre_completo": Tutor.nombre + " " + Tutor.apellido
+            })
         else:
+            query = select(Tutor).options(joinedload(Tutor.equipo).joinedload(Equipo.colegio))
+        
+        if current_user.rol != "admin":
             # Tutor solo puede ver tutores de su equipo
-            tutores = db.query(Tutor).options(
-                joinedload(Tutor.equipo).joinedload(Equipo.colegio)
-            ).filter(Tutor.equipo_id == current_user.equipo_id).all()
+            query = query.where(Tutor.equipo_id == current_user.equipo_id)
+        
+        # Filtros
+        if equipo_id:
+            query = query.where(Tutor.equipo_id == equipo_id)
+        if colegio_id:
+            query = query.where(Tutor.equipo_id.in_(select(Equipo.id).where(Equipo.colegio_id == colegio_id)))
+        if activo is not None:
+            # activo NULL se considera activo
+            query = query.where(or_(Tutor.activo == True, Tutor.activo.is_(None)) if activo else Tutor.activo == False)
+        if q and q.strip():
+            query = query.where(prefix_filter([Tutor.nombre, Tutor.apellido], q))
+        
+        if names:
+            rows = await paginate(db, query, sort_columns, limit, cursor, include_total, response, scalars=False)
+            return sparse_response(rows, names, response)
+
+        tutores = await paginate(db, query, sort_columns, limit, cursor, include_total, response)
         
         # Asegurar que activo tenga un valor por defecto si es None
         for tutor in tutores:
@@ -38,6 +75,8 @@ def get_tutores(
                 tutor.activo = True
         
         return tutores
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error en get_tutores: {e}")
         import traceback
@@ -98,24 +137,10 @@ def create_tutor(
         return db_tutor
     except Exception as e:
         db.rollback()
-        # Si hay error de ID duplicado, intentar obtener el siguiente ID disponible
-        if "llave duplicada" in str(e) or "duplicate key" in str(e):
-            # Obtener el máximo ID actual
-            max_id = db.query(Tutor).order_by(Tutor.id.desc()).first()
-            next_id = (max_id.id + 1) if max_id else 1
-            
-            # Crear el tutor con ID explícito
-            tutor_data = tutor.dict()
-            db_tutor = Tutor(id=next_id, **tutor_data)
-            db.add(db_tutor)
-            db.commit()
-            db.refresh(db_tutor)
-            return db_tutor
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Error al crear el tutor: {str(e)}"
-            )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error al crear el tutor: {str(e)}"
+        )
 
 @router.delete("/{tutor_id}")
 def delete_tutor(
@@ -145,14 +170,49 @@ def delete_tutor(
         db.refresh(tutor)
         return {"message": "Tutor marcado como desertor exitosamente"}
     else:
-        # Eliminación física completa - eliminar todos los registros relacionados
-        # Eliminar registros de asistencia
-        db.query(AsistenciaTutor).filter(AsistenciaTutor.tutor_id == tutor_id).delete()
-        # Eliminar el tutor
+        # Eliminación física completa: la asistencia se borra por ON DELETE CASCADE
         db.delete(tutor)
         db.commit()
         return {"message": "Tutor eliminado completamente de la base de datos"}
 
+@router.post("/bulk-deactivate")
+async def bulk_deactivate_tutores(
+    request: BulkDeactivateRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_admin_user_async)
+):
+    """Marcar varios tutores como desertores en un solo UPDATE (solo administradores)"""
+    affected = await bulk_update(
+        db, Tutor, request.ids, current_user,
+        activo=False, motivo_desercion=request.motivo_desercion
+    )
+    return bulk_result(f"{len(affected)} tutores marcados como desertores", request.ids, affected)
+
+@router.post("/bulk-delete")
+async def bulk_delete_tutores(
+    request: BulkIdsRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_admin_user_async)
+):
+    """Eliminar varios tutores y su asistencia en un solo DELETE (solo administradores)"""
+    affected = await bulk_delete(db, Tutor, request.ids, current_user)
+    return bulk_result(f"{len(affected)} tutores eliminados", request.ids, affected)
+
+@router.post("/bulk-transfer")
+async def bulk_transfer_tutores(
+    request: BulkTransferRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_admin_user_async)
+):
+    """Mover varios tutores a otro equipo (solo administradores)"""
+    if await db.get(Equipo, request.equipo_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Equipo no encontrado"
+        )
+    affected = await bulk_update(db, Tutor, request.ids, current_user, equipo_id=request.equipo_id)
+    return bulk_result(f"{len(affected)} tutores transferidos al equipo {request.equipo_id}", request.ids, affected)
+
 @router.post("/import")
 async def import_tutores(
     file: UploadFile = File(...),
@@ -171,6 +231,8 @@ async def import_tutores(
     try:
         # Leer el archivo Excel
         contents = await file.read()
+        # openpyxl es pesado; se importa solo cuando se usa para no alargar el arranque en frío
+        from openpyxl import load_workbook
         workbook = load_workbook(filename=BytesIO(contents), read_only=True, data_only=True)
         sheet = workbook.active
         
@@ -281,24 +343,7 @@ async def import_tutores(
                     created += 1
                 except Exception as e:
                     db.rollback()
-                    # Si hay error de ID duplicado, intentar obtener el siguiente ID disponible
-                    if "llave duplicada" in str(e) or "duplicate key" in str(e) or "UniqueViolation" in str(e):
-                        try:
-                            # Obtener el máximo ID actual
-                            max_id = db.query(Tutor).order_by(Tutor.id.desc()).first()
-                            next_id = (max_id.id + 1) if max_id else 1
-                            
-                            # Crear el tutor con ID explícito
-                            db_tutor = Tutor(id=next_id, **tutor_data)
-                            db.add(db_tutor)
-                            db.commit()
-                            db.refresh(db_tutor)
-                            created += 1
-                        except Exception as e2:
-                            db.rollback()
-                            errors.append(f"Fila {row_num}: Error al crear tutor (ID duplicado y fallo al corregir) - {str(e2)}")
-                    else:
-                        errors.append(f"Fila {row_num}: Error al procesar - {str(e)}")
+                    errors.append(f"Fila {row_num}: Error al procesar - {str(e)}")
                 
             except Exception as e:
                 db.rollback()
@@ -1,23 +1,45 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
-from app.database import get_db
+from typing import List, Optional
+from app.database import get_db, get_async_db, DbSessionRoute
 from app.models.user import Usuario
 from app.models.equipo import Equipo
 from app.schemas.user import Usuario as UsuarioSchema, UsuarioCreate
-from app.auth.dependencies import get_current_active_user, get_admin_user
+from app.auth.dependencies import get_current_active_user, get_admin_user, get_admin_user_async
+from app.utils.pagination import paginate, prefix_filter
 from app.auth.security import get_password_hash
 
-router = APIRouter(prefix="/usuarios", tags=["usuarios"])
+router = APIRouter(prefix="/usuarios", tags=["usuarios"], route_class=DbSessionRoute)
 
 @router.get("/", response_model=List[UsuarioSchema])
-def get_usuarios(
-    db: Session = Depends(get_db),
-    current_user = Depends(get_admin_user)
+async def get_usuarios(
+    response: Response,
+    rol: Optional[str] = Query(None, description="Rol (admin o tutor)"),
+    equipo_id: Optional[int] = Query(None, description="ID del equipo"),
+    is_active: Optional[bool] = Query(None, description="Filtrar por usuarios activos/inactivos"),
+    q: Optional[str] = Query(None, description="Prefijo del nombre completo o email"),
+    limit: Optional[int] = Query(None, ge=1, description="Tamaño de página (sin límite si se omite)"),
+    cursor: Optional[str] = Query(None, description="Cursor de la página siguiente (header X-Next-Cursor)"),
+    include_total: bool = Query(False, description="Incluir el total en el header X-Total-Count"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_admin_user_async)
 ):
-    """Obtener todos los usuarios (solo administradores)"""
-    usuarios = db.query(Usuario).all()
-    return usuarios
+    """Obtener todos los usuarios (solo administradores), ordenados por nombre con paginación por cursor"""
+    query = select(Usuario)
+    if rol:
+        query = query.where(Usuario.rol == rol)
+    if equipo_id:
+        query = query.where(Usuario.equipo_id == equipo_id)
+    if is_active is not None:
+        query = query.where(Usuario.is_active == is_active)
+    if q and q.strip():
+        query = query.where(prefix_filter([Usuario.nombre_completo, Usuario.email], q))
+    
+    return await paginate(
+        db, query, [Usuario.nombre_completo, Usuario.id], limit, cursor, include_total, response
+    )
 
 @router.get("/{usuario_id}", response_model=UsuarioSchema)
 def get_usuario(
@@ -71,27 +93,10 @@ def create_usuario(
         return db_usuario
     except Exception as e:
         db.rollback()
-        # Si hay error de ID duplicado, obtener el siguiente ID disponible
-        if "llave duplicada" in str(e).lower() or "duplicate key" in str(e).lower():
-            # Obtener el máximo ID actual
-            max_id_result = db.query(Usuario.id).order_by(Usuario.id.desc()).first()
-            next_id = (max_id_result[0] + 1) if max_id_result else 1
-            
-            # Verificar que el ID no exista
-            while db.query(Usuario).filter(Usuario.id == next_id).first():
-                next_id += 1
-            
-            # Crear el usuario con ID explícito
-            db_usuario = Usuario(id=next_id, **usuario_data)
-            db.add(db_usuario)
-            db.commit()
-            db.refresh(db_usuario)
-            return db_usuario
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Error al crear el usuario: {str(e)}"
-            )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error al crear el usuario: {str(e)}"
+        )
 
 @router.get("/me/info", response_model=UsuarioSchema)
 def get_my_info(
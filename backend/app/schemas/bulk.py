@@ -0,0 +1,13 @@
+from pydantic import BaseModel, Field
+from typing import List
+
+MAX_BULK_IDS = 5000
+
+class BulkIdsRequest(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=MAX_BULK_IDS)
+
+class BulkDeactivateRequest(BulkIdsRequest):
+    motivo_desercion: str = Field(..., min_length=1)  # Mismo motivo para todo el grupo (ej. curso que desertó)
+
+class BulkTransferRequest(BulkIdsRequest):
+    equipo_id: int  # Equipo de destino
@@ -0,0 +1,156 @@
+"""
+Arranque de la aplicación: precalentamiento del pool y catálogos, con reporte de tiempos por fase.
+
+El esquema de la base de datos lo maneja Alembic (`alembic upgrade head`), no el arranque de la app.
+"""
+from contextlib import asynccontextmanager, contextmanager
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import time
+
+# Se toma al importar este módulo (lo primero que importa app.main) para medir el costo de los imports
+PROCESS_START = time.perf_counter()
+
+class StartupTimer:
+    """Acumula la duración de cada fase del arranque"""
+
+    def __init__(self):
+        self.phases = []
+
+    def record(self, name: str, seconds: float):
+        self.phases.append((name, seconds))
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def report(self) -> str:
+        lines = ["[STARTUP] Tiempos de arranque:"]
+        for name, seconds in self.phases:
+            lines.append(f"[STARTUP]   {name:<28} {seconds * 1000:>8.1f} ms")
+        total = time.perf_counter() - PROCESS_START
+        lines.append(f"[STARTUP]   {'total':<28} {total * 1000:>8.1f} ms")
+        return "\n".join(lines)
+
+startup_timer = StartupTimer()
+
+def warm_up_pool(size: int):
+    """Abre `size` conexiones en paralelo y las devuelve al pool, para que el primer request no pague el handshake"""
+    from app.database import engine
+
+    with ThreadPoolExecutor(max_workers=size) as executor:
+        connections = list(executor.map(lambda _: engine.connect(), range(size)))
+    for connection in connections:
+        connection.close()
+
+async def warm_up_async_pool(size: int):
+    """Igual que warm_up_pool, para el motor asíncrono"""
+    from app.database import async_engine
+
+    connections = await asyncio.gather(*(async_engine.connect() for _ in range(size)))
+    for connection in connections:
+        await connection.close()
+
+def warm_up_catalogs():
+    """Carga en memoria los catálogos estáticos (calendario 2026) y su respuesta preserializada"""
+    from app.routers.attendance_2026 import calendar_weeks_response
+
+    calendar_weeks_response()
+
+async def load_curriculum():
+    """Carga el catálogo curricular desde la base de datos (si falla se usa el currículo por defecto)"""
+    from app.curriculum import curriculum_catalog
+
+    try:
+        await curriculum_catalog.refresh()
+    except Exception as e:
+        print(f"[STARTUP] No se pudo cargar el catálogo curricular, se usa el por defecto: {e}")
+
+async def reconcile_id_sequences():
+    """Adelanta las secuencias de IDs que quedaron atrás del máximo id (ver app.utils.sequences)"""
+    from app.database import async_engine
+    from app.utils.sequences import reconcile_sequences
+
+    try:
+        async with async_engine.begin() as conn:
+            fixed = await reconcile_sequences(conn)
+        for item in fixed:
+            print(f"[STARTUP] Secuencia {item['secuencia']} adelantada de {item['anterior']} a {item['nuevo']}")
+    except Exception as e:
+        print(f"[STARTUP] No se pudieron revisar las secuencias de IDs: {e}")
+
+async def load_attendance_matrices():
+    """Carga la asistencia en memoria (matrices NumPy) para que el primer dashboard no pague la carga"""
+    from app.analytics.attendance_matrix import student_attendance, tutor_attendance
+
+    for store in (student_attendance, tutor_attendance):
+        try:
+            await store.refresh()
+        except Exception as e:
+            print(f"[STARTUP] No se pudo cargar la matriz de asistencia de {store.name}: {e}")
+
+def load_static_assets():
+    """Construye el manifiesto de archivos del frontend (ETag y variantes .br/.gz)"""
+    from app.utils.static_assets import asset_server
+
+    if asset_server.available:
+        asset_server.load()
+
+@asynccontextmanager
+async def lifespan(app):
+    from app.database import DB_POOL_WARMUP, engine, async_engine
+    from app.curriculum import curriculum_catalog, CURRICULUM_REFRESH_SECONDS
+    from app.utils.sequences import SEQUENCE_RECONCILE_ON_STARTUP
+    from app.analytics.attendance_matrix import student_attendance, tutor_attendance, ANALYTICS_REFRESH_SECONDS
+
+    if DB_POOL_WARMUP > 0:
+        try:
+            with startup_timer.phase("pool sync"):
+                await asyncio.to_thread(warm_up_pool, DB_POOL_WARMUP)
+            with startup_timer.phase("pool async"):
+                await warm_up_async_pool(DB_POOL_WARMUP)
+        except Exception as e:
+            # La app debe levantar aunque la base de datos no responda todavía
+            print(f"[STARTUP] No se pudo precalentar el pool de conexiones: {e}")
+
+    if SEQUENCE_RECONCILE_ON_STARTUP:
+        with startup_timer.phase("secuencias"):
+            await reconcile_id_sequences()
+
+    with startup_timer.phase("catalogos"):
+        warm_up_catalogs()
+        await load_curriculum()
+
+    with startup_timer.phase("matrices asistencia"):
+        await load_attendance_matrices()
+
+    with startup_timer.phase("assets frontend"):
+        load_static_assets()
+
+    print(startup_timer.report())
+
+    # Revisar periódicamente si el currículo cambió en la base de datos
+    curriculum_watcher = None
+    if CURRICULUM_REFRESH_SECONDS > 0:
+        curriculum_watcher = asyncio.create_task(curriculum_catalog.watch(CURRICULUM_REFRESH_SECONDS))
+
+    # Cambios de asistencia hechos fuera de la app (las escrituras de la app las marcan al confirmar)
+    analytics_watchers = []
+    if ANALYTICS_REFRESH_SECONDS > 0:
+        analytics_watchers = [
+            asyncio.create_task(store.watch(ANALYTICS_REFRESH_SECONDS))
+            for store in (student_attendance, tutor_attendance)
+        ]
+
+    yield
+
+    if curriculum_watcher:
+        curriculum_watcher.cancel()
+    for watcher in analytics_watchers:
+        watcher.cancel()
+    engine.dispose()
+    await async_engine.dispose()
@@ -0,0 +1,43 @@
+"""
+Operaciones masivas sobre estudiantes y tutores (desactivar, eliminar, transferir).
+
+Cada operación es un solo UPDATE o DELETE ... WHERE id IN (...) con el permiso del rol en la
+misma condición: un tutor solo afecta filas de su equipo, sin cargar los registros antes.
+RETURNING indica qué ids se afectaron; el resto no existe o no es del equipo del usuario.
+Los registros relacionados (asistencia, tickets, pruebas) se borran por ON DELETE CASCADE.
+"""
+from sqlalchemy import and_, delete, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Iterable, List
+
+def scoped_ids(model, ids: Iterable[int], current_user):
+    """id IN (ids), y para el tutor además equipo_id = su equipo"""
+    condition = model.id.in_(set(ids))
+    if current_user.rol != "admin":
+        condition = and_(condition, model.equipo_id == current_user.equipo_id)
+    return condition
+
+async def bulk_update(db: AsyncSession, model, ids: List[int], current_user, **values) -> List[int]:
+    result = await db.execute(
+        update(model).where(scoped_ids(model, ids, current_user)).values(**values).returning(model.id)
+    )
+    affected = result.scalars().all()
+    await db.commit()
+    return affected
+
+async def bulk_delete(db: AsyncSession, model, ids: List[int], current_user) -> List[int]:
+    result = await db.execute(
+        delete(model).where(scoped_ids(model, ids, current_user)).returning(model.id)
+    )
+    affected = result.scalars().all()
+    await db.commit()
+    return affected
+
+def bulk_result(message: str, ids: List[int], affected: List[int]) -> dict:
+    affected = sorted(affected)
+    return {
+        "message": message,
+        "affected": len(affected),
+        "ids": affected,
+        "skipped": sorted(set(ids) - set(affected))  # No existen o no pertenecen al equipo del usuario
+    }
@@ -0,0 +1,177 @@
+"""
+Compresión de respuestas (Brotli / gzip) como middleware ASGI.
+
+Las grillas y exportaciones (/tickets/export-all, /attendance-2026/students, /estudiantes/)
+son JSON muy repetitivo (colegio_nombre y estados repetidos miles de veces) y se comprimen
+5-10x. Las respuestas pequeñas (< COMPRESSION_MIN_SIZE) se envían sin comprimir, las que ya
+traen Content-Encoding (assets precomprimidos del frontend) se dejan tal cual y las respuestas
+por streaming se comprimen por partes sin acumular el cuerpo completo en memoria.
+
+Un ETag fuerte identifica bytes exactos, así que al comprimir se le agrega la codificación
+('"abc"' -> '"abc-br"'); etag_matches acepta esa forma al revalidar.
+"""
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.utils.http_cache import encoded_etag
+import os
+import zlib
+
+try:
+    import brotli
+except ImportError:  # sin brotli solo se ofrece gzip
+    brotli = None
+
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() in ("1", "true", "yes")
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))  # bytes
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))  # 4-5: buen ratio sin costo alto de CPU
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "image/svg+xml")
+
+def accepted_encodings(accept_encoding: str) -> set:
+    """Codificaciones aceptadas por el cliente según el header Accept-Encoding (ignora q=0)"""
+    accepted = set()
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(token.strip().lower())
+    return accepted
+
+class GzipCompressor:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits=31: formato gzip
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+class BrotliCompressor:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+class CompressionMiddleware:
+    """Comprime con Brotli si el cliente lo acepta, si no con gzip"""
+
+    def __init__(self, app: ASGIApp, minimum_size: int = COMPRESSION_MIN_SIZE,
+                 gzip_level: int = COMPRESSION_GZIP_LEVEL, brotli_quality: int = COMPRESSION_BROTLI_QUALITY):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def choose_encoding(self, scope: Scope):
+        accepted = accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        if brotli is not None and "br" in accepted:
+            return "br"
+        if "gzip" in accepted:
+            return "gzip"
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = self.choose_encoding(scope)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+class CompressionResponder:
+    """Retiene el inicio de la respuesta hasta ver el primer bloque del cuerpo y decide si comprimir"""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.original_send = send
+        self.initial_message: Message = None
+        self.started = False
+        self.passthrough = False
+        self.compressor = None
+
+    def new_compressor(self):
+        if self.encoding == "br":
+            return BrotliCompressor(self.middleware.brotli_quality)
+        return GzipCompressor(self.middleware.gzip_level)
+
+    def should_compress(self) -> bool:
+        headers = Headers(raw=self.initial_message["headers"])
+        if "content-encoding" in headers:
+            return False
+        if self.initial_message["status"] in (204, 206, 304):
+            return False
+        content_type = headers.get("content-type", "")
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+    def set_encoding_headers(self, headers: MutableHeaders):
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        if "etag" in headers:
+            headers["ETag"] = encoded_etag(headers["etag"], self.encoding)
+
+    async def send(self, message: Message):
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            self.initial_message = message
+            self.passthrough = not self.should_compress()
+            return
+
+        if message_type != "http.response.body":
+            await self.original_send(message)
+            return
+
+        if self.passthrough:
+            if not self.started:
+                self.started = True
+                await self.original_send(self.initial_message)
+            await self.original_send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if not self.started:
+            self.started = True
+            headers = MutableHeaders(raw=self.initial_message["headers"])
+            if not more_body:
+                # Respuesta completa: solo se comprime si supera el umbral
+                if len(body) < self.middleware.minimum_size:
+                    await self.original_send(self.initial_message)
+                    await self.original_send(message)
+                    return
+                compressor = self.new_compressor()
+                body = compressor.compress(body) + compressor.finish()
+                self.set_encoding_headers(headers)
+                headers["Content-Length"] = str(len(body))
+                await self.original_send(self.initial_message)
+                await self.original_send({"type": "http.response.body", "body": body})
+                return
+
+            # Streaming: el largo final no se conoce, se envía por partes
+            self.compressor = self.new_compressor()
+            self.set_encoding_headers(headers)
+            if "content-length" in headers:
+                del headers["content-length"]
+            await self.original_send(self.initial_message)
+
+        if more_body:
+            chunk = self.compressor.compress(body) + self.compressor.flush()
+        else:
+            chunk = self.compressor.compress(body) + self.compressor.finish()
+        await self.original_send({"type": "http.response.body", "body": chunk, "more_body": more_body})
@@ -0,0 +1,54 @@
+"""
+Campos parciales (sparse fieldsets) para los listados de estudiantes y tutores.
+
+Los selectores del frontend solo necesitan id y nombre, pero el listado completo trae contacto
+del apoderado, observaciones y el equipo/colegio anidados. Con `fields=id,nombre,apellido` (o el
+modo directorio: id y nombre_completo) se seleccionan solo esas columnas en SQL y las filas se
+serializan directamente, sin construir objetos ORM ni pasar por el response_model.
+"""
+from fastapi import HTTPException, Response
+from sqlalchemy import select
+from typing import Dict, List, Optional, Sequence
+from app.utils.responses import AppJSONResponse
+
+DIRECTORY_FIELDS = ("id", "nombre_completo")
+
+def model_fields(model, computed: Sequence[str] = ()) -> tuple:
+    """Campos pedibles: las columnas de la tabla más los calculados"""
+    return tuple(column.key for column in model.__table__.columns) + tuple(computed)
+
+def parse_fields(fields: Optional[str], directorio: bool, allowed: Sequence[str]) -> Optional[List[str]]:
+    """Campos pedidos (id siempre incluido) o None si se pidió el registro completo"""
+    if directorio:
+        return list(DIRECTORY_FIELDS)
+    if not fields:
+        return None
+
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in requested if name not in allowed]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Campos no válidos: {', '.join(unknown)}. Permitidos: {', '.join(allowed)}"
+        )
+    return list(dict.fromkeys(["id"] + requested))
+
+def sparse_select(model, names: Sequence[str], sort_columns: Sequence, computed: Optional[Dict] = None):
+    """
+    select() con solo las columnas pedidas; las columnas de orden se agregan si faltan porque el
+    cursor de la página siguiente se arma con ellas (no se devuelven al cliente).
+    """
+    computed = computed or {}
+    columns = [
+        computed[name].label(name) if name in computed else getattr(model, name)
+        for name in names
+    ]
+    columns += [column for column in sort_columns if column.key not in names]
+    return select(*columns)
+
+def sparse_response(rows, names: Sequence[str], response: Response) -> AppJSONResponse:
+    """Lista de dicts con los campos pedidos, conservando los headers de paginación"""
+    return AppJSONResponse(
+        [{name: row._mapping[name] for name in names} for row in rows],
+        headers={key: value for key, value in response.headers.items() if key.lower().startswith("x-")}
+    )
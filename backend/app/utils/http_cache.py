@@ -0,0 +1,117 @@
+"""
+GET condicional (ETag / 304 Not Modified).
+
+Las grillas (asistencia, tickets, pruebas) calculan un validador barato antes de armar la
+respuesta: cantidad de filas y max(updated_at/created_at) de las tablas involucradas, limitado
+a los estudiantes/tutores visibles (se responde desde los índices (fk, updated_at, created_at)).
+Si el ETag del cliente coincide se devuelve 304 sin ejecutar la consulta de la grilla.
+
+Los catálogos de referencia (calendario, unidades, módulos) se sirven como PreserializedJSON:
+bytes ya serializados con ETag fuerte, sin sesión de base de datos por request.
+"""
+from fastapi import Request, Response
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Iterable, Optional
+from app.utils.responses import dumps
+import hashlib
+import json
+
+# El navegador guarda la grilla pero siempre la revalida (los datos cambian durante el día)
+GRID_CACHE_CONTROL = "private, no-cache"
+# Catálogos de referencia: cambian a lo más una vez al año
+REFERENCE_CACHE_CONTROL = "public, max-age=86400, stale-while-revalidate=604800"
+
+# Sufijos con que CompressionMiddleware y los assets estáticos distinguen cada codificación
+ENCODED_ETAG_SUFFIXES = ("-br", "-gzip")
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """ETag de la representación comprimida: '"abc"' -> '"abc-br"' (los ETag débiles no cambian)"""
+    if etag.startswith("W/"):
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+def matching_etag(request: Request, etag: str) -> Optional[str]:
+    """
+    ETag de If-None-Match que coincide con `etag` (comparación débil, ignora el prefijo W/), o
+    None. Acepta también el ETag de una representación comprimida de `etag` ('"abc-br"').
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return None
+    if if_none_match.strip() == "*":
+        return etag
+    opaque = etag.removeprefix("W/")
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        candidate = tag.removeprefix("W/")
+        if candidate == opaque:
+            return tag
+        for suffix in ENCODED_ETAG_SUFFIXES:
+            if candidate.endswith(f'{suffix}"') and candidate[:-len(suffix) - 1] + '"' == opaque:
+                return tag
+    return None
+
+def etag_matches(request: Request, etag: str) -> bool:
+    return matching_etag(request, etag) is not None
+
+def not_modified(etag: str, cache_control: str = GRID_CACHE_CONTROL) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+
+def grid_cache_headers(etag: str) -> dict:
+    return {"ETag": etag, "Cache-Control": GRID_CACHE_CONTROL}
+
+class PreserializedJSON:
+    """Respuesta JSON serializada una sola vez, con ETag fuerte calculado sobre los bytes"""
+
+    def __init__(self, content, cache_control: str = REFERENCE_CACHE_CONTROL):
+        self.body = dumps(content)
+        self.etag = f'"{hashlib.sha256(self.body).hexdigest()[:32]}"'
+        self.cache_control = cache_control
+
+    def response(self, request: Request) -> Response:
+        matched = matching_etag(request, self.etag)
+        if matched is not None:
+            # El 304 lleva el ETag de la representación que tiene el cliente (comprimida o no)
+            return not_modified(matched, self.cache_control)
+        return Response(
+            content=self.body,
+            media_type="application/json",
+            headers={"ETag": self.etag, "Cache-Control": self.cache_control},
+        )
+
+def table_version(model, condition=None):
+    """Subconsultas (cantidad de filas, última modificación) de una tabla, opcionalmente filtrada"""
+    last_change = func.max(func.coalesce(model.updated_at, model.created_at))
+    count_query = select(func.count()).select_from(model)
+    last_change_query = select(last_change)
+    if condition is not None:
+        count_query = count_query.where(condition)
+        last_change_query = last_change_query.where(condition)
+    return [count_query.scalar_subquery(), last_change_query.scalar_subquery()]
+
+async def grid_etag(db: AsyncSession, request: Request, current_user, sources: Iterable, extra: Optional[object] = None) -> str:
+    """
+    ETag débil de una grilla: versión de cada (modelo, condición) en `sources` más los filtros
+    del request (ruta y query), el alcance del usuario y `extra` (ej. los módulos o semanas que arman las columnas).
+    Equipos y colegios se incluyen siempre porque sus nombres aparecen en todas las grillas.
+    """
+    from app.models.equipo import Equipo
+    from app.models.school import Colegio
+
+    columns = []
+    for model, condition in [*sources, (Equipo, None), (Colegio, None)]:
+        columns.extend(table_version(model, condition))
+    versions = (await db.execute(select(*columns))).one()
+
+    fingerprint = json.dumps(
+        [
+            [str(value) for value in versions],
+            request.url.path,
+            sorted(request.query_params.multi_items()),
+            [current_user.rol, current_user.equipo_id],
+            extra,
+        ],
+        default=str,
+    )
+    return f'W/"{hashlib.md5(fingerprint.encode()).hexdigest()}"'
@@ -0,0 +1,74 @@
+"""
+Paginación por cursor (keyset) para los listados de estudiantes, tutores y usuarios.
+
+El cursor es opaco para el frontend: codifica los valores de orden (ej. apellido, id) de la
+última fila de la página. La página siguiente se obtiene con WHERE (apellido, id) > (cursor),
+que usa el índice (apellido, id) y cuesta lo mismo en la página 1 que en la 500 (OFFSET no).
+
+Para no romper a los clientes actuales, las respuestas siguen siendo una lista; el cursor de
+la página siguiente va en el header X-Next-Cursor y el total (opcional) en X-Total-Count.
+"""
+from fastapi import HTTPException, Response
+from sqlalchemy import and_, func, or_, select
+from typing import List, Optional, Sequence
+import base64
+import json
+
+MAX_PAGE_SIZE = 500
+
+def encode_cursor(values: Sequence) -> str:
+    raw = json.dumps(list(values), ensure_ascii=False, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str, size: int) -> list:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    return values
+
+def keyset_after(columns: Sequence, values: Sequence):
+    """(c1, c2, ...) > (v1, v2, ...) expandido con OR/AND (portable entre PostgreSQL y SQLite)"""
+    conditions = []
+    for position, column in enumerate(columns):
+        equal_prefix = [columns[i] == values[i] for i in range(position)]
+        conditions.append(and_(*equal_prefix, column > values[position]))
+    return or_(*conditions)
+
+def escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def prefix_filter(columns: Sequence, prefix: str):
+    """Alguna de las columnas empieza con `prefix` (sin distinguir mayúsculas)"""
+    pattern = escape_like(prefix.strip()) + "%"
+    return or_(*(column.ilike(pattern, escape="\\") for column in columns))
+
+async def paginate(db, query, sort_columns: Sequence, limit: Optional[int], cursor: Optional[str],
+                   include_total: bool, response: Response, scalars: bool = True) -> List:
+    """
+    Aplica orden, cursor y límite a `query` (un select ya filtrado) y deja en `response` los
+    headers X-Next-Cursor / X-Total-Count. Sin `limit` devuelve todas las filas (comportamiento anterior).
+    """
+    if include_total:
+        total = (await db.execute(select(func.count()).select_from(query.order_by(None).subquery()))).scalar()
+        response.headers["X-Total-Count"] = str(total)
+
+    query = query.order_by(*sort_columns)
+    if cursor:
+        query = query.where(keyset_after(sort_columns, decode_cursor(cursor, len(sort_columns))))
+    if limit is not None:
+        query = query.limit(min(limit, MAX_PAGE_SIZE) + 1)
+
+    result = await db.execute(query)
+    rows = result.scalars().unique().all() if scalars else result.all()
+
+    if limit is not None and len(rows) > min(limit, MAX_PAGE_SIZE):
+        rows = rows[:min(limit, MAX_PAGE_SIZE)]
+        last = rows[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor([
+            getattr(last, column.key) for column in sort_columns
+        ])
+    return rows
@@ -0,0 +1,32 @@
+"""
+Respuesta JSON basada en orjson (clase de respuesta por defecto de la app).
+
+orjson serializa de forma nativa datetime/date (ISO 8601, igual que .isoformat()) y los enums
+(EstadoAsistencia, EstadoTicket, PorcentajeLogro se escriben con su .value, ej. "asistió").
+Los endpoints de grillas y exportaciones devuelven AppJSONResponse directamente para no pasar
+por jsonable_encoder, que recorre cada dict anidado en Python antes de serializar.
+"""
+from decimal import Decimal
+from typing import Any
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+import orjson
+
+def orjson_default(obj: Any):
+    """Tipos que orjson no conoce"""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Tipo no serializable: {type(obj).__name__}")
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=orjson_default, option=orjson.OPT_NON_STR_KEYS)
+
+class AppJSONResponse(JSONResponse):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
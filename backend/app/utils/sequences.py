@@ -0,0 +1,58 @@
+"""
+Reconciliador de secuencias de IDs (PostgreSQL).
+
+Si se insertan filas con id explícito (restauraciones, migraciones desde otra base, scripts
+desde DBeaver), la secuencia de la columna identity queda atrás del máximo id y el siguiente
+INSERT falla con "duplicate key". En vez de corregirlo dentro de cada request, se revisan todas
+las secuencias en una sola pasada al iniciar la app (y con POST /admin/sequences/reconcile):
+una consulta compara cada secuencia con el máximo id de su tabla y solo se ajustan las atrasadas.
+Las secuencias nunca se retroceden, así que es seguro correrlo con la app en uso.
+"""
+from sqlalchemy import text
+from typing import List
+import os
+
+SEQUENCE_RECONCILE_ON_STARTUP = os.getenv("SEQUENCE_RECONCILE_ON_STARTUP", "true").lower() == "true"
+
+# Columnas con secuencia (identity o serial) del esquema actual
+SEQUENCES_SQL = text("""
+    SELECT c.table_name, c.column_name,
+           pg_get_serial_sequence(format('%I.%I', c.table_schema, c.table_name), c.column_name) AS sequence_name
+    FROM information_schema.columns c
+    WHERE c.table_schema = current_schema()
+      AND (c.is_identity = 'YES' OR c.column_default LIKE 'nextval(%')
+    ORDER BY c.table_name
+""")
+
+def quote_identifier(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+async def reconcile_sequences(conn) -> List[dict]:
+    """
+    Adelanta al máximo id cada secuencia que quedó atrás. `conn` es una conexión asíncrona con
+    transacción abierta (async_engine.begin()). Devuelve las secuencias corregidas.
+    """
+    if conn.dialect.name != "postgresql":
+        return []
+
+    sequences = [row for row in (await conn.execute(SEQUENCES_SQL)).all() if row.sequence_name]
+    if not sequences:
+        return []
+
+    # Una sola consulta con el máximo id y el último valor entregado por cada secuencia
+    status_sql = " UNION ALL ".join(
+        f"SELECT {position} AS position, "
+        f"(SELECT MAX({quote_identifier(column)}) FROM {quote_identifier(table)}) AS max_id, "
+        f"(SELECT CASE WHEN is_called THEN last_value ELSE last_value - 1 END FROM {sequence}) AS last_value"
+        for position, (table, column, sequence) in enumerate(sequences)
+    )
+    fixed = []
+    for position, max_id, last_value in (await conn.execute(text(status_sql))).all():
+        if max_id is None or max_id <= last_value:
+            continue
+        table, column, sequence = sequences[position]
+        # El nombre viene de pg_get_serial_sequence (ya calificado); va como literal regclass
+        sequence_literal = sequence.replace("'", "''")
+        await conn.execute(text(f"SELECT setval('{sequence_literal}', {int(max_id)}, true)"))
+        fixed.append({"tabla": table, "secuencia": sequence, "anterior": last_value, "nuevo": max_id})
+    return fixed
@@ -0,0 +1,102 @@
+"""
+Servidor de archivos estáticos del frontend (SPA compilado con Vite).
+
+Al iniciar construye un manifiesto de /app/static (tamaño, ETag y variantes .br/.gz
+precomprimidas por scripts/precompress_static.py), así cada request solo hace un
+lookup en memoria: sin os.path.exists por request, con 304 para ETags que coinciden
+y Cache-Control immutable para los assets con hash de Vite.
+"""
+from fastapi import Request, Response
+from fastapi.responses import FileResponse
+from typing import Dict, Optional
+from app.utils.compression import accepted_encodings
+from app.utils.http_cache import encoded_etag, etag_matches
+import hashlib
+import mimetypes
+import os
+
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"  # assets con hash en el nombre (assets/index-3f9a1c.js)
+REVALIDATE_CACHE = "no-cache"  # index.html: siempre se revalida con ETag (304 si no cambió)
+DEFAULT_CACHE = "public, max-age=3600"
+
+# Orden de preferencia de las variantes precomprimidas
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+class StaticAsset:
+    """Entrada del manifiesto: un archivo y sus variantes precomprimidas"""
+
+    def __init__(self, path: str, rel_path: str):
+        self.path = path
+        self.stat = os.stat(path)
+        self.media_type = mimetypes.guess_type(rel_path)[0] or "application/octet-stream"
+        with open(path, "rb") as f:
+            digest = hashlib.md5(f.read()).hexdigest()[:16]
+        self.etag = f'"{digest}"'
+        self.cache_control = cache_control_for(rel_path)
+        self.variants = {}
+        for encoding, suffix in ENCODINGS:
+            variant_path = path + suffix
+            if os.path.isfile(variant_path):
+                self.variants[encoding] = (variant_path, os.stat(variant_path))
+
+def cache_control_for(rel_path: str) -> str:
+    if rel_path.startswith("assets/"):
+        return IMMUTABLE_CACHE
+    if rel_path == "index.html":
+        return REVALIDATE_CACHE
+    return DEFAULT_CACHE
+
+class StaticAssetServer:
+    """Manifiesto en memoria del directorio de estáticos"""
+
+    def __init__(self, root: str):
+        self.root = root
+        self.assets: Dict[str, StaticAsset] = {}
+
+    @property
+    def available(self) -> bool:
+        return os.path.isdir(self.root)
+
+    def load(self):
+        """Recorre el directorio una sola vez (al iniciar la app)"""
+        assets = {}
+        variant_suffixes = tuple(suffix for _, suffix in ENCODINGS)
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                if filename.endswith(variant_suffixes):
+                    continue
+                path = os.path.join(dirpath, filename)
+                rel_path = os.path.relpath(path, self.root).replace(os.sep, "/")
+                assets[rel_path] = StaticAsset(path, rel_path)
+        self.assets = assets
+
+    def serve(self, request: Request, rel_path: str) -> Optional[Response]:
+        """Respuesta para el archivo pedido, o None si no está en el manifiesto"""
+        asset = self.assets.get(rel_path)
+        if asset is None:
+            return None
+
+        encoding = None
+        accepted = accepted_encodings(request.headers.get("accept-encoding", ""))
+        for candidate, _ in ENCODINGS:
+            if candidate in asset.variants and candidate in accepted:
+                encoding = candidate
+                break
+
+        # Cada representación (br, gzip, sin comprimir) tiene su propio ETag fuerte
+        etag = asset.etag if encoding is None else encoded_etag(asset.etag, encoding)
+        headers = {"ETag": etag, "Cache-Control": asset.cache_control}
+        if asset.variants:
+            headers["Vary"] = "Accept-Encoding"
+
+        if etag_matches(request, etag):
+            return Response(status_code=304, headers=headers)
+
+        if encoding is None:
+            return FileResponse(asset.path, headers=headers, media_type=asset.media_type, stat_result=asset.stat)
+
+        variant_path, variant_stat = asset.variants[encoding]
+        headers["Content-Encoding"] = encoding
+        return FileResponse(variant_path, headers=headers, media_type=asset.media_type, stat_result=variant_stat)
+
+asset_server = StaticAssetServer(os.getenv("FRONTEND_DIST_PATH", "/app/static"))
@@ -0,0 +1,29 @@
+"""
+Similitud por trigramas al estilo de pg_trgm, en Python puro.
+
+En PostgreSQL la búsqueda usa pg_trgm con índices GIN; esta versión se usa con SQLite (pruebas
+locales) o si la extensión no está instalada, para que /search devuelva los mismos resultados
+en el mismo orden aproximado.
+"""
+from typing import FrozenSet
+import re
+
+# Mismo valor por defecto que pg_trgm.word_similarity_threshold (operador <%)
+WORD_SIMILARITY_THRESHOLD = 0.6
+
+_WORD = re.compile(r"[^\W_]+")
+
+def trigrams(text: str) -> FrozenSet[str]:
+    """Trigramas de cada palabra en minúsculas, con el mismo relleno que pg_trgm ("  pal ")"""
+    result = set()
+    for word in _WORD.findall(text.lower()):
+        padded = f"  {word} "
+        result.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return frozenset(result)
+
+def word_similarity(query: str, text: str) -> float:
+    """Fracción de los trigramas de `query` presentes en `text` (aproxima word_similarity de pg_trgm)"""
+    query_trigrams = trigrams(query)
+    if not query_trigrams:
+        return 0.0
+    return len(query_trigrams & trigrams(text)) / len(query_trigrams)
@@ -0,0 +1,90 @@
+"""
+Benchmark: capa síncrona (SessionLocal en el threadpool de FastAPI) vs capa asíncrona (AsyncSessionLocal)
+
+Simula N clientes concurrentes ejecutando la consulta de la grilla de asistencia.
+El camino síncrono corre en el threadpool de anyio (40 hilos por defecto, igual que FastAPI),
+el camino asíncrono corre directamente en el event loop con asyncpg.
+
+Uso:
+    cd backend
+    python scripts/benchmark_async_db.py --clients 200 --requests 1000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import anyio.to_thread
+from sqlalchemy import select
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal, AsyncSessionLocal, engine, async_engine
+from app.models.attendance import AsistenciaEstudiante
+from app.models.student import Estudiante
+
+def grid_query():
+    """Consulta equivalente a la grilla de /attendance-2026/students"""
+    return select(AsistenciaEstudiante.estudiante_id, AsistenciaEstudiante.semana, AsistenciaEstudiante.estado).where(
+        AsistenciaEstudiante.estudiante_id.in_(select(Estudiante.id))
+    )
+
+def run_sync_request():
+    db = SessionLocal()
+    try:
+        return len(db.execute(grid_query()).all())
+    finally:
+        db.close()
+
+async def run_async_request():
+    async with AsyncSessionLocal() as db:
+        return len((await db.execute(grid_query())).all())
+
+async def run_clients(clients: int, total_requests: int, request_fn) -> list:
+    """Lanza `clients` workers concurrentes hasta completar `total_requests` y devuelve las latencias"""
+    latencies = []
+    remaining = total_requests
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            await request_fn()
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(worker() for _ in range(clients)))
+    return latencies
+
+def report(name: str, latencies: list, elapsed: float):
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p95 = latencies[int(len(latencies) * 0.95) - 1] * 1000
+    print(f"{name:<8} {len(latencies) / elapsed:>10.1f} req/s   p50 {p50:>8.1f} ms   p95 {p95:>8.1f} ms")
+
+async def main(clients: int, total_requests: int):
+    print(f"[*] {clients} clientes concurrentes, {total_requests} requests por camino")
+    print(f"[*] Hilos del threadpool (sync): {anyio.to_thread.current_default_thread_limiter().total_tokens}")
+
+    # Calentar ambos pools para no medir el costo de abrir conexiones
+    run_sync_request()
+    await run_async_request()
+
+    start = time.perf_counter()
+    latencies = await run_clients(clients, total_requests, lambda: anyio.to_thread.run_sync(run_sync_request))
+    report("sync", latencies, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    latencies = await run_clients(clients, total_requests, run_async_request)
+    report("async", latencies, time.perf_counter() - start)
+
+    engine.dispose()
+    await async_engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de la capa de base de datos sync vs async")
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(main(args.clients, args.requests))
@@ -0,0 +1,96 @@
+"""
+Benchmark: estadísticas de asistencia de todo el programa con la matriz NumPy en memoria
+(app.analytics.attendance_matrix) vs el recorrido por persona que hacían los endpoints.
+
+Genera una matriz sintética de estudiantes × semanas del calendario 2026 y mide, sin base de
+datos, el cálculo completo: porcentaje por persona, inasistencias, totales por equipo y colegio
+y serie semanal. El caché de conteos se invalida en cada ronda (como tras una escritura).
+
+Uso:
+    cd backend
+    python scripts/benchmark_attendance_matrix.py --students 20000 --rounds 20
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.analytics.attendance_matrix import AttendanceMatrix, NO_ASISTIO, ASISTIO, TOTAL_CODES, percentage
+from app.routers.attendance_2026 import load_2026_calendar
+
+TARGET_MS = 10.0
+
+def build_matrix(students: int, week_keys) -> AttendanceMatrix:
+    """Matriz con ~80% de asistencia, 20 estudiantes por equipo y 10 equipos por colegio"""
+    rng = np.random.default_rng(0)
+    statuses = rng.choice(TOTAL_CODES, size=(students, len(week_keys)), p=[0.1, 0.7, 0.15, 0.03, 0.02]).astype(np.int8)
+    person_ids = np.arange(1, students + 1)
+    equipo_ids = person_ids // 20 + 1
+    return AttendanceMatrix(
+        week_keys,
+        person_ids=person_ids,
+        equipo_ids=equipo_ids,
+        colegio_ids=equipo_ids // 10 + 1,
+        active=np.ones(students, dtype=bool),
+        names=[f"Estudiante {person_id}" for person_id in person_ids.tolist()],
+        cursos=None,
+        statuses=statuses,
+    )
+
+def full_program_stats(matrix: AttendanceMatrix) -> dict:
+    matrix._counts = None  # forzar el recálculo, como después de una escritura
+    attended, absent, recorded = matrix.person_stats()
+    return {
+        "rates": matrix.attendance_rates(),
+        "with_3_plus_absences": np.count_nonzero(absent > 3),
+        "overall": percentage(attended.sum(), recorded.sum()),
+        "teams": matrix.team_totals(),
+        "schools": matrix.school_totals(),
+        "weeks": matrix.weekly_series(),
+    }
+
+def python_loop_stats(matrix: AttendanceMatrix) -> dict:
+    # Equivalente al cálculo anterior: conteos por persona en dicts y un recorrido por persona
+    rows = matrix.statuses.tolist()
+    equipos = matrix.equipo_ids.tolist()
+    stats, teams = [], {}
+    for row, equipo_id in zip(rows, equipos):
+        attended = row.count(ASISTIO)
+        absent = row.count(NO_ASISTIO)
+        recorded = len(row) - row.count(0)
+        stats.append((attended / recorded * 100) if recorded else 0)
+        team = teams.setdefault(equipo_id, [0, 0, 0])
+        team[0] += attended
+        team[1] += absent
+        team[2] += recorded
+    return {"rates": stats, "teams": teams}
+
+def measure(fn, matrix: AttendanceMatrix, rounds: int) -> float:
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn(matrix)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main(students: int, rounds: int):
+    week_keys = [week["semana_key"] for week in load_2026_calendar()]
+    matrix = build_matrix(students, week_keys)
+    print(f"[*] Matriz {matrix.shape[0]} × {matrix.shape[1]} ({matrix.statuses.nbytes / 1024:.0f} KB), mejor de {rounds} rondas")
+    t_loop = measure(python_loop_stats, matrix, max(1, rounds // 5))
+    t_matrix = measure(full_program_stats, matrix, rounds)
+    print(f"recorrido por persona     {t_loop * 1000:>9.2f} ms")
+    print(f"matriz NumPy              {t_matrix * 1000:>9.2f} ms")
+    status = "OK" if t_matrix * 1000 < TARGET_MS else "SOBRE EL OBJETIVO"
+    print(f"[*] {t_loop / t_matrix:.1f}x más rápido; objetivo < {TARGET_MS:.0f} ms: {status}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de estadísticas de asistencia con la matriz en memoria")
+    parser.add_argument("--students", type=int, default=20000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+    main(args.students, args.rounds)
@@ -0,0 +1,85 @@
+"""
+Benchmark: serialización de la exportación de tickets con jsonable_encoder + json (antes)
+vs AppJSONResponse con orjson (después).
+
+Genera un payload sintético con la misma forma que /tickets/export-all (una fila por
+estudiante, unidad y módulo, con datetime y enums) y mide solo la serialización, sin base de datos.
+
+Uso:
+    cd backend
+    python scripts/benchmark_serialization.py --students 2000 --rounds 5
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timezone
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.tickets import EstadoTicket
+from app.curriculum import curriculum_catalog
+from app.utils.responses import AppJSONResponse
+
+def build_export_payload(students: int) -> dict:
+    """Payload equivalente al de /tickets/export-all"""
+    random.seed(0)
+    now = datetime.now(timezone.utc)
+    rows = []
+    for estudiante_id in range(1, students + 1):
+        for pair in curriculum_catalog.index.pairs:
+            rows.append({
+                "estudiante_id": estudiante_id,
+                "rut": f"{10000000 + estudiante_id}-{estudiante_id % 10}",
+                "nombre": f"Nombre {estudiante_id}",
+                "apellido": f"Apellido {estudiante_id}",
+                "curso": "1° Medio",
+                "equipo_id": estudiante_id % 20,
+                "equipo_nombre": f"Equipo {estudiante_id % 20}",
+                "colegio_id": estudiante_id % 5,
+                "colegio_nombre": f"Colegio {estudiante_id % 5}",
+                "unidad": pair.unidad_key,
+                "unidad_nombre": pair.unidad_nombre,
+                "modulo": pair.modulo_key,
+                "modulo_nombre": pair.modulo_nombre,
+                "resultado": random.choice(list(EstadoTicket)),
+                "created_at": now,
+                "updated_at": now,
+            })
+    return {"tickets": rows, "total": len(rows)}
+
+def before(payload: dict) -> bytes:
+    # Lo que hacía FastAPI con un dict: jsonable_encoder y luego json.dumps
+    return JSONResponse(jsonable_encoder(payload)).body
+
+def after(payload: dict) -> bytes:
+    return AppJSONResponse(payload).body
+
+def measure(fn, payload: dict, rounds: int) -> float:
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn(payload)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main(students: int, rounds: int):
+    payload = build_export_payload(students)
+    print(f"[*] {payload['total']} filas ({students} estudiantes), mejor de {rounds} rondas")
+    size = len(after(payload))
+    t_before = measure(before, payload, rounds)
+    t_after = measure(after, payload, rounds)
+    print(f"jsonable_encoder + json   {t_before * 1000:>9.1f} ms")
+    print(f"orjson (AppJSONResponse)  {t_after * 1000:>9.1f} ms")
+    print(f"[*] {size / 1024 / 1024:.1f} MB de JSON, {t_before / t_after:.1f}x más rápido")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de serialización JSON de la exportación de tickets")
+    parser.add_argument("--students", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    main(args.students, args.rounds)
@@ -0,0 +1,51 @@
+"""
+Genera variantes precomprimidas (.br y .gz) de los archivos del frontend compilado.
+
+Se ejecuta una vez al construir la imagen Docker, así el servidor de estáticos
+solo tiene que elegir la variante según Accept-Encoding (sin comprimir en cada request).
+
+Uso:
+    python backend/scripts/precompress_static.py /app/static
+"""
+import gzip
+import os
+import sys
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional: sin él solo se generan variantes .gz
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = ('.html', '.js', '.css', '.svg', '.json', '.txt', '.map', '.ico')
+MIN_SIZE = 1024  # bytes; archivos más pequeños no ganan nada al comprimirse
+
+def precompress(root: str):
+    total_original = 0
+    total_gzip = 0
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            if not filename.endswith(COMPRESSIBLE_EXTENSIONS):
+                continue
+            path = os.path.join(dirpath, filename)
+            with open(path, 'rb') as f:
+                data = f.read()
+            if len(data) < MIN_SIZE:
+                continue
+
+            gzipped = gzip.compress(data, compresslevel=9, mtime=0)
+            if len(gzipped) < len(data):
+                with open(path + '.gz', 'wb') as f:
+                    f.write(gzipped)
+                total_original += len(data)
+                total_gzip += len(gzipped)
+
+            if brotli is not None:
+                compressed = brotli.compress(data, quality=11)
+                if len(compressed) < len(data):
+                    with open(path + '.br', 'wb') as f:
+                        f.write(compressed)
+
+    print(f"[OK] {total_original / 1024:.1f} KB -> {total_gzip / 1024:.1f} KB (gzip)")
+
+if __name__ == "__main__":
+    precompress(sys.argv[1] if len(sys.argv) > 1 else "/app/static")
@@ -0,0 +1,137 @@
+"""
+Sincronización incremental de la matriz de asistencia y del logro del drill-down.
+
+Un borrado y una inserción en la misma ventana dejan la cantidad de registros igual: la
+sincronización debe detectar el borrado y recargar, no aplicar solo las filas nuevas.
+
+Uso:
+    cd backend
+    pip install -r requirements-dev.txt
+    python -m pytest -q tests
+"""
+import asyncio
+import os
+import sys
+import tempfile
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "analytics_sync.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from app.analytics.attendance_matrix import ASISTIO, NO_ASISTIO, SIN_REGISTRO, AttendanceMatrixStore
+from app.analytics.drilldown import DrilldownStore, MASTERY_TYPES
+from app.database import AsyncSessionLocal, Base, SessionLocal, async_engine, engine
+from app.models.attendance import AsistenciaEstudiante, EstadoAsistencia
+from app.models.equipo import Equipo
+from app.models.school import Colegio
+from app.models.student import Estudiante
+from app.models.tickets import TicketEstudiante, EstadoTicket
+
+TICKETS = MASTERY_TYPES.index("tickets")
+
+@pytest.fixture
+def student_ids():
+    """Base nueva con dos estudiantes y un registro de asistencia y un ticket cada uno"""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        colegio = Colegio(nombre="Colegio", comuna="Santiago")
+        equipo = Equipo(nombre="Equipo", colegio=colegio)
+        students = [
+            Estudiante(rut=rut, nombre=f"Nombre {position}", apellido="Apellido", curso="1° Medio", equipo=equipo)
+            for position, rut in enumerate(("12.345.678-5", "9.876.543-3"))
+        ]
+        db.add_all(students)
+        db.flush()
+        for student, estado in zip(students, (EstadoAsistencia.ASISTIO, EstadoAsistencia.NO_ASISTIO)):
+            db.add(attendance(student.id, "semana_1", estado))
+            db.add(TicketEstudiante(estudiante_id=student.id, unidad="unidad_1", modulo="modulo_1", resultado=EstadoTicket.CIEN_PORCIENTO))
+        db.commit()
+        return [student.id for student in students]
+
+def attendance(estudiante_id: int, semana: str, estado: EstadoAsistencia) -> AsistenciaEstudiante:
+    return AsistenciaEstudiante(estudiante_id=estudiante_id, semana=semana, mes="Marzo", dias="2 al 8", estado=estado)
+
+def new_store() -> AttendanceMatrixStore:
+    return AttendanceMatrixStore(
+        "estudiantes", Estudiante, AsistenciaEstudiante, AsistenciaEstudiante.estudiante_id, with_course=True
+    )
+
+def cell(matrix, estudiante_id: int, semana: str) -> int:
+    row = int(matrix.rows_for([estudiante_id])[0])
+    return int(matrix.statuses[row, matrix.week_index[semana]])
+
+def run(coroutine):
+    async def with_engine_cleanup():
+        try:
+            return await coroutine
+        finally:
+            await async_engine.dispose()
+    return asyncio.run(with_engine_cleanup())
+
+def test_matrix_reloads_after_delete_and_insert(student_ids):
+    first, second = student_ids
+
+    async def scenario():
+        store = new_store()
+        matrix = await store.get()
+        assert cell(matrix, first, "semana_1") == ASISTIO
+
+        # Mismo número de registros: uno borrado y uno nuevo
+        with SessionLocal() as db:
+            db.query(AsistenciaEstudiante).filter(AsistenciaEstudiante.estudiante_id == first).delete()
+            db.add(attendance(second, "semana_2", EstadoAsistencia.ASISTIO))
+            db.commit()
+        assert await store.refresh()
+
+        assert store.matrix is not matrix  # recarga completa, no incremental
+        assert cell(store.matrix, first, "semana_1") == SIN_REGISTRO
+        assert cell(store.matrix, second, "semana_1") == NO_ASISTIO
+        assert cell(store.matrix, second, "semana_2") == ASISTIO
+
+    run(scenario())
+
+def test_matrix_applies_insertions_incrementally(student_ids):
+    first, _ = student_ids
+
+    async def scenario():
+        store = new_store()
+        matrix = await store.get()
+        with SessionLocal() as db:
+            db.add(attendance(first, "semana_2", EstadoAsistencia.NO_ASISTIO))
+            db.commit()
+        assert await store.refresh()
+
+        assert store.matrix is matrix
+        assert cell(matrix, first, "semana_1") == ASISTIO
+        assert cell(matrix, first, "semana_2") == NO_ASISTIO
+
+    run(scenario())
+
+def test_drilldown_mastery_reloads_after_delete_and_insert(student_ids):
+    first, second = student_ids
+
+    async def scenario():
+        matrix = await new_store().get()
+        store = DrilldownStore()
+        async with AsyncSessionLocal() as db:
+            mastery = await store._sync_mastery(db, matrix)
+        first_row, second_row = matrix.rows_for([first, second]).tolist()
+        assert mastery.counts[first_row, TICKETS] == 1
+
+        with SessionLocal() as db:
+            db.query(TicketEstudiante).filter(TicketEstudiante.estudiante_id == first).delete()
+            db.add(TicketEstudiante(estudiante_id=second, unidad="unidad_1", modulo="modulo_2", resultado=EstadoTicket.OCHENTA_PORCIENTO))
+            db.commit()
+        async with AsyncSessionLocal() as db:
+            mastery = await store._sync_mastery(db, matrix)
+
+        assert mastery.counts[first_row, TICKETS] == 0
+        assert mastery.sums[first_row, TICKETS] == 0
+        assert mastery.counts[second_row, TICKETS] == 2
+        assert mastery.sums[second_row, TICKETS] == pytest.approx(180)
+
+    run(scenario())
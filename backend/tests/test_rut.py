@@ -0,0 +1,44 @@
+"""
+Validación de RUT: parse_ruts (lote, importaciones) y parse_rut (un valor, formularios y modelo)
+deben aceptar exactamente los mismos valores.
+
+Uso:
+    cd backend
+    pip install -r requirements-dev.txt
+    python -m pytest -q tests
+"""
+import os
+import random
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.rut import check_digit, format_rut, parse_rut, parse_ruts
+
+EDGE_CASES = [
+    None, "", " ", "K", "5", "0-0", "1-9", "00000001-9", "12.345.678-5", "12345678-5", "12345678-k",
+    " 9.876.543-3 ", "12345678\t-5", "12.345.678\n-5", "12 345 678 - 5", "12345678 -5",
+    "123456789-1", "1234567K", "١٢٣٤٥٦٧٨-5", "12345678-5-5", "abc", "12a45678-5", 12345678, 123456785,
+]
+
+def sample_ruts(total: int):
+    """RUT con y sin formato, con dígito verificador correcto o al azar"""
+    rng = random.Random(0)
+    values = []
+    for _ in range(total):
+        numero = rng.randint(1, 99_999_999)
+        dv = check_digit(numero) if rng.random() < 0.7 else rng.choice("0123456789Kk")
+        values.append(rng.choice((
+            f"{numero}-{dv}", f"{numero}{dv}", format_rut(numero, dv), f" {numero}\t-{dv} ", f"{numero:,}-{dv}"
+        )))
+    return values
+
+def test_batch_and_single_parsers_agree():
+    values = EDGE_CASES + sample_ruts(5000)
+    assert parse_ruts(values) == [parse_rut(value) for value in values]
+
+def test_whitespace_is_ignored():
+    assert parse_ruts(["12345678\t-5", "12.345.678\n-5"]) == [(12345678, "5"), (12345678, "5")]
+
+def test_empty_batch():
+    assert parse_ruts([]) == []